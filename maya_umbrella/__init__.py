@@ -4,6 +4,7 @@ from maya_umbrella.collector import MayaVirusCollector
 from maya_umbrella.defender import MayaVirusDefender
 from maya_umbrella.defender import context_defender
 from maya_umbrella.defender import get_defender_instance
+from maya_umbrella.quick_verdict import quick_verdict
 from maya_umbrella.scanner import MayaVirusScanner
 
 
@@ -15,4 +16,5 @@ __all__ = [
     "MayaVirusScanner",
     "context_defender",
     "get_defender_instance",
+    "quick_verdict",
 ]
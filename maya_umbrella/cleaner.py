@@ -1,17 +1,23 @@
 # Import built-in modules
+from functools import partial
 import glob
 import logging
 import os
-import re
+import time
 
 # Import local modules
+from maya_umbrella.deferred import WorkerPool
+from maya_umbrella.filesystem import get_file_workers
 from maya_umbrella.filesystem import remove_virus_file_by_signature
 from maya_umbrella.filesystem import safe_remove_file
 from maya_umbrella.filesystem import safe_rmtree
-from maya_umbrella.i18n import Translator
+from maya_umbrella.i18n import get_translator
 from maya_umbrella.maya_funs import check_reference_node_exists
 from maya_umbrella.maya_funs import cmds
+from maya_umbrella.maya_funs import is_maya_standalone
+from maya_umbrella.metrics import METRICS
 from maya_umbrella.signatures import FILE_VIRUS_SIGNATURES
+from maya_umbrella.tracing import traced
 
 
 class MayaVirusCleaner(object):
@@ -21,6 +27,7 @@ class MayaVirusCleaner(object):
         logger (Logger): Logger object for logging purposes.
         translator (Translator): Translator object for translation purposes.
         collector (MayaVirusCollector): MayaVirusCollector object for collecting issues.
+        file_workers (WorkerPool): Worker threads fixing files in the background.
     """
 
     def __init__(self, collector, logger=None):
@@ -31,8 +38,10 @@ class MayaVirusCleaner(object):
             logger (Logger, optional): Logger object for logging purposes. Defaults to None, which creates a new logger.
         """
         self.logger = logger or logging.getLogger(__name__)
-        self.translator = Translator()
+        self.translator = get_translator()
         self.collector = collector
+        self.file_workers = WorkerPool(get_file_workers(), self.logger)
+        self._pending_files = set()
 
     def callback_remove_rename_temp_files(self, *args, **kwargs):
         """Remove temporary files in the local script path."""
@@ -40,37 +49,53 @@ class MayaVirusCleaner(object):
         for temp_file in glob.glob(os.path.join(self.collector.local_script_path, "._*")):
             safe_remove_file(temp_file)
 
+    @traced("fix_script_jobs", "cleaner")
     def fix_script_jobs(self):
         """Fix infected script jobs."""
         for script_job in self.collector.infected_script_jobs:
-            script_num = int(re.findall(r"^(\d+):", script_job)[0])
+            script_num = self.collector.get_script_job_id(script_job)
             self.logger.debug("Kill script job %s", script_job)
-            cmds.scriptJob(kill=script_num, force=True)
+            if script_num is not None:
+                cmds.scriptJob(kill=script_num, force=True)
             self.collector.remove_infected_script_job(script_job)
 
+    def fix_malicious_file(self, file_):
+        """Remove a malicious file or directory, does not use the Maya API.
+
+        Args:
+            file_ (str): Path to the malicious file or directory.
+
+        Returns:
+            bool: True if the path was removed, False otherwise.
+        """
+        if not os.access(file_, os.W_OK):
+            self.logger.debug(self.translator.lazy("file_not_writable", name=file_))
+            return False
+        if not os.path.exists(file_):
+            return False
+        if os.path.isfile(file_):
+            self.logger.debug(self.translator.lazy("remove_file", name=file_))
+            safe_remove_file(file_)
+        else:
+            self.logger.debug(self.translator.lazy("remove_path", name=file_))
+            safe_rmtree(file_)
+        return True
+
+    @traced("fix_malicious_files", "cleaner")
     def fix_malicious_files(self):
         """Fix malicious files."""
         for file_ in self.collector.malicious_files:
-            if not os.access(file_, os.W_OK):
-                self.logger.debug(self.translator.translate("file_not_writable", name=file_))
-                continue
-            if os.path.exists(file_):
-                if os.path.isfile(file_):
-                    self.logger.debug(self.translator.translate("remove_file", name=file_))
-                    safe_remove_file(file_)
-                    self.collector.remove_malicious_file(file_)
-                else:
-                    self.logger.debug(self.translator.translate("remove_path", name=file_))
-                    safe_rmtree(file_)
-                    self.collector.remove_malicious_file(file_)
+            if self.fix_malicious_file(file_):
+                self.collector.remove_malicious_file(file_)
 
+    @traced("fix_infected_nodes", "cleaner")
     def fix_infected_nodes(self):
         """Fix infected nodes."""
         for node in self.collector.infected_nodes:
             is_referenced = check_reference_node_exists(node)
             if is_referenced:
                 try:
-                    self.logger.debug(self.translator.translate("fix_infected_reference_nodes", name=node))
+                    self.logger.debug(self.translator.lazy("fix_infected_reference_nodes", name=node))
                     cmds.setAttr("{node}.before".format(node=node), "", type="string")
                     cmds.setAttr("{node}.after".format(node=node), "", type="string")
                     cmds.setAttr("{node}.scriptType".format(node=node), 0)
@@ -83,7 +108,7 @@ class MayaVirusCleaner(object):
                 except ValueError:
                     pass
                 try:
-                    self.logger.debug(self.translator.translate("fix_infected_nodes", name=node))
+                    self.logger.debug(self.translator.lazy("fix_infected_nodes", name=node))
                     cmds.delete(node)
                 except ValueError:
                     pass
@@ -94,25 +119,74 @@ class MayaVirusCleaner(object):
         self.collector.add_maya_initialized_callback(self.callback_remove_rename_temp_files)
         self.collector.add_maya_exiting_callback(self.callback_remove_rename_temp_files)
 
+    def fix_infected_file(self, file_path):
+        """Remove the virus content from an infected file, does not use the Maya API.
+
+        Args:
+            file_path (str): Path to the infected file.
+
+        Returns:
+            bool: True if the file was fixed, False otherwise.
+        """
+        self.logger.info(self.translator.lazy("fix_infected_files", name=file_path))
+        if not os.access(file_path, os.W_OK):
+            self.logger.debug(self.translator.lazy("file_not_writable", name=file_path))
+            return False
+        remove_virus_file_by_signature(file_path, FILE_VIRUS_SIGNATURES)
+        return True
+
+    @traced("fix_infected_files", "cleaner")
     def fix_infected_files(self):
         """Fix infected files."""
         for file_path in self.collector.infected_files:
-            self.logger.info(self.translator.translate("fix_infected_files", name=file_path))
-            if not os.access(file_path, os.W_OK):
-                self.logger.debug(self.translator.translate("file_not_writable", name=file_path))
+            if self.fix_infected_file(file_path):
+                self.collector.remove_infected_file(file_path)
+
+    @traced("fix_files_in_background", "cleaner")
+    def fix_files_in_background(self):
+        """Fix malicious and infected files on the worker threads.
+
+        The collector is updated on the main thread once a file is fixed,
+        files still being fixed are not submitted again.
+        """
+        jobs = [(file_, self.fix_malicious_file, self.collector.remove_malicious_file)
+                for file_ in self.collector.malicious_files]
+        jobs.extend((file_path, self.fix_infected_file, self.collector.remove_infected_file)
+                    for file_path in self.collector.infected_files)
+        for file_, fix_func, remove_func in jobs:
+            if file_ in self._pending_files:
                 continue
-            remove_virus_file_by_signature(file_path, FILE_VIRUS_SIGNATURES)
-            self.collector.remove_infected_file(file_path)
+            self._pending_files.add(file_)
+            self.file_workers.submit(partial(fix_func, file_), partial(self._file_fixed, file_, remove_func))
+
+    def _file_fixed(self, file_, remove_func, fixed):
+        self._pending_files.discard(file_)
+        if not fixed:
+            return
+        try:
+            remove_func(file_)
+        except ValueError:
+            # The collector was reset while the file was being fixed.
+            pass
+
+    def wait_file_fixes(self):
+        """Block until all files submitted to the worker threads are fixed."""
+        self.file_workers.wait()
 
     def fix(self):
         """Fix all issues related to the Maya virus."""
         if self.collector.have_issues:
             maya_file = cmds.file(query=True, sceneName=True, shortName=True) or "empty/scene"
-            self.logger.info(self.translator.translate("start_fix_issues", name=maya_file))
-            self.fix_malicious_files()
-            self.fix_infected_files()
+            self.logger.info(self.translator.lazy("start_fix_issues", name=maya_file))
+            started = time.time()
+            if self.file_workers.workers and not is_maya_standalone():
+                self.fix_files_in_background()
+            else:
+                self.fix_malicious_files()
+                self.fix_infected_files()
             self.fix_infected_nodes()
             self.fix_script_jobs()
             for func in self.collector.get_additionally_fix_funcs():
                 func()
-            self.logger.info(self.translator.translate("finish_fix_issues", name=maya_file))
+            METRICS.observe("fix_seconds", time.time() - started)
+            self.logger.info(self.translator.lazy("finish_fix_issues", name=maya_file))
@@ -4,11 +4,22 @@ import logging
 import os
 
 # Import local modules
+from maya_umbrella._vendor import six
+from maya_umbrella.constants import VERDICT_CLEAN
+from maya_umbrella.constants import VERDICT_INFECTED
 from maya_umbrella.filesystem import get_locale_script_paths
 from maya_umbrella.filesystem import get_vaccines
+from maya_umbrella.filesystem import get_verdict_cache_file
+from maya_umbrella.filesystem import is_verdict_cache_enabled
+from maya_umbrella.filesystem import is_verdict_cache_hash_enabled
 from maya_umbrella.filesystem import load_hook
-from maya_umbrella.i18n import Translator
+from maya_umbrella.i18n import get_translator
 from maya_umbrella.maya_funs import cmds
+from maya_umbrella.maya_funs import get_reference_file_by_node
+from maya_umbrella.maya_funs import parse_script_job_id
+from maya_umbrella.node_index import SuspiciousNodeIndex
+from maya_umbrella.tracing import trace_span
+from maya_umbrella.verdict_cache import VerdictCache
 
 
 class MayaVirusCollector(object):
@@ -20,33 +31,55 @@ class MayaVirusCollector(object):
         _infected_nodes (list): List to store infected nodes.
         _infected_script_nodes (list): List to store infected script nodes.
         _infected_reference_files (list): List to store infected reference files.
+        _queued_reference_files (list): List to store infected files found before loading, kept across collects.
         _infected_script_jobs (list): List to store infected script jobs.
+        _script_job_ids (dict): Dictionary mapping infected script jobs to their parsed id.
         _registered_callbacks (defaultdict): Dictionary to store registered callbacks.
         _additionally_fix_funcs (list): List to store additional fix functions.
         _vaccines (list): List to store vaccines.
+        _node_reference_files (dict): Dictionary mapping scanned nodes to their reference file.
+        _skipped_nodes (set): Nodes a vaccine did not check, their reference files are not verified.
+        _scanned_nodes (set): Set of nodes scanned in the current collect.
+        _deferred_funcs (list): List of collect functions deferred by the current collect, None if not deferring.
         logger: Logger object for logging purposes.
         translator: Translator object for translation purposes.
+        verdict_cache (VerdictCache): Cache of reference files already verified.
+        node_index (SuspiciousNodeIndex): Live index of the nodes that changed since they were last scanned.
     """
 
-    def __init__(self, logger, translator=None):
+    def __init__(self, logger, translator=None, verdict_cache=None):
         """Initialize MayaVirusCollector.
 
         Args:
             logger (Logger, optional): Logger object for logging purposes.
-            translator (Translator, optional): Translator object for translation purposes.
+            translator (Translator, optional): Translator object for translation purposes. Defaults to None,
+                which uses the translator shared by the process.
+            verdict_cache (VerdictCache, optional): Cache of reference files already verified. Defaults to None,
+                which uses the cache persisted to `get_verdict_cache_file()` if enabled, in memory otherwise.
         """
         self.logger = logger or logging.getLogger(__name__)
-        self.translator = translator or Translator()
+        self.translator = translator or get_translator()
         # Malicious files or temp files that need to be deleted directly.
         self._malicious_files = []
         self._infected_files = []
         self._infected_nodes = []
         self._infected_script_nodes = []
         self._infected_reference_files = []
+        self._queued_reference_files = []
         self._infected_script_jobs = []
+        self._script_job_ids = {}
         self._registered_callbacks = defaultdict(list)
         self._additionally_fix_funcs = []
         self._vaccines = []
+        self._node_reference_files = {}
+        self._skipped_nodes = set()
+        self._scanned_nodes = set()
+        self._infected_families = set()
+        self._deferred_funcs = None
+        self.node_index = SuspiciousNodeIndex()
+        self.verdict_cache = verdict_cache or VerdictCache(
+            get_verdict_cache_file() if is_verdict_cache_enabled() else None, use_hash=is_verdict_cache_hash_enabled()
+        )
         self.load_vaccines()
 
     def load_vaccines(self):
@@ -113,7 +146,9 @@ class MayaVirusCollector(object):
 
     @property
     def infected_reference_files(self):
-        return [path for path in list(set(self._infected_reference_files)) if os.path.exists(path)]
+        """Return a list of infected reference files, including the queued ones."""
+        files = set(self._infected_reference_files + self._queued_reference_files)
+        return [path for path in files if os.path.exists(path)]
 
     @property
     def infected_script_nodes(self):
@@ -165,7 +200,22 @@ class MayaVirusCollector(object):
         Args:
             file (str): Infected reference file to be removed.
         """
-        self._infected_reference_files.remove(file)
+        if file in self._queued_reference_files:
+            self._queued_reference_files.remove(file)
+        if file in self._infected_reference_files:
+            self._infected_reference_files.remove(file)
+
+    def queue_infected_reference_file(self, file):
+        """Queue an infected file found on disk before Maya loads it.
+
+        Queued files are not cleared by `reset`, they are reported as infected
+        reference files until they get removed.
+
+        Args:
+            file (str): Infected file to be queued.
+        """
+        if file not in self._queued_reference_files:
+            self._queued_reference_files.append(file)
 
     def add_infected_files(self, files):
         """Add multiple infected files.
@@ -247,13 +297,16 @@ class MayaVirusCollector(object):
         """
         self._infected_script_jobs.extend(jobs)
 
-    def add_infected_script_job(self, job):
+    def add_infected_script_job(self, job, job_id=None):
         """Add a single infected script job.
 
         Args:
             job (str): Infected script job to be added.
+            job_id (int, optional): Parsed id of the script job. Defaults to None, which parses it when needed.
         """
         self._infected_script_jobs.append(job)
+        if job_id is not None:
+            self._script_job_ids[job] = job_id
 
     def remove_infected_script_job(self, job):
         """Remove an infected script job.
@@ -262,6 +315,20 @@ class MayaVirusCollector(object):
             job (str): Infected script job to be removed.
         """
         self._infected_script_jobs.remove(job)
+        self._script_job_ids.pop(job, None)
+
+    def get_script_job_id(self, job):
+        """Get the id of an infected script job.
+
+        Args:
+            job (str): Infected script job.
+
+        Returns:
+            int: The id of the script job, None if it cannot be parsed.
+        """
+        if job not in self._script_job_ids:
+            self._script_job_ids[job] = parse_script_job_id(job)
+        return self._script_job_ids[job]
 
     def add_infected_script_nodes(self, nodes):
         """Add multiple infected script nodes.
@@ -387,11 +454,125 @@ class MayaVirusCollector(object):
         """
         self._additionally_fix_funcs.append(func)
 
-    def collect(self):
-        """Collect issues from all loaded vaccines."""
+    def get_node_reference_file(self, node):
+        """Get the reference file a node belongs to, cached for the current collect.
+
+        Args:
+            node (str): Name of the node.
+
+        Returns:
+            str: Path of the reference file, empty string if the node is not referenced.
+        """
+        if node not in self._node_reference_files:
+            reference_file = get_reference_file_by_node(node)
+            # Ensure we have a string, not a MagicMock (in non-Maya environments)
+            if not isinstance(reference_file, six.string_types):
+                reference_file = ""
+            self._node_reference_files[node] = reference_file
+        return self._node_reference_files[node]
+
+    def filter_nodes_to_scan(self, nodes):
+        """Filter out the nodes that do not need to be scanned.
+
+        Nodes that did not change since they were last scanned and nodes owned
+        by a reference file already verified clean are skipped.
+
+        Args:
+            nodes (list): List of node names.
+
+        Returns:
+            list: List of node names to scan.
+        """
+        nodes_to_scan = []
+        for node in self.node_index.filter_nodes(nodes):
+            reference_file = self.get_node_reference_file(node)
+            if reference_file and self.verdict_cache.is_clean(reference_file):
+                continue
+            nodes_to_scan.append(node)
+        self._scanned_nodes.update(nodes_to_scan)
+        return nodes_to_scan
+
+    def skip_node(self, node):
+        """Mark a node returned by `filter_nodes_to_scan` as not checked by a vaccine.
+
+        Args:
+            node (str): Name of the node.
+        """
+        self._skipped_nodes.add(node)
+
+    def update_verdict_cache(self):
+        """Record the verdict of every reference file scanned in the current collect.
+
+        Reference files with a node a vaccine skipped are not known to be clean and are left uncached.
+        """
+        infected_files = set(self._infected_reference_files)
+        infected_files.update(self.get_node_reference_file(node) for node in self._infected_nodes)
+        unchecked_files = {self.get_node_reference_file(node) for node in self._skipped_nodes}
+        for reference_file in set(self._node_reference_files.values()):
+            if not reference_file:
+                continue
+            if reference_file in infected_files:
+                self.verdict_cache.set(reference_file, VERDICT_INFECTED)
+            elif reference_file not in unchecked_files:
+                self.verdict_cache.set(reference_file, VERDICT_CLEAN)
+        self.verdict_cache.save()
+
+    def defer(self, func):
+        """Run an expensive collect function, or defer it if the current collect allows it.
+
+        Args:
+            func (function): The collect function.
+        """
+        if self._deferred_funcs is None:
+            func()
+        else:
+            self._deferred_funcs.append(func)
+
+    def pop_deferred_funcs(self):
+        """Return and forget the collect functions deferred by the last collect.
+
+        Returns:
+            list: List of deferred collect functions.
+        """
+        funcs = self._deferred_funcs or []
+        self._deferred_funcs = None
+        return funcs
+
+    def collect(self, full_scan=False, defer=False):
+        """Collect issues from all loaded vaccines.
+
+        Args:
+            full_scan (bool): Whether to scan all nodes instead of the nodes changed since the last collect.
+            defer (bool): Whether expensive collect functions are deferred instead of run,
+                they can be retrieved with `pop_deferred_funcs`.
+        """
+        if full_scan:
+            self.node_index.request_full_scan()
         self.reset()
+        self._deferred_funcs = [] if defer else None
         for vaccine in self.vaccines:
-            vaccine.collect_issues()
+            issue_count = self._get_issue_count()
+            with trace_span(vaccine.virus_name, "vaccine"):
+                vaccine.collect_issues()
+            if self._get_issue_count() > issue_count:
+                self._infected_families.add(vaccine.virus_name)
+        self.update_verdict_cache()
+        self.node_index.mark_scanned(self._scanned_nodes, self._infected_nodes)
+
+    def _get_issue_count(self):
+        return sum(len(issues) for issues in (
+            self._malicious_files, self._infected_nodes, self._infected_script_nodes, self._infected_files,
+            self._infected_script_jobs,
+        ))
+
+    @property
+    def infected_families(self):
+        """Return the names of the viruses the last collect found issues of.
+
+        Returns:
+            list: Sorted virus names.
+        """
+        return sorted(self._infected_families)
 
     @property
     def have_issues(self):
@@ -412,7 +593,7 @@ class MayaVirusCollector(object):
             "infected_files",
             "infected_reference_files"
         ):
-            self.logger.info(self.translator.translate(name, name=getattr(self, name)))
+            self.logger.info(self.translator.lazy(name, name=getattr(self, name)))
 
     def reset(self):
         """Reset all issues related to the Maya virus."""
@@ -420,7 +601,12 @@ class MayaVirusCollector(object):
         self._infected_nodes = []
         self._infected_script_nodes = []
         self._infected_script_jobs = []
+        self._script_job_ids = {}
         self._infected_files = []
         self._infected_reference_files = []
+        self._node_reference_files = {}
+        self._skipped_nodes = set()
+        self._scanned_nodes = set()
+        self._infected_families = set()
         self._registered_callbacks = defaultdict(list)
         self._additionally_fix_funcs = []
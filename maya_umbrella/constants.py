@@ -3,3 +3,14 @@ PACKAGE_NAME = "maya_umbrella"
 LOG_FORMAT = "%(asctime)s [%(levelname)s] %(name)s: %(message)s"
 
 LOG_MAX_BYTES = 1024 * 1024 * 5
+
+LOG_QUEUE_SIZE = 1000
+
+VERDICT_CLEAN = "clean"
+VERDICT_INFECTED = "infected"
+VERDICT_FIXED = "fixed"
+VERDICT_ERROR = "error"
+VERDICT_NEEDS_FULL_SCAN = "needs_full_scan"
+VERDICT_SKIPPED = "skipped"
+
+DAEMON_PORT = 47070
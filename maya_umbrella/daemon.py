@@ -0,0 +1,475 @@
+"""A long-running scan service keeping Maya sessions warm.
+
+Initializing ``maya.standalone`` takes many seconds, so the daemon starts a pool
+of worker processes once, each running an initialized standalone session, and
+dispatches scan and fix requests to them as they come.
+
+Clients talk to the daemon over a Unix domain socket, or a localhost TCP port
+where Unix sockets are not supported, using JSON lines. A request is::
+
+    {"id": "publish-1", "action": "scan", "files": ["/shots/a.ma", "/shots/b.mb"]}
+
+where the action is either ``scan`` or ``fix``, and the daemon writes one result
+line per file as soon as it is done::
+
+    {"id": "publish-1", "file": "/shots/b.mb", "action": "scan", "verdict": "clean", "error": null}
+
+Run the daemon and its workers with mayapy::
+
+    mayapy -m maya_umbrella.daemon serve --workers 4
+
+"""
+
+# Import built-in modules
+import argparse
+import json
+import logging
+import os
+import socket
+import subprocess
+import sys
+import threading
+import time
+
+# Import local modules
+from maya_umbrella import maya_funs
+from maya_umbrella._vendor import six
+from maya_umbrella._vendor.six.moves import queue
+from maya_umbrella._vendor.six.moves import socketserver
+from maya_umbrella.constants import VERDICT_CLEAN
+from maya_umbrella.constants import VERDICT_ERROR
+from maya_umbrella.constants import VERDICT_FIXED
+from maya_umbrella.constants import VERDICT_INFECTED
+from maya_umbrella.defender import context_defender
+from maya_umbrella.filesystem import get_daemon_address
+from maya_umbrella.filesystem import get_scan_journal_file
+from maya_umbrella.filesystem import is_scan_journal_enabled
+from maya_umbrella.filesystem import safe_remove_file
+from maya_umbrella.scanner import MayaVirusScanner
+from maya_umbrella.scheduler import ScanJournal
+from maya_umbrella.scheduler import schedule_files
+
+
+ACTION_SCAN = "scan"
+ACTION_FIX = "fix"
+ACTIONS = (ACTION_SCAN, ACTION_FIX)
+
+# Prefix of the result lines written by workers, Maya may print anything else to stdout.
+RESULT_PREFIX = "maya_umbrella_result:"
+
+
+def parse_address(address):
+    """Parse the address of the scan daemon.
+
+    Args:
+        address (str): Either a Unix socket path or ``host:port``.
+
+    Returns:
+        tuple: The socket family and the address to bind or connect to.
+    """
+    host, separator, port = address.rpartition(":")
+    if separator and port.isdigit() and os.sep not in host:
+        return socket.AF_INET, (host or "127.0.0.1", int(port))
+    return socket.AF_UNIX, address
+
+
+def run_job(job):
+    """Scan or fix a single file in the current Maya session.
+
+    Args:
+        job (dict): The job, with the ``id``, ``action`` and ``file`` of the request.
+
+    Returns:
+        dict: The result of the job.
+    """
+    path = job["file"]
+    result = {"id": job.get("id"), "file": path, "action": job["action"], "verdict": None, "error": None}
+    try:
+        if job["action"] == ACTION_FIX:
+            fixed_files = []
+            for scan_result in MayaVirusScanner().iter_scan([path]):
+                if scan_result.verdict == VERDICT_FIXED:
+                    fixed_files.append(scan_result.path)
+                if scan_result.path == path:
+                    result.update(verdict=scan_result.verdict, error=scan_result.error,
+                                  families=scan_result.families, backup_path=scan_result.backup_path)
+            result["fixed_files"] = fixed_files
+        else:
+            with context_defender() as defender:
+                maya_funs.open_maya_file(path)
+                defender.collect()
+                result["verdict"] = VERDICT_INFECTED if defender.have_issues else VERDICT_CLEAN
+                maya_funs.cmds.file(new=True, force=True)
+    except Exception as error:  # noqa: BLE001
+        # Any failure is reported to the client instead of killing the worker.
+        result["verdict"] = VERDICT_ERROR
+        result["error"] = str(error)
+    return result
+
+
+def run_worker(stdin=None, stdout=None):
+    """Run a worker, reading jobs from stdin and writing results to stdout as JSON lines.
+
+    Maya standalone is initialized once for all the jobs.
+
+    Args:
+        stdin (file, optional): The stream to read jobs from. Defaults to sys.stdin.
+        stdout (file, optional): The stream to write results to. Defaults to sys.stdout.
+    """
+    stdin = stdin or sys.stdin
+    stdout = stdout or sys.stdout
+    with maya_funs.maya_standalone_context():
+        for line in iter(stdin.readline, ""):
+            if not line.strip():
+                continue
+            result = run_job(json.loads(line))
+            result["worker"] = os.getpid()
+            stdout.write(RESULT_PREFIX + json.dumps(result) + "\n")
+            stdout.flush()
+
+
+class MayaWorkerProcess(object):
+    """A worker process running an initialized Maya standalone session.
+
+    Attributes:
+        command (list): The command starting the worker.
+        process (subprocess.Popen): The running process, None until the first job.
+    """
+
+    def __init__(self, command):
+        """Initialize the MayaWorkerProcess.
+
+        Args:
+            command (list): The command starting the worker.
+        """
+        self.command = command
+        self.process = None
+
+    def start(self):
+        """Start the process if it is not running."""
+        if self.process is None or self.process.poll() is not None:
+            self.process = subprocess.Popen(
+                self.command,
+                stdin=subprocess.PIPE,
+                stdout=subprocess.PIPE,
+                universal_newlines=True,
+            )
+
+    def run(self, job):
+        """Run a job in the process, restarting it if it died.
+
+        Args:
+            job (dict): The job to run.
+
+        Returns:
+            dict: The result of the job.
+        """
+        self.start()
+        try:
+            self.process.stdin.write(json.dumps(job) + "\n")
+            self.process.stdin.flush()
+            for line in iter(self.process.stdout.readline, ""):
+                if line.startswith(RESULT_PREFIX):
+                    return json.loads(line[len(RESULT_PREFIX):])
+        except (OSError, IOError, ValueError):  # noqa: UP024
+            pass
+        self.stop()
+        return {"id": job.get("id"), "file": job["file"], "action": job["action"], "verdict": VERDICT_ERROR,
+                "error": "worker process exited"}
+
+    def stop(self):
+        """Stop the process."""
+        if self.process is None:
+            return
+        try:
+            # Workers exit once their stdin is closed.
+            self.process.stdin.close()
+        except (OSError, IOError):  # noqa: UP024
+            pass
+        self.process.wait()
+        self.process.stdout.close()
+        self.process = None
+
+
+class MayaWorkerPool(object):
+    """A pool of worker processes, each job goes to the next idle worker.
+
+    Attributes:
+        workers (list): The worker processes.
+        journal (ScanJournal): The scan time of each file, used to start the longest scans first.
+    """
+
+    def __init__(self, workers, command, journal=None):
+        """Initialize the MayaWorkerPool.
+
+        Args:
+            workers (int): Number of worker processes.
+            command (list): The command starting a worker.
+            journal (ScanJournal, optional): The scan journal. Defaults to None, which keeps it in memory.
+        """
+        self.workers = [MayaWorkerProcess(command) for _ in range(max(workers, 1))]
+        self.journal = journal or ScanJournal()
+        self._jobs = queue.Queue()
+        self._threads = []
+
+    def start(self):
+        """Start the worker processes, each initializes Maya once."""
+        for worker in self.workers:
+            worker.start()
+            thread = threading.Thread(target=self._work, args=(worker,))
+            thread.daemon = True
+            thread.start()
+            self._threads.append(thread)
+
+    def submit(self, job, callback):
+        """Queue a job.
+
+        Args:
+            job (dict): The job to run.
+            callback (function): Called with the result of the job.
+        """
+        self._jobs.put((job, callback))
+
+    def stop(self):
+        """Stop the worker processes once the queued jobs are done."""
+        for _ in self._threads:
+            self._jobs.put(None)
+        for thread in self._threads:
+            thread.join()
+        self._threads = []
+        self.journal.save()
+
+    def _work(self, worker):
+        while True:
+            item = self._jobs.get()
+            if item is None:
+                worker.stop()
+                return
+            job, callback = item
+            started = time.time()
+            result = worker.run(job)
+            result["seconds"] = round(time.time() - started, 3)
+            self.journal.record(job["file"], result["seconds"])
+            try:
+                callback(result)
+            except Exception:
+                # A failing callback, e.g. a client gone, must not end the worker loop.
+                logging.getLogger(__name__).exception("failed to deliver the result of {file}".format(
+                    file=job["file"]))
+
+
+class ScanRequestHandler(socketserver.StreamRequestHandler):
+    """Read requests from a client connection and write back one result per file."""
+
+    def handle(self):
+        condition = threading.Condition()
+        pending = [0]
+
+        def write_result(result):
+            with condition:
+                try:
+                    self.wfile.write(six.ensure_binary(json.dumps(result) + "\n"))
+                    self.wfile.flush()
+                except (OSError, IOError):  # noqa: UP024
+                    # The client disconnected, the result is dropped.
+                    pass
+                finally:
+                    pending[0] -= 1
+                    condition.notify_all()
+
+        for line in iter(self.rfile.readline, b""):
+            if not line.strip():
+                continue
+            try:
+                request = json.loads(six.ensure_str(line))
+                action = request.get("action", ACTION_SCAN)
+                if action not in ACTIONS:
+                    raise ValueError("unknown action: {action}".format(action=action))
+                files = list(request["files"])
+            except (ValueError, KeyError, TypeError) as error:
+                with condition:
+                    pending[0] += 1
+                write_result({"id": None, "file": None, "verdict": VERDICT_ERROR, "error": str(error)})
+                continue
+            with condition:
+                pending[0] += len(files)
+            # The longest scans start first so that the workers finish together.
+            for path in schedule_files(files, self.server.pool.journal):
+                self.server.pool.submit({"id": request.get("id"), "action": action, "file": path}, write_result)
+        with condition:
+            while pending[0]:
+                condition.wait()
+
+
+class ScanServer(socketserver.ThreadingMixIn, socketserver.TCPServer):
+    """The scan daemon, serving each client connection on its own thread.
+
+    Attributes:
+        pool (MayaWorkerPool): The worker processes running the jobs.
+        address (str): The address the daemon listens on.
+    """
+
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, address, pool):
+        """Initialize the ScanServer and start listening.
+
+        Args:
+            address (str): Either a Unix socket path or ``host:port``.
+            pool (MayaWorkerPool): The worker processes running the jobs.
+        """
+        self.address_family, server_address = parse_address(address)
+        if self.address_family != socket.AF_INET:
+            safe_remove_file(server_address)
+        socketserver.TCPServer.__init__(self, server_address, ScanRequestHandler)
+        self.pool = pool
+        self.address = address
+
+    def server_close(self):
+        socketserver.TCPServer.server_close(self)
+        if self.address_family != socket.AF_INET:
+            safe_remove_file(self.server_address)
+
+
+class ScanClient(object):
+    """A client of the scan daemon.
+
+    Attributes:
+        address (str): The address of the daemon.
+        timeout (float): Socket timeout in seconds, None waits forever.
+    """
+
+    def __init__(self, address=None, timeout=None):
+        """Initialize the ScanClient.
+
+        Args:
+            address (str, optional): The address of the daemon. Defaults to None, which reads
+                MAYA_UMBRELLA_DAEMON_ADDRESS.
+            timeout (float, optional): Socket timeout in seconds. Defaults to None, which waits forever.
+        """
+        self.address = address or get_daemon_address()
+        self.timeout = timeout
+
+    def request(self, files, action=ACTION_SCAN, request_id=None):
+        """Send a request and yield the results as the files are done.
+
+        Args:
+            files (list): Paths of the Maya files.
+            action (str, optional): Either "scan" or "fix". Defaults to "scan".
+            request_id (str, optional): Identifier echoed in the results. Defaults to None.
+
+        Yields:
+            dict: The result of each file, in completion order.
+        """
+        files = list(files)
+        family, address = parse_address(self.address)
+        connection = socket.socket(family, socket.SOCK_STREAM)
+        connection.settimeout(self.timeout)
+        try:
+            connection.connect(address)
+            request = {"id": request_id, "action": action, "files": files}
+            connection.sendall(six.ensure_binary(json.dumps(request) + "\n"))
+            stream = connection.makefile("rb")
+            try:
+                for _ in files:
+                    line = stream.readline()
+                    if not line:
+                        break
+                    yield json.loads(six.ensure_str(line))
+            finally:
+                stream.close()
+        finally:
+            connection.close()
+
+    def scan(self, files, request_id=None):
+        """Scan files without fixing them.
+
+        Args:
+            files (list): Paths of the Maya files.
+            request_id (str, optional): Identifier echoed in the results. Defaults to None.
+
+        Returns:
+            list: The results, in completion order.
+        """
+        return list(self.request(files, ACTION_SCAN, request_id))
+
+    def fix(self, files, request_id=None):
+        """Scan and fix files.
+
+        Args:
+            files (list): Paths of the Maya files.
+            request_id (str, optional): Identifier echoed in the results. Defaults to None.
+
+        Returns:
+            list: The results, in completion order.
+        """
+        return list(self.request(files, ACTION_FIX, request_id))
+
+
+def get_worker_command(python=None):
+    """Get the command starting a worker process.
+
+    Args:
+        python (str, optional): The Python interpreter, mayapy. Defaults to None, which uses the current one.
+
+    Returns:
+        list: The command.
+    """
+    return [python or sys.executable, "-m", "maya_umbrella.daemon", "worker"]
+
+
+def serve(address=None, workers=2, python=None):
+    """Run the scan daemon until it is interrupted.
+
+    Args:
+        address (str, optional): The address to listen on. Defaults to None, which reads
+            MAYA_UMBRELLA_DAEMON_ADDRESS.
+        workers (int, optional): Number of worker processes. Defaults to 2.
+        python (str, optional): The mayapy running the workers. Defaults to None, which uses the current one.
+    """
+    logger = logging.getLogger(__name__)
+    journal = ScanJournal(get_scan_journal_file() if is_scan_journal_enabled() else None)
+    pool = MayaWorkerPool(workers, get_worker_command(python), journal)
+    pool.start()
+    server = ScanServer(address or get_daemon_address(), pool)
+    logger.info("Scan daemon listening on {address}".format(address=server.address))
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        pool.stop()
+
+
+def main(argv=None):
+    """Run the command line interface.
+
+    Args:
+        argv (list, optional): The arguments. Defaults to None, which uses sys.argv.
+    """
+    parser = argparse.ArgumentParser(prog="maya_umbrella.daemon")
+    parser.add_argument("--address", default=None)
+    subparsers = parser.add_subparsers(dest="command")
+    serve_parser = subparsers.add_parser("serve")
+    serve_parser.add_argument("--workers", type=int, default=2)
+    serve_parser.add_argument("--mayapy", default=None)
+    subparsers.add_parser("worker")
+    for action in ACTIONS:
+        subparsers.add_parser(action).add_argument("files", nargs="+")
+    args = parser.parse_args(argv)
+    if args.command == "serve":
+        logging.basicConfig(level=logging.INFO)
+        serve(args.address, args.workers, args.mayapy)
+    elif args.command == "worker":
+        run_worker()
+    elif args.command in ACTIONS:
+        for result in ScanClient(args.address).request(args.files, args.command):
+            print(json.dumps(result))
+    else:
+        parser.print_help()
+
+
+if __name__ == "__main__":
+    main()
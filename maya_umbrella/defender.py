@@ -1,16 +1,29 @@
 # Import built-in modules
 from contextlib import contextmanager
+from functools import partial
 import logging
+import os
+import time
 
 # Import local modules
 from maya_umbrella.cleaner import MayaVirusCleaner
 from maya_umbrella.collector import MayaVirusCollector
+from maya_umbrella.deferred import DeferredTaskQueue
+from maya_umbrella.filesystem import get_callback_budget
 from maya_umbrella.filesystem import get_hooks
+from maya_umbrella.filesystem import get_reference_check_policy
 from maya_umbrella.filesystem import load_hook
-from maya_umbrella.i18n import Translator
+from maya_umbrella.i18n import get_translator
+from maya_umbrella.log import flush_logger
 from maya_umbrella.log import setup_logger
 from maya_umbrella.maya_funs import is_maya_standalone
 from maya_umbrella.maya_funs import om
+from maya_umbrella.metrics import METRICS
+from maya_umbrella.metrics import schedule_flush_metrics
+from maya_umbrella.offline_scanner import scan_maya_file
+from maya_umbrella.profiling import profile_event
+from maya_umbrella.profiling import profiled
+from maya_umbrella.tracing import trace_span
 
 
 # Global list to store IDs of Maya callbacks
@@ -35,12 +48,15 @@ class MayaVirusDefender(object):
     Attributes:
         _vaccines (list): List to store vaccines.
         callback_maps (dict): Dictionary to map callback names to MSceneMessage constants.
+        check_file_callback_maps (tuple): Pairs of check file callback names and MSceneMessage constants.
         auto_fix (bool): Whether to automatically fix issues.
         logger (Logger): Logger object for logging purposes.
         translator (Translator): Translator object for translation purposes.
         collector (MayaVirusCollector): MayaVirusCollector object for collecting issues.
         virus_cleaner (MayaVirusCleaner): MayaVirusCleaner object for fixing issues.
         hooks (list): List of hooks to run.
+        deferred_tasks (DeferredTaskQueue): Work exceeding the callback budget, run when Maya is idle.
+        synchronous_callbacks (tuple): Names of the callbacks that never defer work.
     """
     _vaccines = []
     callback_maps = {
@@ -55,6 +71,12 @@ class MayaVirusDefender(object):
         "before_import_reference": om.MSceneMessage.kBeforeImportReference,
         "maya_exiting": om.MSceneMessage.kMayaExiting,
     }
+    check_file_callback_maps = (
+        ("before_load_reference_check", om.MSceneMessage.kBeforeLoadReferenceCheck),
+        ("before_create_reference_check", om.MSceneMessage.kBeforeCreateReferenceCheck),
+        ("before_import_check", om.MSceneMessage.kBeforeImportCheck),
+    )
+    synchronous_callbacks = ("before_save", "maya_exiting")
 
     def __init__(self, auto_fix=True):
         """Initialize the MayaVirusDefender.
@@ -65,24 +87,39 @@ class MayaVirusDefender(object):
         logger = logging.getLogger(__name__)
         self.auto_fix = auto_fix
         self.logger = setup_logger(logger)
-        self.translator = Translator()
+        self.translator = get_translator()
         self.collector = MayaVirusCollector(self.logger, self.translator)
         self.virus_cleaner = MayaVirusCleaner(self.collector, self.logger)
         self.hooks = get_hooks()
+        self.deferred_tasks = DeferredTaskQueue(get_callback_budget(), self.logger)
+
+    def run_hook(self, hook_file):
+        """Run a single hook.
+
+        Args:
+            hook_file (str): Path to the hook file.
+        """
+        self.logger.debug("run_hook: %s", hook_file)
+        hook_name = os.path.splitext(os.path.basename(hook_file))[0]
+        with profile_event("hook_{name}".format(name=hook_name)), trace_span(hook_name, "hook"):
+            try:
+                load_hook(hook_file).hook(virus_cleaner=self.virus_cleaner)
+            except Exception as e:
+                self.logger.debug("Error running hook: %s", e)
 
     def run_hooks(self):
         """Run all hooks, only works in non-batch mode."""
         if not is_maya_standalone():
             for hook_file in self.hooks:
-                self.logger.debug("run_hook: %s", hook_file)
-                try:
-                    load_hook(hook_file).hook(virus_cleaner=self.virus_cleaner)
-                except Exception as e:
-                    self.logger.debug("Error running hook: %s", e)
+                self.run_hook(hook_file)
 
-    def collect(self):
-        """Collect all issues related to the Maya virus."""
-        self.collector.collect()
+    def collect(self, full_scan=False):
+        """Collect all issues related to the Maya virus.
+
+        Args:
+            full_scan (bool): Whether to scan all nodes instead of the nodes changed since the last collect.
+        """
+        self.collector.collect(full_scan=full_scan)
 
     def fix(self):
         """Fix all issues related to the Maya virus."""
@@ -105,6 +142,7 @@ class MayaVirusDefender(object):
     def setup(self):
         """Set up the MayaVirusDefender."""
         self.virus_cleaner.setup_default_callbacks()
+        self.collector.node_index.setup()
         for name, callbacks in self.collector.registered_callbacks.items():
             maya_callback = self.callback_maps[name]
             self.logger.debug("%s setup.", name)
@@ -112,10 +150,14 @@ class MayaVirusDefender(object):
                 _add_callbacks_id(om.MSceneMessage.addCallback(maya_callback, func))
         for name, callbacks in self.callback_maps.items():
             self.logger.debug("setup callback %s.", name)
-            _add_callbacks_id(om.MSceneMessage.addCallback(callbacks, self._callback))
+            _add_callbacks_id(om.MSceneMessage.addCallback(callbacks, self._callback, name))
+        for name, callbacks in self.check_file_callback_maps:
+            self.logger.debug("setup check file callback %s.", name)
+            _add_callbacks_id(om.MSceneMessage.addCheckFileCallback(callbacks, self._check_file_callback))
 
     def stop(self):
         """Stop the MayaVirusDefender."""
+        self.collector.node_index.stop()
         while MAYA_UMBRELLA_CALLBACK_IDS:
             for ids in MAYA_UMBRELLA_CALLBACK_IDS:
                 self.logger.debug("remove callback. %s", ids)
@@ -131,19 +173,110 @@ class MayaVirusDefender(object):
         self.collect()
         return self.collector.infected_reference_files
 
+    def check_file(self, file_path):
+        """Scan a Maya file on disk before it gets loaded.
+
+        Args:
+            file_path (str): Path to the Maya file.
+
+        Returns:
+            bool: True if Maya may load the file, False if loading should be aborted.
+        """
+        families = scan_maya_file(file_path)
+        if not families:
+            return True
+        for family in families:
+            METRICS.inc("infections_total", family=family)
+        self.logger.warning(self.translator.lazy("infected_before_load", name=file_path,
+                                                 families=", ".join(families)))
+        policy = get_reference_check_policy()
+        if policy == "allow":
+            return True
+        if policy == "queue":
+            self.collector.queue_infected_reference_file(file_path)
+            return True
+        self.logger.warning(self.translator.lazy("block_infected_file", name=file_path))
+        return False
+
+    def _check_file_callback(self, file_object, *args):
+        """Check file callback function for MayaVirusDefender.
+
+        Args:
+            file_object (MFileObject): The file Maya is about to load.
+            *args: Variable length argument list.
+
+        Returns:
+            bool: True if Maya may load the file, False if loading should be aborted.
+        """
+        try:
+            return self.check_file(file_object.resolvedFullName())
+        except Exception as e:  # noqa: BLE001
+            # An error must not stop Maya from loading the file.
+            self.logger.debug("Error checking file: %s", e)
+            return True
+
+    def should_defer(self, callback_name):
+        """Check if the work of a callback may be deferred until Maya is idle.
+
+        Args:
+            callback_name (str): Name of the callback, None if not called by Maya.
+
+        Returns:
+            bool: True if work exceeding the callback budget may be deferred, False otherwise.
+        """
+        if not callback_name or callback_name in self.synchronous_callbacks:
+            return False
+        return self.deferred_tasks.budget > 0 and not is_maya_standalone()
+
+    @profiled("callback")
     def _callback(self, *args, **kwargs):
         """Callback function for MayaVirusDefender.
 
+        The cheap checks and fixes run synchronously, the expensive file scans
+        and hooks run within the callback budget and the rest is deferred until
+        Maya is idle. Synchronous callbacks, e.g. before saving, run everything.
+
         Args:
-            *args: Variable length argument list.
+            *args: Variable length argument list, the first argument is the callback name.
             **kwargs: Arbitrary keyword arguments.
         """
+        callback_name = args[0] if args else None
+        started = time.time()
+        with trace_span(callback_name or "start", "callback"):
+            self._run_callback(callback_name)
+        METRICS.observe("callback_seconds", time.time() - started, callback=callback_name or "start")
+        schedule_flush_metrics(self.logger)
+
+    def _run_callback(self, callback_name):
+        # A new callback supersedes the work still pending from the previous one.
+        self.deferred_tasks.clear()
+        if not self.should_defer(callback_name):
+            if self.auto_fix:
+                self.collect()
+                self.fix()
+                self.run_hooks()
+            else:
+                self.report()
+            if callback_name in self.synchronous_callbacks:
+                # Files fixed in the background must be clean before the scene is saved or Maya exits.
+                self.virus_cleaner.wait_file_fixes()
+            if callback_name == "maya_exiting":
+                flush_logger(self.logger)
+            return
+
+        started = time.time()
+        self.collector.collect(defer=True)
+        tasks = self.collector.pop_deferred_funcs()
         if self.auto_fix:
-            self.collect()
             self.fix()
-            self.run_hooks()
+            tasks.append(self.fix)
+            tasks.extend(partial(self.run_hook, hook_file) for hook_file in self.hooks)
         else:
-            self.report()
+            tasks.append(self.collector.report)
+        for task in tasks:
+            self.deferred_tasks.add(task)
+        self.deferred_tasks.run(self.deferred_tasks.budget - (time.time() - started))
+        self.deferred_tasks.schedule()
 
     def start(self):
         """Start the MayaVirusDefender."""
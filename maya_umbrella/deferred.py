@@ -0,0 +1,166 @@
+# Import built-in modules
+from collections import deque
+import logging
+import threading
+import time
+
+# Import local modules
+from maya_umbrella._vendor.six.moves import queue
+from maya_umbrella.maya_funs import cmds
+from maya_umbrella.maya_funs import maya_utils
+
+
+class DeferredTaskQueue(object):
+    """A queue of tasks run when Maya is idle, a few at a time within a time budget.
+
+    Attributes:
+        budget (float): Time budget in seconds of each idle run.
+        logger (Logger): Logger object for logging purposes.
+    """
+
+    def __init__(self, budget, logger=None):
+        """Initialize the DeferredTaskQueue.
+
+        Args:
+            budget (float): Time budget in seconds of each idle run.
+            logger (Logger, optional): Logger object for logging purposes. Defaults to None, which creates a new logger.
+        """
+        self.budget = budget
+        self.logger = logger or logging.getLogger(__name__)
+        self._tasks = deque()
+        self._scheduled = False
+
+    def __len__(self):
+        return len(self._tasks)
+
+    def add(self, func):
+        """Add a task to the queue.
+
+        Args:
+            func (function): The task to run.
+        """
+        self._tasks.append(func)
+
+    def clear(self):
+        """Remove all pending tasks."""
+        self._tasks.clear()
+
+    def run(self, budget=None):
+        """Run pending tasks until the queue is empty or the budget is exhausted.
+
+        Args:
+            budget (float, optional): Time budget in seconds. Defaults to None, which runs all pending tasks.
+
+        Returns:
+            bool: True if the queue is empty, False otherwise.
+        """
+        started = time.time()
+        while self._tasks:
+            if budget is not None and time.time() - started >= budget:
+                break
+            func = self._tasks.popleft()
+            try:
+                func()
+            except Exception as e:  # noqa: BLE001
+                # A failing task must not keep the remaining tasks from running.
+                self.logger.debug("Error running deferred task: %s", e)
+        return not self._tasks
+
+    def flush(self):
+        """Run all pending tasks synchronously."""
+        self.run()
+
+    def schedule(self):
+        """Schedule the pending tasks to run the next time Maya is idle."""
+        if self._tasks and not self._scheduled:
+            self._scheduled = True
+            cmds.evalDeferred(self._run_idle, lowestPriority=True)
+
+    def _run_idle(self):
+        self._scheduled = False
+        self.run(self.budget)
+        self.schedule()
+
+
+class WorkerPool(object):
+    """A pool of worker threads whose results are handled on the main thread.
+
+    Tasks must not use the Maya API, their completion callbacks are run on the
+    main thread via ``maya.utils.executeDeferred`` or when waiting for the pool.
+
+    Attributes:
+        workers (int): Number of worker threads.
+        logger (Logger): Logger object for logging purposes.
+    """
+
+    def __init__(self, workers, logger=None):
+        """Initialize the WorkerPool.
+
+        Args:
+            workers (int): Number of worker threads, 0 runs the tasks synchronously.
+            logger (Logger, optional): Logger object for logging purposes. Defaults to None, which creates a new logger.
+        """
+        self.workers = workers
+        self.logger = logger or logging.getLogger(__name__)
+        self._tasks = queue.Queue()
+        self._results = queue.Queue()
+        self._threads = []
+        self._lock = threading.Lock()
+
+    def submit(self, func, callback=None):
+        """Run a task on a worker thread.
+
+        Args:
+            func (function): The task to run.
+            callback (function, optional): Called on the main thread with the result of the task,
+                or None if the task raised an exception.
+        """
+        if not self.workers:
+            self._results.put((callback, self._run_task(func)))
+            self.process_results()
+            return
+        self._start()
+        self._tasks.put((func, callback))
+
+    def wait(self):
+        """Block until all submitted tasks are done and handle their results."""
+        self._tasks.join()
+        self.process_results()
+
+    def process_results(self):
+        """Run the completion callbacks of the finished tasks, must be called from the main thread."""
+        while True:
+            try:
+                callback, result = self._results.get_nowait()
+            except queue.Empty:
+                break
+            if callback is None:
+                continue
+            try:
+                callback(result)
+            except Exception as e:  # noqa: BLE001
+                # A failing callback must not keep the results of the other tasks from being handled.
+                self.logger.debug("Error running task callback: %s", e)
+
+    def _run_task(self, func):
+        try:
+            return func()
+        except Exception as e:  # noqa: BLE001
+            # A failing task must not kill its worker thread.
+            self.logger.debug("Error running background task: %s", e)
+            return None
+
+    def _start(self):
+        with self._lock:
+            while len(self._threads) < self.workers:
+                thread = threading.Thread(target=self._work)
+                thread.daemon = True
+                thread.start()
+                self._threads.append(thread)
+
+    def _work(self):
+        while True:
+            func, callback = self._tasks.get()
+            self._results.put((callback, self._run_task(func)))
+            self._tasks.task_done()
+            maya_utils.executeDeferred(self.process_results)
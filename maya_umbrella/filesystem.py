@@ -4,14 +4,18 @@ import importlib
 import json
 import logging
 import os
-import re
 import shutil
+import socket
 import tempfile
 
 # Import local modules
 from maya_umbrella._vendor import six
 from maya_umbrella._vendor.atomicwrites import atomic_write
+from maya_umbrella.constants import DAEMON_PORT
+from maya_umbrella.constants import LOG_QUEUE_SIZE
 from maya_umbrella.constants import PACKAGE_NAME
+from maya_umbrella.signature_engine import get_signature
+from maya_umbrella.signature_engine import search_signatures
 from maya_umbrella.signatures import FILE_VIRUS_SIGNATURES
 
 
@@ -177,6 +181,53 @@ def get_hooks():
     return hooks
 
 
+def get_reference_check_policy():
+    """Get the policy applied to infected files found on disk before Maya loads them.
+
+    The environment variable MAYA_UMBRELLA_REFERENCE_CHECK_POLICY can be set to:
+    - block: Abort loading the file (default).
+    - queue: Load the file and queue it as an infected reference file to be cleaned.
+    - allow: Load the file, the infection is only logged.
+
+    Returns:
+        str: The reference check policy.
+    """
+    policy = os.getenv("MAYA_UMBRELLA_REFERENCE_CHECK_POLICY", "block").lower()
+    if policy not in ("block", "queue", "allow"):
+        return "block"
+    return policy
+
+
+def get_callback_budget():
+    """Get the time budget of a scene callback, work exceeding it is deferred until Maya is idle.
+
+    The environment variable MAYA_UMBRELLA_CALLBACK_BUDGET is in milliseconds,
+    set it to 0 to run all the work inside the callback.
+
+    Returns:
+        float: The time budget in seconds.
+    """
+    try:
+        return max(float(os.getenv("MAYA_UMBRELLA_CALLBACK_BUDGET", "50")), 0) / 1000.0
+    except ValueError:
+        return 0.05
+
+
+def get_file_workers():
+    """Get the number of worker threads fixing files in the background.
+
+    The environment variable MAYA_UMBRELLA_FILE_WORKERS defaults to 2,
+    set it to 0 to fix files on the main thread.
+
+    Returns:
+        int: The number of worker threads.
+    """
+    try:
+        return max(int(os.getenv("MAYA_UMBRELLA_FILE_WORKERS", "2")), 0)
+    except ValueError:
+        return 2
+
+
 def get_vaccines():
     """Get a list of all vaccine files.
 
@@ -211,6 +262,249 @@ def get_log_file():
     return os.path.join(root, "{name}.log".format(name=name))
 
 
+def get_profile_mode():
+    """Get the profiling mode of callbacks, hooks and scans.
+
+    The environment variable MAYA_UMBRELLA_PROFILE can be set to:
+    - cpu: Profile with cProfile and write ``.pstats`` files.
+    - mem: Trace memory allocations with tracemalloc and write snapshot files.
+
+    Returns:
+        str: The profiling mode, or None if profiling is disabled.
+    """
+    mode = os.getenv("MAYA_UMBRELLA_PROFILE", "").lower()
+    if mode not in ("cpu", "mem"):
+        return None
+    return mode
+
+
+def get_trace_file():
+    """Get the path of the Chrome trace-event file of this process.
+
+    Tracing is enabled by setting the environment variable MAYA_UMBRELLA_TRACE to true,
+    the file is written under the log root and can be opened in ``chrome://tracing`` or Perfetto.
+
+    Returns:
+        str: The path of the trace file, or None if tracing is disabled.
+    """
+    if os.getenv("MAYA_UMBRELLA_TRACE", "false").lower() != "true":
+        return None
+    name = os.getenv("MAYA_UMBRELLA_LOG_NAME", PACKAGE_NAME)
+    return os.path.join(get_log_root(), "{name}_trace_{pid}.json".format(name=name, pid=os.getpid()))
+
+
+def is_async_logging_enabled():
+    """Check if log records are written to the log file by a background thread.
+
+    Returns:
+        bool: True if asynchronous logging is enabled, False otherwise.
+    """
+    return os.getenv("MAYA_UMBRELLA_LOG_ASYNC", "false").lower() == "true"
+
+
+def get_log_queue_size():
+    """Get the maximum number of log records waiting to be written in asynchronous mode.
+
+    Returns:
+        int: The size of the log queue.
+    """
+    try:
+        return max(int(os.getenv("MAYA_UMBRELLA_LOG_QUEUE_SIZE", str(LOG_QUEUE_SIZE))), 1)
+    except ValueError:
+        return LOG_QUEUE_SIZE
+
+
+def get_log_queue_policy():
+    """Get what happens to a log record when the log queue is full.
+
+    The environment variable MAYA_UMBRELLA_LOG_QUEUE_POLICY can be set to:
+    - drop: Discard the record (default).
+    - block: Wait until the background thread made room for the record.
+
+    Returns:
+        str: The log queue policy.
+    """
+    policy = os.getenv("MAYA_UMBRELLA_LOG_QUEUE_POLICY", "drop").lower()
+    if policy not in ("drop", "block"):
+        return "drop"
+    return policy
+
+
+def get_verdict_cache_file():
+    """Get the path of the file the verdict cache is persisted to.
+
+    Returns:
+        str: The path of the verdict cache file.
+    """
+    name = os.getenv("MAYA_UMBRELLA_LOG_NAME", PACKAGE_NAME)
+    default = os.path.join(get_log_root(), "{name}_verdicts.json".format(name=name))
+    return os.getenv("MAYA_UMBRELLA_VERDICT_CACHE_FILE", default)
+
+
+def get_scan_journal_file():
+    """Get the path of the file the scan times of files are persisted to.
+
+    Returns:
+        str: The path of the scan journal file.
+    """
+    name = os.getenv("MAYA_UMBRELLA_LOG_NAME", PACKAGE_NAME)
+    default = os.path.join(get_log_root(), "{name}_scan_journal.json".format(name=name))
+    return os.getenv("MAYA_UMBRELLA_SCAN_JOURNAL_FILE", default)
+
+
+def is_scan_journal_enabled():
+    """Check if the scan times of files are persisted to the scan journal file.
+
+    Returns:
+        bool: True if the scan journal is persisted, False to keep it in memory.
+    """
+    return os.getenv("MAYA_UMBRELLA_SCAN_JOURNAL", "false").lower() == "true"
+
+
+def get_scan_manifest_file():
+    """Get the path of the file the manifest of incremental sweeps is persisted to.
+
+    Returns:
+        str: The path of the scan manifest file.
+    """
+    name = os.getenv("MAYA_UMBRELLA_LOG_NAME", PACKAGE_NAME)
+    default = os.path.join(get_log_root(), "{name}_scan_manifest.json".format(name=name))
+    return os.getenv("MAYA_UMBRELLA_SCAN_MANIFEST_FILE", default)
+
+
+def get_retro_hunt_index_file():
+    """Get the path of the retro-hunt index of script node payloads.
+
+    Returns:
+        str: The path of the retro-hunt index database.
+    """
+    name = os.getenv("MAYA_UMBRELLA_LOG_NAME", PACKAGE_NAME)
+    default = os.path.join(get_log_root(), "{name}_retro_hunt.db".format(name=name))
+    return os.getenv("MAYA_UMBRELLA_RETRO_HUNT_INDEX_FILE", default)
+
+
+def is_retro_hunt_index_enabled():
+    """Check if the script nodes of scanned files are recorded into the retro-hunt index.
+
+    Returns:
+        bool: True if the retro-hunt index is enabled, False otherwise.
+    """
+    return os.getenv("MAYA_UMBRELLA_RETRO_HUNT_INDEX", "false").lower() == "true"
+
+
+def get_retro_hunt_payload_policy():
+    """Get which script node payloads are stored in the retro-hunt index.
+
+    The environment variable MAYA_UMBRELLA_RETRO_HUNT_PAYLOADS can be set to:
+    - suspicious: Store the payloads looking like code, only fingerprint the others (default).
+    - all: Store every payload.
+
+    Returns:
+        str: The payload policy.
+    """
+    policy = os.getenv("MAYA_UMBRELLA_RETRO_HUNT_PAYLOADS", "suspicious").lower()
+    if policy not in ("suspicious", "all"):
+        return "suspicious"
+    return policy
+
+
+def is_verdict_cache_enabled():
+    """Check if the verdict cache is persisted to the verdict cache file.
+
+    Returns:
+        bool: True if the verdict cache is persisted, False to keep it in memory.
+    """
+    return os.getenv("MAYA_UMBRELLA_VERDICT_CACHE", "false").lower() == "true"
+
+
+def is_verdict_cache_hash_enabled():
+    """Check if the content hash of files is part of the verdict cache key.
+
+    Returns:
+        bool: True if the content hash is used, False otherwise.
+    """
+    return os.getenv("MAYA_UMBRELLA_VERDICT_CACHE_HASH", "false").lower() == "true"
+
+
+def is_offline_fix_enabled():
+    """Check if infected Maya ASCII files are fixed by the scanner without opening them in Maya.
+
+    Returns:
+        bool: True if offline fixing is enabled, False otherwise.
+    """
+    return os.getenv("MAYA_UMBRELLA_OFFLINE_FIX", "true").lower() == "true"
+
+
+def is_reference_deferral_enabled():
+    """Check if the scanner opens files without their references and scans the references separately.
+
+    Returns:
+        bool: True if references are deferred, False otherwise.
+    """
+    return os.getenv("MAYA_UMBRELLA_SCAN_DEFER_REFERENCES", "false").lower() == "true"
+
+
+def get_daemon_address():
+    """Get the address the scan daemon listens on.
+
+    The environment variable MAYA_UMBRELLA_DAEMON_ADDRESS is either a Unix socket path or ``host:port``.
+    Defaults to a Unix socket under the log root, or a localhost TCP port if Unix sockets are not supported.
+
+    Returns:
+        str: The address of the scan daemon.
+    """
+    if hasattr(socket, "AF_UNIX"):
+        name = os.getenv("MAYA_UMBRELLA_LOG_NAME", PACKAGE_NAME)
+        default = os.path.join(get_log_root(), "{name}_daemon.sock".format(name=name))
+    else:
+        default = "127.0.0.1:{port}".format(port=DAEMON_PORT)
+    return os.getenv("MAYA_UMBRELLA_DAEMON_ADDRESS", default)
+
+
+def get_metrics_sinks():
+    """Get the names of the sinks metrics are exported to.
+
+    The environment variable MAYA_UMBRELLA_METRICS is a comma separated list of:
+    - prometheus: A Prometheus textfile collector file.
+    - jsonl: A JSON lines file, one line per export.
+
+    Returns:
+        list: The names of the enabled metrics sinks, empty if metrics are not exported.
+    """
+    names = [name.strip().lower() for name in os.getenv("MAYA_UMBRELLA_METRICS", "").split(",")]
+    return [name for name in names if name in ("prometheus", "jsonl")]
+
+
+def get_metrics_flush_interval():
+    """Get how long metrics counted in Maya callbacks wait before being exported.
+
+    The environment variable MAYA_UMBRELLA_METRICS_INTERVAL is in seconds, default is 60.
+
+    Returns:
+        float: The interval in seconds.
+    """
+    try:
+        return max(float(os.getenv("MAYA_UMBRELLA_METRICS_INTERVAL", "60")), 0)
+    except ValueError:
+        return 60.0
+
+
+def get_metrics_file(extension, per_process=False):
+    """Get the path of a metrics file under the log root.
+
+    Args:
+        extension (str): Extension of the metrics file, e.g. ".prom".
+        per_process (bool, optional): Whether each Maya process writes its own file. Defaults to False.
+
+    Returns:
+        str: The path of the metrics file.
+    """
+    name = os.getenv("MAYA_UMBRELLA_LOG_NAME", PACKAGE_NAME)
+    if per_process:
+        name = "{name}_{pid}".format(name=name, pid=os.getpid())
+    return os.path.join(get_log_root(), "{name}_metrics{extension}".format(name=name, extension=extension))
+
+
 def remove_virus_file_by_signature(file_path, signatures, output_file_path=None, auto_remove=True):
     """Remove virus content from a file by matching signatures.
 
@@ -245,7 +539,9 @@ def replace_content_by_signatures(content, signatures):
         str: The cleaned content.
     """
     for signature in signatures:
-        content = re.sub(*map(six.ensure_binary, [signature, "", content]))
+        signature = get_signature(signature)
+        if signature.search(content):
+            content = signature.remove(content)
     return content
 
 
@@ -279,11 +575,7 @@ def check_virus_by_signature(content, signatures=None):
     Returns:
         bool: True if a virus signature is found, False otherwise.
     """
-    signatures = signatures or FILE_VIRUS_SIGNATURES
-    for signature in signatures:
-        if re.search(*map(six.ensure_binary, [signature, content])):
-            return True
-    return False
+    return search_signatures(content, signatures or FILE_VIRUS_SIGNATURES)
 
 
 def get_backup_path(path, root_path=None):
@@ -4,16 +4,116 @@ import os
 from string import Template
 
 # Import local modules
+from maya_umbrella._vendor import six
 from maya_umbrella.filesystem import read_json
 from maya_umbrella.filesystem import this_root
 from maya_umbrella.maya_funs import maya_ui_language
 
 
+# Locale used when a key is missing from the current locale.
+FALLBACK_LOCALE = "en_US"
+
+# Translation texts of each loaded locale file, keyed by file path.
+_LOCALE_TEXTS = {}
+
+# Supported locales, keyed by file format.
+_LOCALES = {}
+
+# Compiled templates of the translation texts, keyed by file format, locale and key.
+_TEMPLATES = {}
+
+
+def get_locale_file(locale, file_format="json"):
+    """Get the path of the translation file of a locale.
+
+    Args:
+        locale (str): The locale.
+        file_format (str, optional): File format of the translation files. Defaults to "json".
+
+    Returns:
+        str: The path of the translation file.
+    """
+    return os.path.join(this_root(), "locales", "{locale}.{file_format}".format(locale=locale, file_format=file_format))
+
+
+def _load_locale_texts(locale, file_format):
+    # The texts are shared by all translators, they must not be modified.
+    path = get_locale_file(locale, file_format)
+    texts = _LOCALE_TEXTS.get(path)
+    if texts is None:
+        texts = read_json(path) if os.path.isfile(path) else {}
+        _LOCALE_TEXTS[path] = texts
+    return texts
+
+
+def get_supported_locales(file_format="json"):
+    """Get all supported locales, listing the translation files once per process.
+
+    Args:
+        file_format (str, optional): File format of the translation files. Defaults to "json".
+
+    Returns:
+        list: Sorted names of the supported locales.
+    """
+    if file_format not in _LOCALES:
+        pattern = get_locale_file("*", file_format)
+        _LOCALES[file_format] = tuple(
+            sorted(os.path.splitext(os.path.basename(path))[0] for path in glob.glob(pattern)))
+    return list(_LOCALES[file_format])
+
+
+def get_translator(file_format="json", default_locale=None):
+    """Get a translator, the translation files it reads are loaded once per process.
+
+    Each call returns a new translator, so changing its locale does not affect other callers.
+
+    Args:
+        file_format (str, optional): File format of the translation files. Defaults to "json".
+        default_locale (str, optional): Default locale to use for translations. Defaults to None,
+            which uses the MAYA_UMBRELLA_LANG environment variable or the Maya UI language.
+
+    Returns:
+        Translator: The translator.
+    """
+    return Translator(file_format, default_locale)
+
+
+@six.python_2_unicode_compatible
+class LazyTranslation(object):
+    """A translated message rendered only when it is converted to a string.
+
+    Passed as message to a logger, it is only rendered if the record is emitted.
+
+    Attributes:
+        translator (Translator): Translator object rendering the message.
+        key (str): The key to be translated.
+        kwargs (dict): Values replacing the placeholders in the translation text.
+    """
+
+    def __init__(self, translator, key, **kwargs):
+        """Initialize the LazyTranslation.
+
+        Args:
+            translator (Translator): Translator object rendering the message.
+            key (str): The key to be translated.
+            **kwargs: Arbitrary keyword arguments that are used to replace placeholders in the translation text.
+        """
+        self.translator = translator
+        self.key = key
+        self.kwargs = kwargs
+
+    def __str__(self):
+        return self.translator.translate(self.key, **self.kwargs)
+
+
 class Translator(object):
     """A class to handle translations for different locales.
 
+    Translation files are loaded lazily, the current locale on the first lookup
+    and the other locales only when a key is missing from the current locale.
+
     Attributes:
-        data (dict): Dictionary containing translation data for different locales.
+        file_format (str): File format of the translation files.
         locale (str): The current locale.
     """
 
@@ -26,16 +126,16 @@ class Translator(object):
             which uses the MAYA_UMBRELLA_LANG environment variable or the Maya UI language.
         """
         default_locale = default_locale or os.getenv("MAYA_UMBRELLA_LANG", maya_ui_language())
-        self.data = {}
+        self.file_format = file_format
         self.locale = default_locale
-        translations_folder = os.path.join(this_root(), "locales")
 
-        # get list of files with specific extensions
-        files = glob.glob(os.path.join(translations_folder, "*.{file_format}".format(file_format=file_format)))
-        for fil in files:
-            # get the name of the file without extension, will be used as locale name
-            loc = os.path.splitext(os.path.basename(fil))[0]
-            self.data[loc] = read_json(fil)
+    def get_locales(self):
+        """Get all supported locales.
+
+        Returns:
+            list: Sorted names of the supported locales.
+        """
+        return get_supported_locales(self.file_format)
 
     def set_locale(self, locale):
         """Set the current locale.
@@ -46,7 +146,7 @@ class Translator(object):
         Raises:
             ValueError: If the provided locale is not supported.
         """
-        if locale in self.data:
+        if locale in get_supported_locales(self.file_format):
             self.locale = locale
         else:
             raise ValueError("Invalid locale: {loc}".format(loc=locale))
@@ -67,10 +167,47 @@ class Translator(object):
             **kwargs: Arbitrary keyword arguments that are used to replace placeholders in the translation text.
 
         Returns:
-            str: The translated text.
+            str: The translated text, or the key if no locale translates it.
         """
-        # return the key instead of translation text if locale is not supported
-        if self.locale not in self.data:
+        template = self.get_template(key)
+        if template is None:
             return key
-        text = self.data[self.locale].get(key, key)
-        return Template(text).safe_substitute(**kwargs)
+        return template.safe_substitute(**kwargs)
+
+    def get_template(self, key):
+        """Get the template of a key, falling back to the other locales on a miss.
+
+        Args:
+            key (str): The key to be translated.
+
+        Returns:
+            Template: The template of the translation text, shared by the process, or None if no locale
+                translates the key.
+        """
+        cache_key = (self.file_format, self.locale, key)
+        if cache_key in _TEMPLATES:
+            return _TEMPLATES[cache_key]
+        text = _load_locale_texts(self.locale, self.file_format).get(key)
+        if text is None:
+            fallback_locales = [FALLBACK_LOCALE] + [
+                locale for locale in self.get_locales() if locale != FALLBACK_LOCALE]
+            for locale in fallback_locales:
+                if locale != self.locale:
+                    text = _load_locale_texts(locale, self.file_format).get(key)
+                    if text is not None:
+                        break
+        template = None if text is None else Template(text)
+        _TEMPLATES[cache_key] = template
+        return template
+
+    def lazy(self, key, **kwargs):
+        """Translate a text only when it is rendered, e.g. when a log record is emitted.
+
+        Args:
+            key (str): The key to be translated.
+            **kwargs: Arbitrary keyword arguments that are used to replace placeholders in the translation text.
+
+        Returns:
+            LazyTranslation: The message rendering the translated text.
+        """
+        return LazyTranslation(self, key, **kwargs)
@@ -5,15 +5,101 @@ from logging import handlers
 import os
 
 # Import local modules
+from maya_umbrella._vendor.six.moves import queue
 from maya_umbrella.constants import LOG_FORMAT
 from maya_umbrella.constants import LOG_MAX_BYTES
 from maya_umbrella.constants import PACKAGE_NAME
 from maya_umbrella.filesystem import get_log_file
+from maya_umbrella.filesystem import get_log_queue_policy
+from maya_umbrella.filesystem import get_log_queue_size
+from maya_umbrella.filesystem import is_async_logging_enabled
+
+
+# Listeners writing the queued records of each logger, keyed by logger name.
+LOG_LISTENERS = {}
+
+# QueueHandler and QueueListener are not available in Python 2.
+if hasattr(handlers, "QueueHandler"):
+
+    class BoundedQueueHandler(handlers.QueueHandler):
+        """A queue handler that drops records or blocks when its queue is full.
+
+        Attributes:
+            policy (str): Either "drop" or "block".
+            dropped (int): Number of records dropped because the queue was full.
+        """
+
+        def __init__(self, queue_, policy="drop"):
+            """Initialize the BoundedQueueHandler.
+
+            Args:
+                queue_ (Queue): The bounded queue records are put into.
+                policy (str, optional): Either "drop" or "block". Defaults to "drop".
+            """
+            super(BoundedQueueHandler, self).__init__(queue_)  # noqa: UP008
+            self.policy = policy
+            self.dropped = 0
+
+        def enqueue(self, record):
+            if self.policy == "block":
+                self.queue.put(record)
+                return
+            try:
+                self.queue.put_nowait(record)
+            except queue.Full:
+                self.dropped += 1
+
+    class BoundedQueueListener(handlers.QueueListener):
+        """A queue listener that can be stopped while its bounded queue is full."""
+
+        def enqueue_sentinel(self):
+            # The listener thread makes room for the sentinel, put_nowait would raise queue.Full.
+            self.queue.put(self._sentinel)
+
+else:
+    BoundedQueueHandler = None
+    BoundedQueueListener = None
+
+
+def setup_async_handler(logger, handler):
+    """Write the records of a logger with a handler running on a background thread.
+
+    Args:
+        logger (logging.Logger): The logger to set up.
+        handler (logging.Handler): The handler writing the records.
+
+    Returns:
+        bool: True if the handler runs on a background thread, False if asynchronous logging is not supported.
+    """
+    if BoundedQueueHandler is None:
+        return False
+    queue_handler = BoundedQueueHandler(queue.Queue(get_log_queue_size()), get_log_queue_policy())
+    listener = BoundedQueueListener(queue_handler.queue, handler, respect_handler_level=True)
+    listener.start()
+    logger.addHandler(queue_handler)
+    LOG_LISTENERS[logger.name] = listener
+    return True
+
+
+def flush_logger(logger):
+    """Write all records queued by a logger in asynchronous mode.
+
+    Args:
+        logger (logging.Logger): The logger to flush.
+    """
+    listener = LOG_LISTENERS.get(logger.name)
+    if listener:
+        # Stopping the listener processes the remaining records.
+        listener.stop()
+        listener.start()
 
 
 def setup_logger(logger=None, logfile=None, log_level=None):
     """Set up the logger with the specified log file and log level.
 
+    Records are written by a background thread if the environment variable
+    MAYA_UMBRELLA_LOG_ASYNC is set to true.
+
     Args:
         logger (logging.Logger, optional): The logger to set up. Defaults to the logger for the package.
         logfile (str, optional): The path to the log file. Defaults to the log file returned by `get_log_file()`.
@@ -34,5 +120,6 @@ def setup_logger(logger=None, logfile=None, log_level=None):
             maxBytes=LOG_MAX_BYTES,
         )
         filehandler.setFormatter(Formatter(LOG_FORMAT))
-        logger.addHandler(filehandler)
+        if not (is_async_logging_enabled() and setup_async_handler(logger, filehandler)):
+            logger.addHandler(filehandler)
     return logger
@@ -0,0 +1,179 @@
+"""Sweep project trees incrementally.
+
+The manifest records, for each scanned file, the stat of the file when it was
+scanned (size, modification time and inode), its verdict and the version of the
+signatures it was scanned with. A sweep walks the tree, stats each scene file
+and only submits the files that are new, changed, failed to scan last time or
+were scanned with other signatures. Files unchanged since the last sweep cost
+one stat call.
+
+"""
+
+# Import built-in modules
+import json
+import os
+
+# Import local modules
+from maya_umbrella.constants import VERDICT_ERROR
+from maya_umbrella.filesystem import read_json
+from maya_umbrella.filesystem import write_file
+from maya_umbrella.offline_scanner import MAYA_ASCII_EXTENSION
+from maya_umbrella.offline_scanner import MAYA_BINARY_EXTENSION
+from maya_umbrella.verdict_cache import get_signatures_digest
+from maya_umbrella.verdict_cache import normalize_path
+from maya_umbrella.verdict_cache import strip_copy_number
+
+
+MAYA_FILE_EXTENSIONS = (MAYA_ASCII_EXTENSION, MAYA_BINARY_EXTENSION)
+
+
+def get_manifest_stat(path):
+    """Get the stat of a file compared between sweeps.
+
+    Args:
+        path (str): Path to the file.
+
+    Returns:
+        list: The size, modification time and inode, None if the file does not exist.
+    """
+    try:
+        stat = os.stat(strip_copy_number(path))
+    except (OSError, IOError):  # noqa: UP024
+        return None
+    return [stat.st_size, stat.st_mtime, stat.st_ino]
+
+
+def iter_maya_files(root, skip_dirs=None):
+    """Walk a tree for Maya scene files.
+
+    Args:
+        root (str): The root folder.
+        skip_dirs (list, optional): Names or paths of folders not to walk into, e.g. backup folders.
+            Defaults to None.
+
+    Yields:
+        str: Path of each Maya scene file.
+    """
+    skip_dirs = skip_dirs or []
+    skip_names = {name for name in skip_dirs if not os.path.isabs(name)}
+    skip_paths = {normalize_path(path) for path in skip_dirs if os.path.isabs(path)}
+    for folder, dir_names, file_names in os.walk(root):
+        dir_names[:] = sorted(
+            name for name in dir_names
+            if name not in skip_names and normalize_path(os.path.join(folder, name)) not in skip_paths
+        )
+        for file_name in sorted(file_names):
+            if os.path.splitext(file_name)[1].lower() in MAYA_FILE_EXTENSIONS:
+                yield os.path.join(folder, file_name)
+
+
+class ScanManifest(object):
+    """The stat and verdict of each file at its last scan.
+
+    Entries are persisted as compact ``[size, mtime, inode, verdict, signatures]`` lists.
+
+    Attributes:
+        path (str): Path to the JSON file the manifest is persisted to, None to keep it in memory.
+        signatures (str): The version of the current signatures.
+    """
+
+    def __init__(self, path=None):
+        """Initialize the ScanManifest.
+
+        Args:
+            path (str, optional): Path to the JSON file the manifest is persisted to. Defaults to None,
+                which keeps the manifest in memory.
+        """
+        self.path = path
+        self.signatures = get_signatures_digest()
+        self._entries = None
+        self._dirty = False
+
+    def __len__(self):
+        return len(self.entries)
+
+    @property
+    def entries(self):
+        """Return the manifest entries, loading them from disk on first access.
+
+        Returns:
+            dict: Dictionary mapping normalized paths to their entry.
+        """
+        if self._entries is None:
+            self._entries = {}
+            if self.path and os.path.isfile(self.path):
+                try:
+                    self._entries = read_json(self.path).get("files", {})
+                except ValueError:
+                    pass
+        return self._entries
+
+    def get_verdict(self, path):
+        """Get the verdict of a file at its last scan.
+
+        Args:
+            path (str): Path to the file.
+
+        Returns:
+            str: The verdict, None if the file was never scanned.
+        """
+        entry = self.entries.get(normalize_path(path))
+        return entry[3] if entry else None
+
+    def needs_scan(self, path, stat=None):
+        """Check if a file has to be scanned again.
+
+        Args:
+            path (str): Path to the file.
+            stat (list, optional): The stat of the file. Defaults to None, which stats the file.
+
+        Returns:
+            bool: True if the file is new, changed, failed to scan or was scanned with other signatures.
+        """
+        entry = self.entries.get(normalize_path(path))
+        if not entry or entry[3] == VERDICT_ERROR or entry[4] != self.signatures:
+            return True
+        return entry[:3] != (stat or get_manifest_stat(path))
+
+    def record(self, path, verdict):
+        """Record the verdict of a file, with its stat after the scan.
+
+        Args:
+            path (str): Path to the file.
+            verdict (str): The verdict of the file.
+        """
+        stat = get_manifest_stat(path)
+        if stat is None:
+            return
+        self.entries[normalize_path(path)] = stat + [verdict, self.signatures]
+        self._dirty = True
+
+    def iter_changed_files(self, root, skip_dirs=None):
+        """Walk a tree for the Maya scene files to scan, forgetting the files removed from it.
+
+        Args:
+            root (str): The root folder.
+            skip_dirs (list, optional): Names or paths of folders not to walk into. Defaults to None.
+
+        Yields:
+            str: Path of each file to scan.
+        """
+        prefix = os.path.join(normalize_path(root), "")
+        seen = set()
+        for path in iter_maya_files(root, skip_dirs):
+            seen.add(normalize_path(path))
+            if self.needs_scan(path):
+                yield path
+        for key in [key for key in self.entries if key.startswith(prefix) and key not in seen]:
+            del self.entries[key]
+            self._dirty = True
+
+    def save(self):
+        """Persist the manifest to disk if it changed."""
+        if not self.path or not self._dirty:
+            return
+        try:
+            write_file(self.path, json.dumps({"files": self.entries}, separators=(",", ":")))
+        except (OSError, IOError):  # noqa: UP024
+            return
+        self._dirty = False
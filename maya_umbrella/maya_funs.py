@@ -11,6 +11,7 @@ try:
     import maya.cmds as cmds
     import maya.mel as mel
     import maya.standalone as maya_standalone
+    import maya.utils as maya_utils
 except ImportError:
     # Backward compatibility to support test in uinstalled maya.
     try:
@@ -23,10 +24,12 @@ except ImportError:
     om = MagicMock()
     mel = MagicMock()
     maya_standalone = MagicMock()
+    maya_utils = MagicMock()
 
 # Import built-in modules
 from contextlib import contextmanager
 from functools import wraps
+import re
 
 
 def is_maya_standalone():
@@ -68,6 +71,15 @@ def get_reference_file_by_node(node_name):
         return ""
 
 
+def get_reference_files():
+    """Get the files referenced by the open scene.
+
+    Returns:
+        list: Paths of the top-level reference files.
+    """
+    return cmds.file(query=True, reference=True) or []
+
+
 def get_attr_value(node_name, attr_name):
     """Get the value of an attribute of a node.
 
@@ -84,6 +96,77 @@ def get_attr_value(node_name, attr_name):
         return None
 
 
+def get_suspicious_nodes():
+    """Get the script and network nodes of the current scene with their code, as checked by the vaccines.
+
+    Nodes from reference files are left out, they are recorded with their own file.
+    Only the code of script nodes is checked, network nodes are checked by name.
+
+    Returns:
+        list: (node type, node name, code values) tuples, the code missing on a node is left out.
+    """
+    nodes = []
+    for node_type in ("script", "network"):
+        node_names = cmds.ls(type=node_type)
+        if not isinstance(node_names, (list, tuple)):
+            continue
+        for node_name in node_names:
+            if check_reference_node_exists(node_name):
+                continue
+            values = []
+            if node_type == "script":
+                values = [
+                    value for value in (
+                        get_attr_value(node_name, attr_name) for attr_name in ("before", "after", "notes"))
+                    if value
+                ]
+            nodes.append((node_type, node_name, values))
+    return nodes
+
+
+def get_dependency_nodes(node_types):
+    """Get the existing nodes of some types as MObjects.
+
+    Args:
+        node_types (iterable): The node types.
+
+    Returns:
+        list: MObject of each node.
+    """
+    node_names = cmds.ls(type=list(node_types))
+    if not isinstance(node_names, (list, tuple)):
+        return []
+    selection = om.MSelectionList()
+    for node_name in node_names:
+        selection.add(node_name)
+    return [selection.getDependNode(index) for index in range(selection.length())]
+
+
+def get_node_name(node):
+    """Get the name of a node from its MObject.
+
+    Args:
+        node (MObject): The node.
+
+    Returns:
+        str: Name of the node.
+    """
+    return om.MFnDependencyNode(node).name()
+
+
+def parse_script_job_id(script_job):
+    """Parse the id of a script job listed by `cmds.scriptJob(listJobs=True)`.
+
+    Args:
+        script_job (str): The script job, e.g. ``"123: event=['SceneSaved', 'leukocyte.antivirus()']"``.
+
+    Returns:
+        int: The id of the script job, None if it cannot be parsed.
+    """
+    match = re.match(r"^(\d+):", script_job)
+    return int(match.group(1)) if match else None
+
+
 def maya_ui_language():
     """Get the language of the Maya user interface.
 
@@ -120,13 +203,15 @@ def block_prompt(func):
 
 
 @block_prompt
-def open_maya_file(maya_file):
+def open_maya_file(maya_file, load_references=True):
     """Open a Maya file.
 
     Args:
         maya_file (str): Path to the Maya file.
+        load_references (bool, optional): Whether to load the references of the file. Defaults to True.
     """
-    cmds.file(maya_file, open=True, force=True, ignoreVersion=True, executeScriptNodes=False)
+    options = {} if load_references else {"loadReferenceDepth": "none"}
+    cmds.file(maya_file, open=True, force=True, ignoreVersion=True, executeScriptNodes=False, **options)
 
 
 @block_prompt
@@ -0,0 +1,365 @@
+"""Counters and histograms exported for fleet-wide monitoring.
+
+Metrics are always counted in memory and exported by `flush_metrics` to the
+sinks enabled with the environment variable MAYA_UMBRELLA_METRICS, more sinks
+can be added with `add_metrics_sink`. Maya callbacks use `schedule_flush_metrics`
+instead, which exports in the background at most once per interval and at exit.
+
+"""
+
+# Import built-in modules
+import atexit
+import io
+import json
+import os
+import socket
+import threading
+import time
+
+# Import local modules
+from maya_umbrella._vendor import six
+from maya_umbrella.constants import PACKAGE_NAME
+from maya_umbrella.filesystem import get_metrics_file
+from maya_umbrella.filesystem import get_metrics_flush_interval
+from maya_umbrella.filesystem import get_metrics_sinks
+from maya_umbrella.filesystem import write_file
+
+
+# Upper bounds in seconds of the latency histogram buckets.
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+def _get_key(name, labels):
+    return name, tuple(sorted(labels.items()))
+
+
+class Histogram(object):
+    """A histogram of observed values with cumulative buckets.
+
+    Attributes:
+        buckets (tuple): Upper bounds of the buckets.
+        counts (list): Number of observations less than or equal to each bucket bound.
+        sum (float): Sum of all observed values.
+        count (int): Number of observations.
+    """
+
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        """Initialize the Histogram.
+
+        Args:
+            buckets (tuple, optional): Upper bounds of the buckets. Defaults to DEFAULT_BUCKETS.
+        """
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        """Add an observation.
+
+        Args:
+            value (float): The observed value.
+        """
+        for index, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[index] += 1
+        self.sum += value
+        self.count += 1
+
+    def to_dict(self):
+        """Get the histogram as a dictionary.
+
+        Returns:
+            dict: The bucket counts, sum and count.
+        """
+        return {
+            "buckets": dict(zip([str(bound) for bound in self.buckets], self.counts)),
+            "sum": self.sum,
+            "count": self.count,
+        }
+
+
+class MetricsRegistry(object):
+    """Thread safe counters and histograms identified by name and labels."""
+
+    def __init__(self):
+        """Initialize the MetricsRegistry."""
+        self._counters = {}
+        self._histograms = {}
+        self._lock = threading.Lock()
+
+    def inc(self, name, value=1, **labels):
+        """Increment a counter.
+
+        Args:
+            name (str): Name of the counter.
+            value (int, optional): Amount to add. Defaults to 1.
+            **labels: Labels of the counter.
+        """
+        key = _get_key(name, labels)
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + value
+
+    def observe(self, name, value, **labels):
+        """Add an observation to a histogram.
+
+        Args:
+            name (str): Name of the histogram.
+            value (float): The observed value.
+            **labels: Labels of the histogram.
+        """
+        key = _get_key(name, labels)
+        with self._lock:
+            if key not in self._histograms:
+                self._histograms[key] = Histogram()
+            self._histograms[key].observe(value)
+
+    def get_counter(self, name, **labels):
+        """Get the value of a counter.
+
+        Args:
+            name (str): Name of the counter.
+            **labels: Labels of the counter.
+
+        Returns:
+            int: The value of the counter.
+        """
+        return self._counters.get(_get_key(name, labels), 0)
+
+    def get_histogram(self, name, **labels):
+        """Get a histogram.
+
+        Args:
+            name (str): Name of the histogram.
+            **labels: Labels of the histogram.
+
+        Returns:
+            Histogram: The histogram, or None if nothing was observed.
+        """
+        return self._histograms.get(_get_key(name, labels))
+
+    def collect(self):
+        """Get a consistent copy of all metrics.
+
+        Returns:
+            tuple: Lists of (name, labels, value) counters and (name, labels, Histogram) histograms.
+        """
+        with self._lock:
+            counters = [(name, dict(labels), value) for (name, labels), value in sorted(self._counters.items())]
+            histograms = []
+            for (name, labels), histogram in sorted(self._histograms.items(), key=lambda item: item[0]):
+                copy = Histogram(histogram.buckets)
+                copy.counts = list(histogram.counts)
+                copy.sum = histogram.sum
+                copy.count = histogram.count
+                histograms.append((name, dict(labels), copy))
+        return counters, histograms
+
+    def clear(self):
+        """Remove all metrics."""
+        with self._lock:
+            self._counters = {}
+            self._histograms = {}
+
+
+class MetricsSink(object):
+    """Base class of the destinations metrics are exported to."""
+
+    def write(self, registry):
+        """Export all metrics of a registry.
+
+        Args:
+            registry (MetricsRegistry): The metrics to export.
+
+        Raises:
+            NotImplementedError: This method must be implemented in the derived classes.
+        """
+        raise NotImplementedError
+
+
+def _format_labels(labels):
+    if not labels:
+        return ""
+    items = ",".join(
+        '{key}="{value}"'.format(key=key, value=six.text_type(value).replace("\\", "\\\\").replace('"', '\\"'))
+        for key, value in sorted(labels.items())
+    )
+    return "{" + items + "}"
+
+
+class PrometheusTextfileSink(MetricsSink):
+    """Write metrics in the Prometheus text format for the node exporter textfile collector.
+
+    Each process writes its own file, every series has a ``pid`` label so that
+    the files of concurrent Maya sessions do not export the same series.
+
+    Attributes:
+        path (str): Path to the ``.prom`` file, rewritten atomically on each export.
+        prefix (str): Prefix of all metric names.
+    """
+
+    def __init__(self, path=None, prefix=PACKAGE_NAME):
+        """Initialize the PrometheusTextfileSink.
+
+        Args:
+            path (str, optional): Path to the ``.prom`` file. Defaults to None, which writes one file per process
+                under the log root.
+            prefix (str, optional): Prefix of all metric names. Defaults to the package name.
+        """
+        self.path = path or get_metrics_file(".prom", per_process=True)
+        self.prefix = prefix
+
+    def format(self, registry):
+        """Format all metrics of a registry in the Prometheus text format.
+
+        Args:
+            registry (MetricsRegistry): The metrics to format.
+
+        Returns:
+            str: The metrics in the Prometheus text format.
+        """
+        lines = []
+        typed = set()
+        pid = str(os.getpid())
+        counters, histograms = registry.collect()
+        for name, labels, value in counters:
+            labels = dict(labels, pid=pid)
+            name = "{prefix}_{name}".format(prefix=self.prefix, name=name)
+            if name not in typed:
+                typed.add(name)
+                lines.append("# TYPE {name} counter".format(name=name))
+            lines.append("{name}{labels} {value}".format(name=name, labels=_format_labels(labels), value=value))
+        for name, labels, histogram in histograms:
+            labels = dict(labels, pid=pid)
+            name = "{prefix}_{name}".format(prefix=self.prefix, name=name)
+            if name not in typed:
+                typed.add(name)
+                lines.append("# TYPE {name} histogram".format(name=name))
+            for bound, count in zip(histogram.buckets, histogram.counts):
+                bucket_labels = dict(labels, le=repr(float(bound)))
+                lines.append("{name}_bucket{labels} {count}".format(
+                    name=name, labels=_format_labels(bucket_labels), count=count))
+            lines.append("{name}_bucket{labels} {count}".format(
+                name=name, labels=_format_labels(dict(labels, le="+Inf")), count=histogram.count))
+            lines.append("{name}_sum{labels} {value}".format(
+                name=name, labels=_format_labels(labels), value=repr(histogram.sum)))
+            lines.append("{name}_count{labels} {value}".format(
+                name=name, labels=_format_labels(labels), value=histogram.count))
+        return "\n".join(lines) + "\n"
+
+    def write(self, registry):
+        """Rewrite the ``.prom`` file with all metrics of a registry.
+
+        Args:
+            registry (MetricsRegistry): The metrics to export.
+        """
+        write_file(self.path, self.format(registry))
+
+
+class JsonLinesSink(MetricsSink):
+    """Append a snapshot of all metrics as one JSON line per export.
+
+    Attributes:
+        path (str): Path to the JSON lines file.
+    """
+
+    def __init__(self, path=None):
+        """Initialize the JsonLinesSink.
+
+        Args:
+            path (str, optional): Path to the JSON lines file. Defaults to None, which uses the file under
+                the log root.
+        """
+        self.path = path or get_metrics_file(".jsonl")
+
+    def write(self, registry):
+        """Append a snapshot of all metrics of a registry.
+
+        Args:
+            registry (MetricsRegistry): The metrics to export.
+        """
+        counters, histograms = registry.collect()
+        data = {
+            "time": time.time(),
+            "host": socket.gethostname(),
+            "pid": os.getpid(),
+            "counters": [{"name": name, "labels": labels, "value": value} for name, labels, value in counters],
+            "histograms": [
+                dict(histogram.to_dict(), name=name, labels=labels) for name, labels, histogram in histograms
+            ],
+        }
+        with io.open(self.path, "a", encoding="utf-8") as stream:  # noqa: UP020
+            stream.write(six.ensure_text(json.dumps(data, sort_keys=True)) + u"\n")
+
+
+METRICS = MetricsRegistry()
+SINK_TYPES = {
+    "prometheus": PrometheusTextfileSink,
+    "jsonl": JsonLinesSink,
+}
+# Sinks added by studios in addition to the ones enabled with MAYA_UMBRELLA_METRICS.
+_EXTRA_SINKS = []
+# The pending background export, and whether metrics are exported at exit.
+_SCHEDULE = {"timer": None, "at_exit": False}
+_SCHEDULE_LOCK = threading.Lock()
+
+
+def add_metrics_sink(sink):
+    """Export the metrics to an additional sink.
+
+    Args:
+        sink (MetricsSink): The sink to add.
+    """
+    _EXTRA_SINKS.append(sink)
+
+
+def get_sinks():
+    """Get all sinks metrics are exported to.
+
+    Returns:
+        list: The sinks enabled with MAYA_UMBRELLA_METRICS followed by the added sinks.
+    """
+    return [SINK_TYPES[name]() for name in get_metrics_sinks()] + _EXTRA_SINKS
+
+
+def flush_metrics(logger=None):
+    """Export all metrics to the enabled sinks.
+
+    Args:
+        logger (Logger, optional): Logger object used to report export errors.
+    """
+    for sink in get_sinks():
+        try:
+            sink.write(METRICS)
+        except (OSError, IOError) as e:  # noqa: UP024
+            if logger:
+                logger.debug("Error exporting metrics: %s", e)
+
+
+def _flush_scheduled_metrics(logger):
+    with _SCHEDULE_LOCK:
+        _SCHEDULE["timer"] = None
+    flush_metrics(logger)
+
+
+def schedule_flush_metrics(logger=None):
+    """Export all metrics in the background once the flush interval has passed, and at exit.
+
+    Calls made while an export is pending are merged into it, so that callbacks
+    do not write files.
+
+    Args:
+        logger (Logger, optional): Logger object used to report export errors.
+    """
+    if not get_metrics_sinks() and not _EXTRA_SINKS:
+        return
+    with _SCHEDULE_LOCK:
+        if not _SCHEDULE["at_exit"]:
+            atexit.register(flush_metrics, logger)
+            _SCHEDULE["at_exit"] = True
+        if _SCHEDULE["timer"] is not None:
+            return
+        timer = threading.Timer(get_metrics_flush_interval(), _flush_scheduled_metrics, args=(logger,))
+        timer.daemon = True
+        _SCHEDULE["timer"] = timer
+        timer.start()
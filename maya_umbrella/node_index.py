@@ -0,0 +1,133 @@
+# Import local modules
+from maya_umbrella.maya_funs import get_dependency_nodes
+from maya_umbrella.maya_funs import get_node_name
+from maya_umbrella.maya_funs import om
+
+
+class SuspiciousNodeIndex(object):
+    """A live index of the script and network nodes that need to be scanned.
+
+    Nodes are marked dirty when they are created, renamed or when one of their
+    attributes is set, and marked clean once a scan found nothing on them.
+
+    Attributes:
+        node_types (tuple): Node types tracked by the index.
+        active (bool): Whether the DG callbacks are registered.
+        needs_full_scan (bool): Whether the next collect must scan all nodes.
+    """
+
+    node_types = ("script", "network")
+
+    def __init__(self):
+        """Initialize the SuspiciousNodeIndex."""
+        self.active = False
+        self.needs_full_scan = True
+        self._dirty_nodes = set()
+        self._callback_ids = []
+        self._node_callback_ids = {}
+
+    @property
+    def dirty_nodes(self):
+        """Return the nodes that changed since they were last scanned.
+
+        Returns:
+            set: Set of node names.
+        """
+        return set(self._dirty_nodes)
+
+    def setup(self):
+        """Register the DG callbacks, the next collect scans all nodes."""
+        if self.active:
+            return
+        for node_type in self.node_types:
+            self._callback_ids.append(om.MDGMessage.addNodeAddedCallback(self._node_added, node_type))
+            self._callback_ids.append(om.MDGMessage.addNodeRemovedCallback(self._node_removed, node_type))
+        self.active = True
+        self.needs_full_scan = True
+
+    def stop(self):
+        """Remove all callbacks registered by the index."""
+        for callback_ids in self._node_callback_ids.values():
+            self._callback_ids.extend(callback_ids)
+        for callback_id in self._callback_ids:
+            try:
+                om.MMessage.removeCallback(callback_id)
+            except RuntimeError:
+                pass
+        self._callback_ids = []
+        self._node_callback_ids = {}
+        self._dirty_nodes = set()
+        self.active = False
+        self.needs_full_scan = True
+
+    def mark_dirty(self, node):
+        """Mark a node to be scanned by the next collect.
+
+        Args:
+            node (str): Name of the node.
+        """
+        self._dirty_nodes.add(node)
+
+    def mark_scanned(self, scanned_nodes, infected_nodes):
+        """Mark nodes as scanned, infected nodes stay dirty until they are fixed.
+
+        After a full scan, the attributes of the nodes that existed before the
+        index was set up are watched as well.
+
+        Args:
+            scanned_nodes (iterable): Names of the scanned nodes.
+            infected_nodes (iterable): Names of the infected nodes.
+        """
+        self._dirty_nodes.difference_update(scanned_nodes)
+        self._dirty_nodes.update(infected_nodes)
+        if self.active and self.needs_full_scan:
+            for node in get_dependency_nodes(self.node_types):
+                self._watch_node(node)
+            self.needs_full_scan = False
+
+    def request_full_scan(self):
+        """Make the next collect scan all nodes."""
+        self.needs_full_scan = True
+
+    def filter_nodes(self, nodes):
+        """Filter out the nodes that did not change since they were last scanned.
+
+        Args:
+            nodes (list): List of node names.
+
+        Returns:
+            list: List of node names to scan.
+        """
+        if not self.active or self.needs_full_scan:
+            return nodes
+        return [node for node in nodes if node in self._dirty_nodes]
+
+    def _node_added(self, node, *args):
+        self.mark_dirty(get_node_name(node))
+        self._watch_node(node)
+
+    def _watch_node(self, node):
+        handle = om.MObjectHandle(node).hashCode()
+        if handle in self._node_callback_ids:
+            return
+        self._node_callback_ids[handle] = [
+            om.MNodeMessage.addAttributeChangedCallback(node, self._attribute_changed),
+            om.MNodeMessage.addNameChangedCallback(node, self._name_changed),
+        ]
+
+    def _node_removed(self, node, *args):
+        self._dirty_nodes.discard(get_node_name(node))
+        handle = om.MObjectHandle(node).hashCode()
+        for callback_id in self._node_callback_ids.pop(handle, []):
+            try:
+                om.MMessage.removeCallback(callback_id)
+            except RuntimeError:
+                pass
+
+    def _attribute_changed(self, message, plug, *args):
+        if message & om.MNodeMessage.kAttributeSet:
+            self.mark_dirty(get_node_name(plug.node()))
+
+    def _name_changed(self, node, previous_name, *args):
+        self._dirty_nodes.discard(previous_name)
+        self.mark_dirty(get_node_name(node))
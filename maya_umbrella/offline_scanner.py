@@ -0,0 +1,478 @@
+"""Scan Maya scene files on disk without opening them in Maya.
+
+Maya ASCII files are read statement by statement and only the string attributes
+of ``script`` and ``network`` nodes are matched against the virus signatures.
+Maya binary files are scanned chunk by chunk for the same signatures.
+Infected Maya ASCII files can be fixed by removing the infected nodes.
+
+"""
+
+# Import built-in modules
+from collections import namedtuple
+import os
+import re
+import time
+
+# Import local modules
+from maya_umbrella._vendor import six
+from maya_umbrella.filesystem import write_file
+from maya_umbrella.metrics import METRICS
+from maya_umbrella.signature_engine import get_signature
+from maya_umbrella.signature_engine import get_signature_time_limit
+from maya_umbrella.signatures import SCENE_SCRIPT_NODE_SIGNATURES
+from maya_umbrella.signatures import zei_jian_kang_sig2
+
+
+MAYA_ASCII_EXTENSION = ".ma"
+MAYA_BINARY_EXTENSION = ".mb"
+
+MAYA_ASCII_HEADER = b"//Maya ASCII"
+# Maya binary files are IFF files, FOR8 is the 64-bit variant.
+MAYA_BINARY_MAGICS = (b"FOR4", b"FOR8")
+FILE_TYPE_ASCII = "ascii"
+FILE_TYPE_BINARY = "binary"
+# Number of bytes read to classify a file.
+SNIFF_SIZE = 4096
+
+# Reasons files are skipped before opening them in Maya.
+SKIP_EMPTY = "empty"
+SKIP_NOT_MAYA_SCENE = "not_maya_scene"
+SKIP_UNREADABLE = "unreadable"
+
+# Node types that can carry virus payloads in a scene file.
+SUSPICIOUS_NODE_TYPES = ("script", "network")
+# Attributes of script nodes holding code, the ones the vaccines check: before, after and notes.
+SCRIPT_NODE_CODE_ATTRIBUTES = (b".b", b".before", b".a", b".after", b".nts", b".notes")
+
+# Chunk size used when scanning Maya binary files.
+BINARY_CHUNK_SIZE = 1024 * 1024
+# Bytes carried over between two chunks so that matches spanning a boundary are not missed.
+BINARY_CHUNK_OVERLAP = 64 * 1024
+
+MayaAsciiNode = namedtuple("MayaAsciiNode", ["node_type", "name", "values"])
+MayaFileHeader = namedtuple("MayaFileHeader", ["file_type", "requires", "reason"])
+
+_CREATE_NODE_PATTERN = re.compile(br"^createNode\s+(\w+)\s.*?-n\s+\"([^\"]+)\"")
+_STRING_LITERAL_PATTERN = re.compile(br"\"((?:[^\"\\]|\\.)*)\"")
+_STRING_TYPE_FLAG = b'-type "string"'
+_ESCAPE_PATTERN = re.compile(br"\\(.)")
+_ESCAPE_CHARS = {b"n": b"\n", b"t": b"\t", b"r": b"\r"}
+_CODE_CHUNK_PATTERN = re.compile(r"^codeChunk\d+$")
+_FILE_COMMAND = b"file"
+_CREATE_NODE_COMMAND = b"createNode"
+_REFERENCE_FLAG = b"-r"
+_REQUIRES_COMMAND = b"requires"
+# Statements after the nodes which refer to nodes by name.
+_CONNECTION_COMMANDS = (b"connectAttr", b"disconnectAttr")
+_SELECT_COMMAND = b"select"
+
+_SCENE_SIGNATURES = [
+    (sig.name, get_signature(sig.signature)) for sig in SCENE_SCRIPT_NODE_SIGNATURES
+]
+# Signatures that are only meaningful inside a script node payload, and would
+# match unrelated data such as file paths when applied to raw binary data.
+_BINARY_SCENE_SIGNATURES = [
+    (name, signature) for name, signature in _SCENE_SIGNATURES
+    if signature is not get_signature(zei_jian_kang_sig2.signature)
+]
+
+
+class ScanTimeout(Exception):
+    """Raised when a scan does not finish before its deadline."""
+
+
+def _check_deadline(deadline):
+    if deadline is not None and time.time() > deadline:
+        raise ScanTimeout()
+
+
+def _parse_requires(header):
+    requires = []
+    for line in header.splitlines():
+        if line.startswith(_CREATE_NODE_COMMAND):
+            break
+        if not line.startswith(_REQUIRES_COMMAND) or line.split()[1:2] == [b"maya"]:
+            continue
+        literals = [six.ensure_str(literal) for literal in _STRING_LITERAL_PATTERN.findall(line)]
+        if len(literals) >= 2:
+            requires.append((literals[-2], literals[-1]))
+    return requires
+
+
+def sniff_maya_file(path, size=SNIFF_SIZE):
+    """Classify a file from its first bytes, without opening it in Maya.
+
+    The plugins required by Maya ASCII files are parsed from the same bytes.
+
+    Args:
+        path (str): Path to the file.
+        size (int, optional): Number of bytes read. Defaults to SNIFF_SIZE.
+
+    Returns:
+        MayaFileHeader: The file type ("ascii", "binary" or None), the (plugin, version) the file
+            requires, and the reason to skip the file, None if it is a Maya scene file.
+    """
+    try:
+        with open(path, "rb") as stream:
+            header = stream.read(size)
+    except (OSError, IOError):  # noqa: UP024
+        return MayaFileHeader(None, [], SKIP_UNREADABLE)
+    if not header:
+        return MayaFileHeader(None, [], SKIP_EMPTY)
+    if header.startswith(MAYA_ASCII_HEADER):
+        return MayaFileHeader(FILE_TYPE_ASCII, _parse_requires(header), None)
+    if header[:4] in MAYA_BINARY_MAGICS:
+        return MayaFileHeader(FILE_TYPE_BINARY, [], None)
+    return MayaFileHeader(None, [], SKIP_NOT_MAYA_SCENE)
+
+
+def is_maya_ascii_file(path):
+    """Check if a path points to a Maya ASCII file by its extension.
+
+    Args:
+        path (str): Path to the file.
+
+    Returns:
+        bool: True if the file is a Maya ASCII file, False otherwise.
+    """
+    return os.path.splitext(path)[-1].lower() == MAYA_ASCII_EXTENSION
+
+
+def is_maya_binary_file(path):
+    """Check if a path points to a Maya binary file by its extension.
+
+    Args:
+        path (str): Path to the file.
+
+    Returns:
+        bool: True if the file is a Maya binary file, False otherwise.
+    """
+    return os.path.splitext(path)[-1].lower() == MAYA_BINARY_EXTENSION
+
+
+def _unescape(data):
+    return _ESCAPE_PATTERN.sub(lambda match: _ESCAPE_CHARS.get(match.group(1), match.group(1)), data)
+
+
+def get_string_literals(line):
+    """Get the unescaped content of all MEL string literals in a line.
+
+    Args:
+        line (bytes): A line of a Maya ASCII file.
+
+    Returns:
+        bytes: The concatenated content of all string literals.
+    """
+    return b"".join(_unescape(literal) for literal in _STRING_LITERAL_PATTERN.findall(line))
+
+
+def iter_maya_ascii_statements(stream):
+    """Iterate over the top-level statements of a Maya ASCII stream.
+
+    A statement starts on a non-indented line and owns all following indented
+    lines, e.g. a ``createNode`` line and the ``setAttr`` lines below it.
+
+    Args:
+        stream (file): A Maya ASCII file opened in binary mode.
+
+    Yields:
+        list: The raw lines of each statement.
+    """
+    lines = []
+    for line in stream:
+        if lines and line[:1] not in (b"\t", b" ", b"+"):
+            yield lines
+            lines = []
+        lines.append(line)
+    if lines:
+        yield lines
+
+
+def get_maya_ascii_references(path):
+    """Get the files referenced by a Maya ASCII file from the ``file -r`` statements of its header.
+
+    Only the header is read, up to the first ``createNode`` statement.
+
+    Args:
+        path (str): Path to the Maya ASCII file.
+
+    Returns:
+        list: The referenced paths as written in the file.
+    """
+    references = []
+    with open(path, "rb") as stream:
+        for lines in iter_maya_ascii_statements(stream):
+            statement = b" ".join(line.strip() for line in lines)
+            arguments = statement.split()
+            command = arguments[0] if arguments else b""
+            if command == _CREATE_NODE_COMMAND:
+                break
+            if command == _FILE_COMMAND and _REFERENCE_FLAG in arguments:
+                literals = _STRING_LITERAL_PATTERN.findall(statement)
+                if literals:
+                    references.append(six.ensure_str(_unescape(literals[-1])))
+    return references
+
+
+def parse_create_node(line):
+    """Parse a ``createNode`` line of a Maya ASCII file.
+
+    Args:
+        line (bytes): A line of a Maya ASCII file.
+
+    Returns:
+        tuple: The node type and node name, or None if the line does not create a node.
+    """
+    match = _CREATE_NODE_PATTERN.match(line)
+    if not match:
+        return None
+    return tuple(six.ensure_str(value) for value in match.groups())
+
+
+def iter_node_statements(lines):
+    """Iterate over the indented statements of a node, e.g. its ``setAttr`` lines.
+
+    Args:
+        lines (list): Raw lines of a ``createNode`` statement.
+
+    Yields:
+        bytes: Each statement with its continuation lines joined.
+    """
+    statement = []
+    for line in lines[1:]:
+        stripped = line.strip()
+        if statement and not stripped.startswith((b'"', b"+")):
+            yield b"".join(statement)
+            statement = []
+        statement.append(stripped)
+    if statement:
+        yield b"".join(statement)
+
+
+def get_node_string_values(lines, attributes=None):
+    """Get the string attribute values set on a node statement.
+
+    Args:
+        lines (list): Raw lines of a ``createNode`` statement.
+        attributes (tuple, optional): Names of the attributes to get, e.g. ``b".b"``. Defaults to None,
+            which gets all of them.
+
+    Returns:
+        list: The unescaped value of every ``setAttr ... -type "string"`` statement.
+    """
+    values = []
+    for statement in iter_node_statements(lines):
+        if not statement.startswith(b"setAttr"):
+            continue
+        head, separator, value = statement.partition(_STRING_TYPE_FLAG)
+        if not separator:
+            continue
+        if attributes is not None:
+            names = _STRING_LITERAL_PATTERN.findall(head)
+            if not names or names[-1] not in attributes:
+                continue
+        values.append(get_string_literals(value))
+    return values
+
+
+def get_node_code_values(node_type, lines):
+    """Get the code a scene node holds, as checked by the vaccines.
+
+    Only the code attributes of script nodes are checked, network nodes are checked by name.
+
+    Args:
+        node_type (str): Type of the node.
+        lines (list): Raw lines of a ``createNode`` statement.
+
+    Returns:
+        list: The unescaped code values.
+    """
+    if node_type != "script":
+        return []
+    return get_node_string_values(lines, SCRIPT_NODE_CODE_ATTRIBUTES)
+
+
+def iter_maya_ascii_nodes(path, node_types=SUSPICIOUS_NODE_TYPES, deadline=None):
+    """Iterate over the nodes of a given type in a Maya ASCII file.
+
+    Args:
+        path (str): Path to the Maya ASCII file.
+        node_types (tuple): Node types to yield.
+        deadline (float, optional): Time after which the iteration is aborted. Defaults to None, which never aborts.
+
+    Yields:
+        MayaAsciiNode: The node type, name and code values of each matching node.
+
+    Raises:
+        ScanTimeout: If the deadline is reached.
+    """
+    with open(path, "rb") as stream:
+        for lines in iter_maya_ascii_statements(stream):
+            _check_deadline(deadline)
+            node = parse_create_node(lines[0])
+            if node and node[0] in node_types:
+                yield MayaAsciiNode(node[0], node[1], get_node_code_values(node[0], lines))
+
+
+def get_node_virus_families(node_type, node_name, values):
+    """Get the virus families a scene node is infected with.
+
+    The rules mirror the node checks of the vaccines.
+
+    Args:
+        node_type (str): Type of the node.
+        node_name (str): Name of the node.
+        values (list): Code values of the node, only checked on script nodes.
+
+    Returns:
+        set: The names of the virus families found.
+    """
+    families = set()
+    if node_type == "script" and "_gene" in node_name:
+        families.add("virus20240430")
+    if node_name in ("maya_secure_system_scriptNode", "codeExtractor") or _CODE_CHUNK_PATTERN.match(node_name):
+        families.add("maya_secure_system")
+    if node_type != "script":
+        # The vaccines check network nodes by name only.
+        return families
+    deadline = time.time() + get_signature_time_limit()
+    for value in values:
+        for name, signature in _SCENE_SIGNATURES:
+            if name not in families and signature.search(value, deadline):
+                families.add(name)
+    return families
+
+
+def scan_maya_ascii_file(path, deadline=None):
+    """Scan a Maya ASCII file for infected nodes.
+
+    Args:
+        path (str): Path to the Maya ASCII file.
+        deadline (float, optional): Time after which the scan is aborted. Defaults to None, which never aborts.
+
+    Returns:
+        list: Sorted names of the virus families found, empty if the file is clean.
+
+    Raises:
+        ScanTimeout: If the deadline is reached.
+    """
+    families = set()
+    for node in iter_maya_ascii_nodes(path, deadline=deadline):
+        families.update(get_node_virus_families(*node))
+    _check_deadline(deadline)
+    return sorted(families)
+
+
+def get_statement_nodes(line):
+    """Get the names of the nodes a ``connectAttr`` or ``select`` statement refers to.
+
+    Args:
+        line (bytes): The first line of a top-level statement of a Maya ASCII file.
+
+    Returns:
+        list: The node names, empty for any other statement.
+    """
+    command = line.split(None, 1)[0] if line.strip() else b""
+    if command in _CONNECTION_COMMANDS:
+        plugs = _STRING_LITERAL_PATTERN.findall(line)
+    elif command == _SELECT_COMMAND:
+        plugs = line.strip().rstrip(b";").split()[-1:]
+    else:
+        return []
+    return [six.ensure_str(plug.split(b".", 1)[0].lstrip(b":")) for plug in plugs]
+
+
+def disinfect_maya_ascii_file(path, output_path=None):
+    """Remove the infected nodes of a Maya ASCII file without opening it in Maya.
+
+    Infected script and network nodes are dropped with their indented statements,
+    as well as the ``connectAttr`` and ``select`` statements referring to them,
+    which Maya writes after all nodes. The result is written atomically, and only
+    if an infected node was found.
+
+    Args:
+        path (str): Path to the Maya ASCII file.
+        output_path (str, optional): Path to write the fixed file to. Defaults to None, which overwrites the file.
+
+    Returns:
+        list: Sorted names of the virus families removed, empty if the file is clean.
+    """
+    families = set()
+    removed_nodes = set()
+    lines = []
+    with open(path, "rb") as stream:
+        for statement in iter_maya_ascii_statements(stream):
+            node = parse_create_node(statement[0])
+            if node and node[0] in SUSPICIOUS_NODE_TYPES:
+                node_families = get_node_virus_families(node[0], node[1], get_node_code_values(node[0], statement))
+                if node_families:
+                    families.update(node_families)
+                    removed_nodes.add(node[1])
+                    continue
+            elif removed_nodes and removed_nodes.intersection(get_statement_nodes(statement[0])):
+                continue
+            lines.extend(statement)
+    if families:
+        write_file(output_path or path, b"".join(lines))
+    return sorted(families)
+
+
+def scan_maya_binary_file(path, chunk_size=BINARY_CHUNK_SIZE, overlap=BINARY_CHUNK_OVERLAP, deadline=None):
+    """Scan a Maya binary file for virus signatures chunk by chunk.
+
+    Args:
+        path (str): Path to the Maya binary file.
+        chunk_size (int): Number of bytes read at a time.
+        overlap (int): Number of bytes kept from the previous chunk.
+        deadline (float, optional): Time after which the scan is aborted. Defaults to None, which never aborts.
+
+    Returns:
+        list: Sorted names of the virus families found, empty if the file is clean.
+
+    Raises:
+        ScanTimeout: If the deadline is reached.
+    """
+    families = set()
+    tail = b""
+    with open(path, "rb") as stream:
+        while True:
+            _check_deadline(deadline)
+            chunk = stream.read(chunk_size)
+            if not chunk:
+                break
+            data = tail + chunk
+            search_deadline = min(
+                float("inf") if deadline is None else deadline, time.time() + get_signature_time_limit()
+            )
+            for name, signature in _BINARY_SCENE_SIGNATURES:
+                if name not in families and signature.search(data, search_deadline):
+                    families.add(name)
+                # A signature flags the buffer once the deadline of the caller is reached, time out instead.
+                _check_deadline(deadline)
+            tail = data[-overlap:]
+    return sorted(families)
+
+
+def scan_maya_file(path):
+    """Scan a Maya scene file on disk for viruses.
+
+    Args:
+        path (str): Path to the Maya scene file.
+
+    Returns:
+        list: Sorted names of the virus families found, empty if the file is clean,
+            unreadable or not a Maya scene file.
+    """
+    try:
+        if is_maya_ascii_file(path):
+            families = scan_maya_ascii_file(path)
+        elif is_maya_binary_file(path):
+            families = scan_maya_binary_file(path)
+        else:
+            return []
+        METRICS.inc("files_scanned_total", kind="offline")
+        METRICS.inc("bytes_scanned_total", os.path.getsize(path), kind="offline")
+        return families
+    except (OSError, IOError):  # noqa: UP024
+        pass
+    return []
@@ -0,0 +1,124 @@
+"""Profile callbacks, hooks and scans on artist machines.
+
+Set the environment variable MAYA_UMBRELLA_PROFILE to ``cpu`` or ``mem`` and
+every profiled event writes a ``.pstats`` or tracemalloc snapshot file next to
+the log file.
+
+"""
+
+# Import built-in modules
+import cProfile
+from contextlib import contextmanager
+from functools import wraps
+import itertools
+import os
+import re
+import time
+
+# Import local modules
+from maya_umbrella.filesystem import get_log_file
+from maya_umbrella.filesystem import get_profile_mode
+
+
+try:
+    # Import built-in modules
+    import tracemalloc
+except ImportError:
+    # tracemalloc is not available in Python 2.
+    tracemalloc = None
+
+PROFILE_EXTENSIONS = {"cpu": ".pstats", "mem": ".snapshot"}
+
+_EVENT_COUNTER = itertools.count(1)
+_INVALID_NAME_CHARS = re.compile(r"[^\w.-]+")
+# Profilers can not be nested, events inside a profiled event are part of its profile.
+_ACTIVE = []
+
+
+def get_profile_file(name, mode):
+    """Get the path of the profile file of an event, next to the log file.
+
+    Args:
+        name (str): Name of the profiled event.
+        mode (str): The profiling mode, either "cpu" or "mem".
+
+    Returns:
+        str: The path of the profile file.
+    """
+    log_file = get_log_file()
+    file_name = "{log_name}_{name}_{time}_{pid}_{index}{ext}".format(
+        log_name=os.path.splitext(os.path.basename(log_file))[0],
+        name=_INVALID_NAME_CHARS.sub("_", name),
+        time=time.strftime("%Y%m%d-%H%M%S"),
+        pid=os.getpid(),
+        index=next(_EVENT_COUNTER),
+        ext=PROFILE_EXTENSIONS[mode],
+    )
+    return os.path.join(os.path.dirname(log_file), file_name)
+
+
+def _write_profile(dump, path):
+    try:
+        dump(path)
+    except (OSError, IOError):  # noqa: UP024
+        pass
+
+
+@contextmanager
+def profile_event(name):
+    """Profile the code run inside the context if profiling is enabled.
+
+    Args:
+        name (str): Name of the profiled event, used in the profile file name.
+
+    Yields:
+        str: The path of the profile file written on exit, None if the event is not profiled.
+    """
+    mode = get_profile_mode()
+    if _ACTIVE or mode is None or (mode == "mem" and tracemalloc is None):
+        yield None
+        return
+    path = get_profile_file(name, mode)
+    _ACTIVE.append(path)
+    try:
+        if mode == "cpu":
+            profiler = cProfile.Profile()
+            profiler.enable()
+            try:
+                yield path
+            finally:
+                profiler.disable()
+                _write_profile(profiler.dump_stats, path)
+        else:
+            started = not tracemalloc.is_tracing()
+            if started:
+                tracemalloc.start()
+            try:
+                yield path
+            finally:
+                _write_profile(tracemalloc.take_snapshot().dump, path)
+                if started:
+                    tracemalloc.stop()
+    finally:
+        _ACTIVE.pop()
+
+
+def profiled(name):
+    """Decorator to profile each call of a function if profiling is enabled.
+
+    Args:
+        name (str): Name of the profiled event, used in the profile file name.
+
+    Returns:
+        function: The decorator.
+    """
+
+    def decorator(func):
+        @wraps(func)
+        def wrap(*args, **kwargs):
+            with profile_event(name):
+                return func(*args, **kwargs)
+
+        return wrap
+
+    return decorator
@@ -0,0 +1,101 @@
+"""Get a verdict on a Maya scene file within a time budget, without Maya.
+
+Only the Maya-free paths are used: the verdict cache of previous full scans,
+the header of the file, the node scan of Maya ASCII files and their references,
+and the chunk scan of Maya binary files. Files that can not be decided in time
+or without Maya need a full scan, e.g. clean Maya binary files, whose references
+can not be listed without Maya.
+
+"""
+
+# Import built-in modules
+import time
+
+# Import local modules
+from maya_umbrella.constants import VERDICT_CLEAN
+from maya_umbrella.constants import VERDICT_INFECTED
+from maya_umbrella.constants import VERDICT_NEEDS_FULL_SCAN
+from maya_umbrella.filesystem import get_verdict_cache_file
+from maya_umbrella.filesystem import is_verdict_cache_enabled
+from maya_umbrella.filesystem import is_verdict_cache_hash_enabled
+from maya_umbrella.offline_scanner import FILE_TYPE_ASCII
+from maya_umbrella.offline_scanner import FILE_TYPE_BINARY
+from maya_umbrella.offline_scanner import ScanTimeout
+from maya_umbrella.offline_scanner import get_maya_ascii_references
+from maya_umbrella.offline_scanner import scan_maya_ascii_file
+from maya_umbrella.offline_scanner import scan_maya_binary_file
+from maya_umbrella.offline_scanner import sniff_maya_file
+from maya_umbrella.reference_graph import resolve_reference_path
+from maya_umbrella.verdict_cache import VerdictCache
+from maya_umbrella.verdict_cache import normalize_path
+from maya_umbrella.verdict_cache import strip_copy_number
+
+
+def quick_verdict(path, budget_ms=100, verdict_cache=None):
+    """Get a verdict on a Maya scene file within a time budget, without Maya.
+
+    References of Maya ASCII files are checked too, even if the file itself is
+    cached as clean. Maya binary files are never clean, their references can
+    not be listed without Maya.
+
+    Args:
+        path (str): Path to the Maya scene file.
+        budget_ms (float, optional): Time budget in milliseconds. Defaults to 100.
+        verdict_cache (VerdictCache, optional): Cache of the verdicts of full scans. Defaults to None,
+            which uses the cache persisted by the defender if enabled, an empty one otherwise.
+
+    Returns:
+        str: "clean", "infected" or "needs_full_scan".
+    """
+    deadline = time.time() + budget_ms / 1000.0
+    verdict_cache = verdict_cache or VerdictCache(
+        get_verdict_cache_file() if is_verdict_cache_enabled() else None, is_verdict_cache_hash_enabled()
+    )
+    return _get_verdict(path, deadline, verdict_cache, set())
+
+
+def _get_verdict(path, deadline, verdict_cache, visited):
+    key = normalize_path(path)
+    if key in visited:
+        return VERDICT_CLEAN
+    visited.add(key)
+    if time.time() > deadline:
+        return VERDICT_NEEDS_FULL_SCAN
+    cached = verdict_cache.get(path)
+    if cached == VERDICT_INFECTED:
+        return cached
+    path = strip_copy_number(path)
+    # A cached clean verdict only covers the nodes of the file, its references may have changed since.
+    families = []
+    try:
+        file_type = sniff_maya_file(path).file_type
+        if file_type == FILE_TYPE_ASCII:
+            if cached != VERDICT_CLEAN:
+                families = scan_maya_ascii_file(path, deadline=deadline)
+            references = get_maya_ascii_references(path)
+        elif file_type == FILE_TYPE_BINARY:
+            if cached != VERDICT_CLEAN:
+                families = scan_maya_binary_file(path, deadline=deadline)
+            # The references of Maya binary files can not be listed without Maya.
+            references = None
+        else:
+            return VERDICT_NEEDS_FULL_SCAN
+    except (ScanTimeout, OSError, IOError):  # noqa: UP024
+        return VERDICT_NEEDS_FULL_SCAN
+    if families:
+        return VERDICT_INFECTED
+    if references is None:
+        return VERDICT_NEEDS_FULL_SCAN
+    verdict = VERDICT_CLEAN
+    for reference in references:
+        reference_path = resolve_reference_path(reference, path)
+        # Maya may still find a reference missing next to the file, e.g. in the project.
+        reference_verdict = (
+            _get_verdict(reference_path, deadline, verdict_cache, visited)
+            if reference_path else VERDICT_NEEDS_FULL_SCAN
+        )
+        if reference_verdict == VERDICT_INFECTED:
+            return VERDICT_INFECTED
+        if reference_verdict == VERDICT_NEEDS_FULL_SCAN:
+            verdict = VERDICT_NEEDS_FULL_SCAN
+    return verdict
@@ -0,0 +1,156 @@
+# Import built-in modules
+from collections import deque
+import os
+
+# Import local modules
+from maya_umbrella.offline_scanner import get_maya_ascii_references
+from maya_umbrella.offline_scanner import is_maya_ascii_file
+from maya_umbrella.verdict_cache import normalize_path
+from maya_umbrella.verdict_cache import strip_copy_number
+
+
+def resolve_reference_path(path, parent_path):
+    """Resolve a reference path as written in a scene file to a file on disk.
+
+    Args:
+        path (str): The reference path, which may contain environment variables,
+            a copy number or be relative to the parent file.
+        parent_path (str): Path to the file referencing it.
+
+    Returns:
+        str: The resolved path, empty string if the file does not exist.
+    """
+    path = os.path.expandvars(strip_copy_number(path))
+    if not os.path.isabs(path):
+        path = os.path.join(os.path.dirname(parent_path), path)
+    path = os.path.normpath(path)
+    return path if os.path.isfile(path) else ""
+
+
+class ReferenceGraph(object):
+    """The reference dependency graph of the scene files of a batch scan.
+
+    Files are identified by their normalized path, so a file reached through
+    several references or spellings is scheduled once. References of Maya ASCII
+    files are read from their header when the file is added, references of other
+    files are added once they are known, e.g. after the file is opened.
+    Scheduled files are dropped from the graph, only their normalized path is kept.
+
+    Attributes:
+        scheduled (set): Normalized paths of the files already scheduled.
+    """
+
+    def __init__(self):
+        """Initialize the ReferenceGraph."""
+        self.scheduled = set()
+        self._roots = deque()
+        self._paths = {}
+        self._references = {}
+
+    def __len__(self):
+        return len(self._paths)
+
+    def add_file(self, path):
+        """Add a file and the files it references, recursively for Maya ASCII files.
+
+        Args:
+            path (str): Path to the file.
+
+        Returns:
+            str: The normalized path of the file.
+        """
+        key = normalize_path(path)
+        pending = [(key, path)]
+        while pending:
+            key_, path_ = pending.pop()
+            if key_ in self._paths or key_ in self.scheduled:
+                continue
+            self._roots.append(key_)
+            self._paths[key_] = path_
+            self._references[key_] = []
+            if not is_maya_ascii_file(path_):
+                continue
+            try:
+                references = get_maya_ascii_references(path_)
+            except (OSError, IOError):  # noqa: UP024
+                continue
+            for reference in references:
+                resolved = self._add_reference(key_, path_, reference)
+                if resolved:
+                    pending.append(resolved)
+        return key
+
+    def add_references(self, path, references):
+        """Add the references of a file found after it was added, e.g. by opening it in Maya.
+
+        Args:
+            path (str): Path to the file.
+            references (list): Paths of the files it references.
+        """
+        key = self.add_file(path)
+        for reference in references:
+            if key in self.scheduled:
+                # The file is already scheduled, its references are scheduled next.
+                reference_path = resolve_reference_path(reference, path)
+                if reference_path:
+                    self.add_file(reference_path)
+                continue
+            resolved = self._add_reference(key, path, reference)
+            if resolved:
+                self.add_file(resolved[1])
+
+    def _add_reference(self, key, path, reference):
+        reference_path = resolve_reference_path(reference, path)
+        if not reference_path:
+            return None
+        reference_key = normalize_path(reference_path)
+        if reference_key != key and reference_key not in self._references[key]:
+            self._references[key].append(reference_key)
+        return reference_key, reference_path
+
+    def get_references(self, path):
+        """Get the files referenced by a file.
+
+        Args:
+            path (str): Path to the file.
+
+        Returns:
+            list: Paths of the referenced files not scheduled yet, empty once the file is scheduled.
+        """
+        return [self._paths[key] for key in self._references.get(normalize_path(path), []) if key in self._paths]
+
+    def _iter_dependency_order(self, root):
+        # Iterative depth-first post-order, references of a file come before it and cycles are cut.
+        visited = set()
+        stack = [(root, iter(self._references[root]))]
+        visited.add(root)
+        while stack:
+            key, references = stack[-1]
+            for reference in references:
+                if reference not in visited and reference not in self.scheduled:
+                    visited.add(reference)
+                    stack.append((reference, iter(self._references[reference])))
+                    break
+            else:
+                stack.pop()
+                yield key
+
+    def iter_files(self):
+        """Iterate over the files not scheduled yet, each once and references before the files referencing them.
+
+        Files added while iterating are scheduled too.
+
+        Yields:
+            str: Path of each file.
+        """
+        while True:
+            while self._roots and self._roots[0] in self.scheduled:
+                self._roots.popleft()
+            if not self._roots:
+                return
+            for key in self._iter_dependency_order(self._roots[0]):
+                if key not in self.scheduled:
+                    self.scheduled.add(key)
+                    # The traversal holds the references it still iterates, the graph drops the file.
+                    del self._references[key]
+                    yield self._paths.pop(key)
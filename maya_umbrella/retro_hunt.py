@@ -0,0 +1,310 @@
+"""Hunt new virus signatures in the nodes of already scanned files.
+
+When MAYA_UMBRELLA_RETRO_HUNT_INDEX is true, scans record the name, type, owning
+file and a fingerprint of the code of every script and network node into a local
+SQLite index, and the code itself when it looks like it could run something,
+indexed for full-text search. Identical code found in many files is stored once.
+When signatures are added, hunting them in the index finds the affected files
+without rescanning the library::
+
+    python -m maya_umbrella.retro_hunt hunt --family virus20240430
+    python -m maya_umbrella.retro_hunt search "internalVar"
+
+Signatures are matched against the stored code only, their literal words are
+used to narrow it down with the full-text index first.
+
+"""
+
+# Import built-in modules
+import argparse
+from collections import namedtuple
+import hashlib
+import re
+import sqlite3
+import sys
+
+# Import local modules
+from maya_umbrella._vendor import six
+from maya_umbrella.filesystem import get_retro_hunt_index_file
+from maya_umbrella.filesystem import get_retro_hunt_payload_policy
+from maya_umbrella.signature_engine import get_signature
+from maya_umbrella.signatures import SCENE_SCRIPT_NODE_SIGNATURES
+from maya_umbrella.signatures import VirusSignature
+from maya_umbrella.verdict_cache import normalize_path
+
+
+# Lower case words of code that may run something, payloads containing one are stored.
+SUSPICIOUS_PAYLOAD_TOKENS = (
+    "python", "exec", "eval", "import", "base64", "compile", "scriptjob", "internalvar", "usersetup",
+    "subprocess", "os.system", "socket", "urllib", "open(",
+)
+# Words of the full-text index, the tokenizers split on any other ASCII character.
+_TERM_PATTERN = re.compile(br"[A-Za-z0-9]+")
+
+IndexedNode = namedtuple("IndexedNode", ["file", "node", "node_type"])
+RetroHuntMatch = namedtuple("RetroHuntMatch", ["file", "node", "family"])
+
+_SCHEMA = (
+    (
+        "CREATE TABLE IF NOT EXISTS nodes (file_key TEXT, file TEXT, node TEXT, node_type TEXT, fingerprint TEXT, "
+        "PRIMARY KEY (file_key, node))"
+    ),
+    "CREATE INDEX IF NOT EXISTS nodes_fingerprint ON nodes (fingerprint)",
+    "CREATE TABLE IF NOT EXISTS payloads (id INTEGER PRIMARY KEY, fingerprint TEXT UNIQUE, payload TEXT)",
+)
+
+
+def get_payload(values):
+    """Join the code attributes of a node into one payload.
+
+    Args:
+        values (list): The code attributes, e.g. the ``before`` and ``after`` scripts.
+
+    Returns:
+        str: The payload.
+    """
+    return u"\n".join(six.ensure_text(value, errors="replace") for value in values)
+
+
+def get_payload_fingerprint(payload):
+    """Get the fingerprint of a payload.
+
+    Args:
+        payload (str): The payload.
+
+    Returns:
+        str: The SHA-1 hex digest of the payload.
+    """
+    return hashlib.sha1(six.ensure_binary(payload)).hexdigest()
+
+
+def is_suspicious_payload(payload):
+    """Check if a payload looks like code that may run something.
+
+    Args:
+        payload (str): The payload.
+
+    Returns:
+        bool: True if the payload contains one of the suspicious tokens.
+    """
+    payload = payload.lower()
+    return any(token in payload for token in SUSPICIOUS_PAYLOAD_TOKENS)
+
+
+def _is_delimiter(char):
+    # Only ASCII punctuation and spaces split words the same way in every tokenizer.
+    return bool(char) and ord(char) < 128 and not char.isalnum()
+
+
+def get_full_text_terms(literals):
+    """Get full-text query terms every payload containing the literals has.
+
+    The words at the ends of a literal may be part of longer words, so a word
+    is only used whole when it is delimited inside the literal, and as a prefix
+    when only its start is.
+
+    Args:
+        literals (list): Literal runs of a signature.
+
+    Returns:
+        list: The query terms, all of them must match.
+    """
+    terms = []
+    for literal in literals:
+        for match in _TERM_PATTERN.finditer(literal):
+            if not _is_delimiter(literal[match.start() - 1:match.start()]):
+                continue
+            term = six.ensure_text(match.group()).lower()
+            following = literal[match.end():match.end() + 1]
+            if _is_delimiter(following):
+                terms.append(term)
+            elif not following:
+                terms.append(term + u"*")
+    return terms
+
+
+class RetroHuntIndex(object):
+    """A SQLite index of the script and network nodes of scanned files.
+
+    Attributes:
+        path (str): Path to the database file.
+        store_all_payloads (bool): Whether every payload is stored, not only the suspicious ones.
+        full_text (bool): Whether SQLite supports full-text search, known once connected.
+    """
+
+    def __init__(self, path=None, store_all_payloads=None):
+        """Initialize the RetroHuntIndex.
+
+        Args:
+            path (str, optional): Path to the database file. Defaults to None,
+                which reads MAYA_UMBRELLA_RETRO_HUNT_INDEX_FILE.
+            store_all_payloads (bool, optional): Whether every payload is stored. Defaults to None,
+                which reads MAYA_UMBRELLA_RETRO_HUNT_PAYLOADS.
+        """
+        self.path = path or get_retro_hunt_index_file()
+        if store_all_payloads is None:
+            store_all_payloads = get_retro_hunt_payload_policy() == "all"
+        self.store_all_payloads = store_all_payloads
+        self.full_text = False
+        self._connection = None
+
+    @property
+    def connection(self):
+        """Return the connection to the database, creating its tables on first access.
+
+        Returns:
+            sqlite3.Connection: The connection.
+        """
+        if self._connection is None:
+            connection = sqlite3.connect(self.path, timeout=30)
+            for statement in _SCHEMA:
+                connection.execute(statement)
+            self.full_text = self._create_full_text_table(connection)
+            connection.commit()
+            self._connection = connection
+        return self._connection
+
+    @staticmethod
+    def _create_full_text_table(connection):
+        for module in ("fts5", "fts4"):
+            try:
+                connection.execute(
+                    "CREATE VIRTUAL TABLE IF NOT EXISTS payloads_fts USING {module}(payload)".format(module=module))
+            except sqlite3.OperationalError:
+                continue
+            return True
+        return False
+
+    def record_file(self, path, nodes):
+        """Record the script and network nodes of a file, replacing the ones recorded before.
+
+        Args:
+            path (str): Path to the file.
+            nodes (iterable): (node type, node name, code attributes) of each node.
+        """
+        file_key = normalize_path(path)
+        with self.connection:
+            self.connection.execute("DELETE FROM nodes WHERE file_key = ?", (file_key,))
+            for node_type, node_name, values in nodes:
+                payload = get_payload(values)
+                fingerprint = get_payload_fingerprint(payload)
+                self.connection.execute(
+                    "INSERT OR REPLACE INTO nodes VALUES (?, ?, ?, ?, ?)",
+                    (file_key, path, node_name, node_type, fingerprint),
+                )
+                if payload and (self.store_all_payloads or is_suspicious_payload(payload)):
+                    self._add_payload(fingerprint, payload)
+
+    def _add_payload(self, fingerprint, payload):
+        cursor = self.connection.execute(
+            "INSERT OR IGNORE INTO payloads (fingerprint, payload) VALUES (?, ?)", (fingerprint, payload))
+        if cursor.rowcount == 1 and self.full_text:
+            self.connection.execute(
+                "INSERT INTO payloads_fts (rowid, payload) VALUES (?, ?)", (cursor.lastrowid, payload))
+
+    def search(self, query):
+        """Find the nodes whose stored code matches a full-text query.
+
+        Args:
+            query (str): The full-text query, a substring of the code if SQLite has no full-text search.
+
+        Returns:
+            list: IndexedNode of each matching node.
+        """
+        select = (
+            "SELECT nodes.file, nodes.node, nodes.node_type FROM payloads "
+            "JOIN nodes ON nodes.fingerprint = payloads.fingerprint "
+        )
+        connection = self.connection
+        if self.full_text:
+            rows = connection.execute(
+                select + "JOIN payloads_fts ON payloads_fts.rowid = payloads.id WHERE payloads_fts MATCH ?",
+                (query,),
+            )
+        else:
+            rows = connection.execute(select + "WHERE payloads.payload LIKE ?", (u"%" + query + u"%",))
+        return sorted(IndexedNode(*row) for row in rows)
+
+    def _iter_candidate_payloads(self, signature):
+        connection = self.connection
+        terms = get_full_text_terms(signature.literals) if self.full_text else []
+        if terms:
+            return connection.execute(
+                "SELECT payloads.fingerprint, payloads.payload FROM payloads_fts "
+                "JOIN payloads ON payloads.id = payloads_fts.rowid WHERE payloads_fts MATCH ?",
+                (u" ".join(terms),),
+            )
+        return connection.execute("SELECT fingerprint, payload FROM payloads")
+
+    def hunt(self, signatures):
+        """Find the nodes whose stored code matches any of the signatures.
+
+        Args:
+            signatures (list): VirusSignature of each signature to hunt.
+
+        Returns:
+            list: RetroHuntMatch of each matching node and signature family.
+        """
+        matches = set()
+        for name, pattern in signatures:
+            signature = get_signature(pattern)
+            fingerprints = [
+                fingerprint for fingerprint, payload in self._iter_candidate_payloads(signature)
+                if signature.search(payload)
+            ]
+            for fingerprint in fingerprints:
+                for file_path, node_name in self.connection.execute(
+                    "SELECT file, node FROM nodes WHERE fingerprint = ?", (fingerprint,)
+                ):
+                    matches.add(RetroHuntMatch(file_path, node_name, name))
+        return sorted(matches)
+
+    def close(self):
+        """Close the connection to the database, it is opened again when needed."""
+        if self._connection is not None:
+            self._connection.close()
+            self._connection = None
+
+
+def main(argv=None):
+    """Run the command line interface.
+
+    Args:
+        argv (list, optional): The arguments. Defaults to None, which uses sys.argv.
+
+    Returns:
+        int: The exit code.
+    """
+    parser = argparse.ArgumentParser(prog="maya_umbrella.retro_hunt")
+    parser.add_argument("--index", default=None)
+    subparsers = parser.add_subparsers(dest="command")
+    hunt_parser = subparsers.add_parser("hunt")
+    hunt_parser.add_argument("--family", action="append", default=[])
+    hunt_parser.add_argument("--pattern", action="append", default=[])
+    subparsers.add_parser("search").add_argument("query")
+    args = parser.parse_args(argv)
+    index = RetroHuntIndex(args.index)
+    try:
+        if args.command == "hunt":
+            signatures = [VirusSignature("pattern", pattern) for pattern in args.pattern]
+            if args.family or not signatures:
+                signatures.extend(
+                    signature for signature in SCENE_SCRIPT_NODE_SIGNATURES
+                    if not args.family or signature.name in args.family
+                )
+            matches = index.hunt(signatures)
+            for match in matches:
+                print("\t".join(match))
+            sys.stderr.write("{count} affected files\n".format(count=len({match.file for match in matches})))
+        elif args.command == "search":
+            for node in index.search(args.query):
+                print("\t".join(node))
+        else:
+            parser.print_help()
+    finally:
+        index.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
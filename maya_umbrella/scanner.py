@@ -1,16 +1,65 @@
 # Import built-in modules
+from collections import namedtuple
+from contextlib import contextmanager
 import glob
 import logging
 import os
 import shutil
+import sqlite3
+import time
 
 # Import local modules
 from maya_umbrella import maya_funs
 from maya_umbrella._vendor.six import PY2
+from maya_umbrella.constants import VERDICT_CLEAN
+from maya_umbrella.constants import VERDICT_ERROR
+from maya_umbrella.constants import VERDICT_FIXED
+from maya_umbrella.constants import VERDICT_SKIPPED
 from maya_umbrella.defender import context_defender
 from maya_umbrella.filesystem import get_backup_path
+from maya_umbrella.filesystem import get_scan_journal_file
+from maya_umbrella.filesystem import get_scan_manifest_file
+from maya_umbrella.filesystem import is_offline_fix_enabled
+from maya_umbrella.filesystem import is_reference_deferral_enabled
+from maya_umbrella.filesystem import is_retro_hunt_index_enabled
+from maya_umbrella.filesystem import is_scan_journal_enabled
 from maya_umbrella.filesystem import read_file
+from maya_umbrella.manifest import ScanManifest
 from maya_umbrella.maya_funs import cmds
+from maya_umbrella.metrics import METRICS
+from maya_umbrella.metrics import flush_metrics
+from maya_umbrella.offline_scanner import FILE_TYPE_ASCII
+from maya_umbrella.offline_scanner import disinfect_maya_ascii_file
+from maya_umbrella.offline_scanner import iter_maya_ascii_nodes
+from maya_umbrella.offline_scanner import scan_maya_ascii_file
+from maya_umbrella.offline_scanner import sniff_maya_file
+from maya_umbrella.profiling import profiled
+from maya_umbrella.reference_graph import ReferenceGraph
+from maya_umbrella.retro_hunt import RetroHuntIndex
+from maya_umbrella.scheduler import ScanJournal
+from maya_umbrella.scheduler import schedule_files
+from maya_umbrella.tracing import trace_span
+
+
+ScanResult = namedtuple("ScanResult", ["path", "verdict", "families", "timings", "backup_path", "error"])
+ScanResult.__doc__ = """The result of scanning a single file.
+
+Attributes:
+    path (str): Path to the file.
+    verdict (str): "clean", "fixed", "skipped" or "error".
+    families (list): Names of the viruses found in the file.
+    timings (dict): Seconds spent in each phase of the scan, e.g. "open" or "collect", and in "total".
+    backup_path (str): Path to the backup of the infected file, None if the file was not fixed.
+    error (str): Why the file was skipped or failed, None otherwise.
+"""
+
+
+@contextmanager
+def _timed(timings, name, maya_file):
+    started = time.time()
+    with trace_span(name, "scanner", file=maya_file):
+        yield
+    timings[name] = time.time() - started
 
 
 class MayaVirusScanner(object):
@@ -24,9 +73,15 @@ class MayaVirusScanner(object):
         _env (dict): Custom environment variables.
         output_path (str, optional): Path to save the fixed files. Defaults to None, which overwrites the original
             files.
+        defer_references (bool): Whether files are opened without their references, which are scanned separately.
+        journal (ScanJournal): The scan time of each file, used to scan the longest files first,
+            persisted only if MAYA_UMBRELLA_SCAN_JOURNAL is true.
+        on_result (callable): Called with the ScanResult of each scanned file.
+        retro_hunt_index (RetroHuntIndex): The index the script and network nodes of scanned files are
+            recorded into, None if disabled.
     """
 
-    def __init__(self, output_path=None, env=None):
+    def __init__(self, output_path=None, env=None, defer_references=None, on_result=None):
         """Initialize the MayaVirusScanner.
 
         Args:
@@ -34,18 +89,40 @@ class MayaVirusScanner(object):
                 files.
             env (dict, optional): Custom environment variables. Defaults to None,
             which sets the 'MAYA_COLOR_MANAGEMENT_SYNCOLOR' variable to '1'.
+            defer_references (bool, optional): Whether files are opened without their references, which are
+                scanned as separate files. Defaults to None, which reads MAYA_UMBRELLA_SCAN_DEFER_REFERENCES.
+            on_result (callable, optional): Called with the ScanResult of each scanned file. Defaults to None.
         """
         self.logger = logging.getLogger(__name__)
         self.defender = None
         self.output_path = output_path
+        self.defer_references = is_reference_deferral_enabled() if defer_references is None else defer_references
         self._failed_files = []
         self._reference_files = []
         self._fixed_files = []
+        self._skipped_files = {}
+        self.journal = ScanJournal(get_scan_journal_file() if is_scan_journal_enabled() else None)
+        self.on_result = on_result
+        self.retro_hunt_index = RetroHuntIndex() if is_retro_hunt_index_enabled() else None
         # Custom env.
         self._env = env or {
             "MAYA_COLOR_MANAGEMENT_SYNCOLOR": "1"
         }
 
+    @property
+    def failed_files(self):
+        """Return a list of files that failed to be opened."""
+        return list(self._failed_files)
+
+    @property
+    def skipped_files(self):
+        """Return the files skipped without opening them in Maya.
+
+        Returns:
+            dict: Dictionary mapping skipped files to the reason, e.g. "empty" or "not_maya_scene".
+        """
+        return dict(self._skipped_files)
+
     def scan_files_from_pattern(self, pattern, glob_options=None):
         """Scan and fix Maya files matching a given pattern.
 
@@ -67,16 +144,102 @@ class MayaVirusScanner(object):
     def scan_files_from_list(self, files):
         """Scan and fix Maya files from a given list.
 
+        Every unique file, including the files they reference, is scanned once,
+        references before the files referencing them, and the longest files first.
+
         Args:
             files (list): List of file paths to scan and fix.
+
+        Returns:
+            list: The fixed files.
         """
+        for result in self.iter_scan(files, schedule=True):
+            if result.verdict == VERDICT_FIXED:
+                self._fixed_files.append(result.path)
+            elif result.verdict == VERDICT_SKIPPED:
+                self._skipped_files[result.path] = result.error
+            elif result.verdict == VERDICT_ERROR:
+                self._failed_files.append(result.path)
+        return self._fixed_files
+
+    def iter_scan(self, files, on_result=None, schedule=False):
+        """Scan and fix Maya files, yielding the result of each file as soon as it is scanned.
+
+        Unlike scan_files_from_list, the results are not kept by the scanner, so
+        they can be streamed to disk or a UI. Files are read from the iterable
+        one at a time, each followed by the files it references that were not
+        scanned yet. Only the normalized paths of the scanned files are kept,
+        so that each file is scanned once.
+
+        Args:
+            files (iterable): Paths of the files to scan and fix.
+            on_result (callable, optional): Called with the ScanResult of each file before it is yielded.
+                Defaults to None, which uses the on_result of the scanner.
+            schedule (bool, optional): Whether all files are stat'ed up front to scan the longest first.
+                Defaults to False.
+
+        Yields:
+            ScanResult: The result of each scanned file.
+        """
+        on_result = on_result or self.on_result
+        files = (maya_file for maya_file in files if maya_file)
+        if schedule:
+            files = schedule_files(files, self.journal)
+        graph = ReferenceGraph()
         with context_defender() as defender:
             self.defender = defender
-            for maya_file in files:
-                self._fix(maya_file)
-                for ref in self._reference_files:
-                    self._fix(ref)
-        return self._fixed_files
+            for maya_file in self._iter_graph_files(graph, files):
+                result = self._fix(maya_file)
+                if self.journal.path:
+                    # An in-memory journal is not read again by this scan, it would only grow with the files.
+                    self.journal.record(maya_file, result.timings["total"])
+                # References only known once the file is opened are scanned next.
+                graph.add_references(maya_file, self._reference_files)
+                self._reference_files = []
+                if on_result:
+                    on_result(result)
+                yield result
+        self.journal.save()
+        if self.retro_hunt_index:
+            self.retro_hunt_index.close()
+        flush_metrics(self.logger)
+
+    @staticmethod
+    def _iter_graph_files(graph, files):
+        for maya_file in files:
+            # References of Maya ASCII files are read when the file is reached, not for all files up front.
+            graph.add_file(maya_file)
+            for graph_file in graph.iter_files():  # noqa: UP028
+                yield graph_file
+
+    def scan_changed_files(self, root, manifest=None):
+        """Scan and fix the Maya files of a tree that changed since the last sweep.
+
+        Only new and changed files, files that failed to scan and files scanned
+        with other signatures are scanned. Backup folders are not walked.
+
+        Args:
+            root (str): The root folder of the tree.
+            manifest (ScanManifest, optional): The manifest of the last sweep. Defaults to None,
+                which uses the manifest persisted to MAYA_UMBRELLA_SCAN_MANIFEST_FILE.
+
+        Returns:
+            list: The fixed files.
+        """
+        manifest = manifest or ScanManifest(get_scan_manifest_file())
+        skip_dirs = [os.getenv("MAYA_UMBRELLA_BACKUP_FOLDER_NAME", "_virus")]
+        if self.output_path:
+            skip_dirs.append(os.path.abspath(self.output_path))
+        os.environ.update(self._env)
+        fixed_files = []
+        try:
+            for result in self.iter_scan(manifest.iter_changed_files(root, skip_dirs)):
+                manifest.record(result.path, result.verdict)
+                if result.verdict == VERDICT_FIXED:
+                    fixed_files.append(result.path)
+        finally:
+            manifest.save()
+        return fixed_files
 
     def scan_files_from_file(self, text_file):
         """Scan and fix Maya files from a given text file containing a list of file paths.
@@ -88,28 +251,115 @@ class MayaVirusScanner(object):
         files = file_data.splitlines()
         return self.scan_files_from_list(files)
 
+    def _fix_offline(self, maya_file, header, timings):
+        """Fix an infected Maya ASCII file without opening it in Maya.
+
+        Files found clean are left to Maya, which also runs the vaccines not based on signatures.
+
+        Args:
+            maya_file (str): Path to the Maya file to be fixed.
+            header (MayaFileHeader): The header of the file.
+            timings (dict): Seconds spent in each phase, updated in place.
+
+        Returns:
+            ScanResult: The result if the file was fixed, None otherwise.
+        """
+        if not (is_offline_fix_enabled() and header.file_type == FILE_TYPE_ASCII):
+            return None
+        try:
+            with _timed(timings, "offline_scan", maya_file):
+                families = scan_maya_ascii_file(maya_file)
+            if not families:
+                return None
+            backup_path = get_backup_path(maya_file, root_path=self.output_path)
+            if backup_path != maya_file:
+                self.logger.debug("Backup saved to: {backup_path}".format(backup_path=backup_path))
+                shutil.copy2(maya_file, backup_path)
+            with _timed(timings, "offline_fix", maya_file):
+                disinfect_maya_ascii_file(maya_file)
+            self._record_nodes(maya_file, iter_maya_ascii_nodes(maya_file), timings)
+        except (OSError, IOError):  # noqa: UP024
+            self.logger.debug("failed to fix maya file offline: {maya_file}".format(maya_file=maya_file))
+            return None
+        METRICS.inc("files_fixed_total", kind="offline")
+        return ScanResult(maya_file, VERDICT_FIXED, sorted(families), timings, backup_path, None)
+
+    def _record_nodes(self, maya_file, nodes, timings):
+        """Record the script and network nodes of a scanned file into the retro-hunt index.
+
+        Args:
+            maya_file (str): Path to the Maya file.
+            nodes (iterable): (node type, node name, code attributes) of each node.
+            timings (dict): Seconds spent in each phase, updated in place.
+        """
+        if not self.retro_hunt_index:
+            return
+        try:
+            with _timed(timings, "index", maya_file):
+                self.retro_hunt_index.record_file(maya_file, nodes)
+        except (sqlite3.Error, OSError, IOError) as error:  # noqa: UP024
+            self.logger.debug("failed to index nodes of {maya_file}: {error}".format(
+                maya_file=maya_file, error=error))
+
+    @profiled("scan")
     def _fix(self, maya_file):
         """Fix a single Maya file containing a virus.
 
         Args:
             maya_file (str): Path to the Maya file to be fixed.
+
+        Returns:
+            ScanResult: The result of the scan.
         """
-        if not maya_file and maya_file in self._fixed_files:
-            self.logger.debug("Already fixed: {maya_file}".format(maya_file=maya_file))
-            return
+        started = time.time()
+        timings = {}
+        result = self._scan(maya_file, timings)
+        timings["total"] = time.time() - started
+        return result
+
+    def _scan(self, maya_file, timings):
+        header = sniff_maya_file(maya_file)
+        if header.reason:
+            self.logger.debug("Skipped {maya_file}: {reason}".format(maya_file=maya_file, reason=header.reason))
+            METRICS.inc("files_skipped_total", reason=header.reason)
+            return ScanResult(maya_file, VERDICT_SKIPPED, [], timings, None, header.reason)
+        result = self._fix_offline(maya_file, header, timings)
+        if result:
+            return result
+        METRICS.inc("files_scanned_total", kind="scene")
+        result = ScanResult(maya_file, VERDICT_CLEAN, [], timings, None, None)
         try:
-            maya_funs.open_maya_file(maya_file)
-            self.defender.collect()
-        except Exception:
+            METRICS.inc("bytes_scanned_total", os.path.getsize(maya_file), kind="scene")
+            with _timed(timings, "open", maya_file):
+                maya_funs.open_maya_file(maya_file, load_references=not self.defer_references)
+            self._reference_files.extend(maya_funs.get_reference_files())
+            with _timed(timings, "collect", maya_file):
+                self.defender.collect()
+            if self.defer_references and self.defender.have_issues:
+                # Saving the file with its references unloaded would keep them unloaded, fix it with them loaded.
+                with _timed(timings, "reopen", maya_file):
+                    maya_funs.open_maya_file(maya_file)
+                    self.defender.collect(full_scan=True)
+        except Exception as error:
             self.logger.debug("failed to open maya file: {maya_file}".format(maya_file=maya_file))
-            self._failed_files.append(maya_file)
+            # The issues collected so far may belong to the previous file, leave the file as it is.
+            result = result._replace(verdict=VERDICT_ERROR, error=str(error) or error.__class__.__name__)
 
-        if self.defender.have_issues:
-            self.defender.fix()
+        if result.verdict == VERDICT_CLEAN and self.defender.have_issues:
+            families = self.defender.collector.infected_families
+            with _timed(timings, "fix", maya_file):
+                self.defender.fix()
             backup_path = get_backup_path(maya_file, root_path=self.output_path)
             self.logger.debug("Backup saved to: {backup_path}".format(backup_path=backup_path))
-            shutil.copy2(maya_file, backup_path)
-            cmds.file(save=True, force=True)
-            self._fixed_files.append(maya_file)
+            with _timed(timings, "backup", maya_file):
+                shutil.copy2(maya_file, backup_path)
+            with _timed(timings, "save", maya_file):
+                cmds.file(save=True, force=True)
             self._reference_files.extend(self.defender.collector.infected_reference_files)
-        cmds.file(new=True, force=True)
+            result = result._replace(
+                verdict=VERDICT_FIXED, families=families, backup_path=backup_path)
+        if result.verdict != VERDICT_ERROR:
+            self._record_nodes(maya_file, maya_funs.get_suspicious_nodes(), timings)
+        with _timed(timings, "new", maya_file):
+            cmds.file(new=True, force=True)
+        return result
@@ -0,0 +1,149 @@
+"""Order scan jobs so that parallel workers finish at about the same time.
+
+Files are stat'ed up front and the longest scans are started first, their
+duration estimated from the scan journal, a record of how long each file took
+to scan before, or from the file size. Workers taking the next job as soon as
+they are idle then keep the total wall time close to the total scan time
+divided by the number of workers.
+
+"""
+
+# Import built-in modules
+import json
+import os
+import threading
+
+# Import local modules
+from maya_umbrella.filesystem import read_json
+from maya_umbrella.filesystem import write_file
+from maya_umbrella.verdict_cache import normalize_path
+from maya_umbrella.verdict_cache import strip_copy_number
+
+
+class ScanJournal(object):
+    """A record of how long each file took to scan, shared by the threads of a worker pool.
+
+    Attributes:
+        path (str): Path to the JSON file the journal is persisted to, None to keep it in memory.
+    """
+
+    def __init__(self, path=None):
+        """Initialize the ScanJournal.
+
+        Args:
+            path (str, optional): Path to the JSON file the journal is persisted to. Defaults to None,
+                which keeps the journal in memory.
+        """
+        self.path = path
+        self._entries = None
+        self._dirty = False
+        self._lock = threading.RLock()
+
+    @property
+    def entries(self):
+        """Return the journal entries, loading them from disk on first access.
+
+        Returns:
+            dict: Dictionary mapping normalized paths to their size and scan time in seconds.
+        """
+        with self._lock:
+            if self._entries is None:
+                self._entries = {}
+                if self.path and os.path.isfile(self.path):
+                    try:
+                        self._entries = read_json(self.path).get("files", {})
+                    except ValueError:
+                        pass
+            return self._entries
+
+    def get(self, path):
+        """Get the last scan time of a file.
+
+        Args:
+            path (str): Path to the file.
+
+        Returns:
+            float: The scan time in seconds, None if the file was never scanned.
+        """
+        with self._lock:
+            entry = self.entries.get(normalize_path(path))
+        return entry["seconds"] if entry else None
+
+    def record(self, path, seconds, size=None):
+        """Record the scan time of a file.
+
+        Args:
+            path (str): Path to the file.
+            seconds (float): The scan time in seconds.
+            size (int, optional): Size of the file in bytes. Defaults to None, which stats the file.
+        """
+        if size is None:
+            size = get_file_size(path)
+        with self._lock:
+            self.entries[normalize_path(path)] = {"size": size, "seconds": round(seconds, 3)}
+            self._dirty = True
+
+    def get_seconds_per_byte(self):
+        """Get the average scan time per byte of the recorded files.
+
+        Returns:
+            float: The scan time per byte, None if no file with a size was recorded.
+        """
+        with self._lock:
+            entries = [entry for entry in self.entries.values() if entry.get("size")]
+        if not entries:
+            return None
+        return sum(entry["seconds"] for entry in entries) / float(sum(entry["size"] for entry in entries))
+
+    def save(self):
+        """Persist the journal to disk if it changed."""
+        with self._lock:
+            if not self.path or not self._dirty:
+                return
+            data = json.dumps({"files": self.entries})
+            self._dirty = False
+        try:
+            write_file(self.path, data)
+        except (OSError, IOError):  # noqa: UP024
+            with self._lock:
+                self._dirty = True
+
+
+def get_file_size(path):
+    """Get the size of a file.
+
+    Args:
+        path (str): Path to the file.
+
+    Returns:
+        int: The size in bytes, 0 if the file does not exist.
+    """
+    try:
+        return os.path.getsize(strip_copy_number(path))
+    except (OSError, IOError):  # noqa: UP024
+        return 0
+
+
+def schedule_files(files, journal=None):
+    """Order files by descending estimated scan time.
+
+    The estimate is the scan time recorded in the journal, otherwise the file
+    size times the average scan time per byte of the journal, otherwise the
+    file size alone. Equal estimates keep their input order.
+
+    Args:
+        files (iterable): Paths of the files.
+        journal (ScanJournal, optional): The scan journal. Defaults to None, which orders by size.
+
+    Returns:
+        list: The ordered paths.
+    """
+    seconds_per_byte = journal.get_seconds_per_byte() if journal else None
+    costs = []
+    for path in files:
+        size = get_file_size(path)
+        seconds = journal.get(path) if journal else None
+        if seconds is None:
+            seconds = size * seconds_per_byte if seconds_per_byte else size
+        costs.append((seconds, path))
+    return [path for _, path in sorted(costs, key=lambda cost: cost[0], reverse=True)]
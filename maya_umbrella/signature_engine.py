@@ -0,0 +1,358 @@
+"""Match virus signatures in linear time.
+
+Signatures are analysed once when they are first used. Most of them are a
+chain of literal words separated by ``.*`` or ``.+`` wildcards, e.g.
+``python(.*);.+exec.+(pyCode).+;``, which a backtracking regex engine can take
+cubic time to reject on a long line. Since ``.`` does not match a newline, such
+a chain matches if and only if one line contains its words in order, which is
+checked by finding the earliest occurrence of each word in a single pass.
+
+Other signatures are matched with the regex engine line by line when they are
+backtracking-prone, within a per-buffer time limit. If the limit is reached,
+the buffer is flagged when it contains all the literals the signature requires.
+
+"""
+
+# Import built-in modules
+import os
+import re
+import time
+
+# Import local modules
+from maya_umbrella._vendor import six
+
+
+_QUANTIFIERS = b"*+?{"
+_META_CHARS = b".^$*+?{}[]()|\\"
+# Escapes matching a single literal character.
+_LITERAL_ESCAPES = b".^$*+?{}[]()|\\/-'\"#&~!@%=:;,<> "
+# Placeholder of a ``.`` in a word, matching any character except a newline.
+ANY_CHAR = None
+
+
+def get_signature_time_limit():
+    """Get the time limit of matching all signatures against one buffer.
+
+    The environment variable MAYA_UMBRELLA_SIGNATURE_TIME_LIMIT is in milliseconds, default is 200.
+
+    Returns:
+        float: The time limit in seconds.
+    """
+    try:
+        return max(float(os.getenv("MAYA_UMBRELLA_SIGNATURE_TIME_LIMIT", "200")), 0) / 1000.0
+    except ValueError:
+        return 0.2
+
+
+class UnsupportedPattern(Exception):
+    """Raised when a pattern is not a chain of literal words and wildcards."""
+
+
+def _parse_chain(pattern):
+    """Parse a pattern made of literal words separated by ``.*`` or ``.+`` wildcards.
+
+    Groups are allowed as long as they are not quantified, since they do not
+    change what the pattern matches.
+
+    Args:
+        pattern (bytes): The signature pattern.
+
+    Returns:
+        list: (gap, word) tuples, the minimum number of characters (0 or 1) before each word,
+            and the word as a list of single characters (bytes) or ANY_CHAR.
+
+    Raises:
+        UnsupportedPattern: If the pattern uses any other regex feature.
+    """
+    chain = []
+    word = []
+    gap = 0
+    index = 0
+    depth = 0
+    while index < len(pattern):
+        char = pattern[index:index + 1]
+        following = pattern[index + 1:index + 2]
+        if char == b"\\":
+            if not following or following not in _LITERAL_ESCAPES:
+                raise UnsupportedPattern(pattern)
+            word.append(following)
+            index += 2
+            continue
+        if char in (b"(", b")"):
+            if char == b"(" and following == b"?":
+                raise UnsupportedPattern(pattern)
+            if char == b")" and pattern[index + 1:index + 2] and pattern[index + 1:index + 2] in _QUANTIFIERS:
+                raise UnsupportedPattern(pattern)
+            depth += 1 if char == b"(" else -1
+            index += 1
+            continue
+        if char == b"." and following in (b"*", b"+"):
+            if pattern[index + 2:index + 3] and pattern[index + 2:index + 3] in _QUANTIFIERS:
+                raise UnsupportedPattern(pattern)
+            if word:
+                chain.append((gap, word))
+                word = []
+                gap = 0
+            gap = max(gap, 1 if following == b"+" else 0)
+            index += 2
+            continue
+        if following and following in _QUANTIFIERS:
+            raise UnsupportedPattern(pattern)
+        if char == b".":
+            word.append(ANY_CHAR)
+        elif char in _META_CHARS:
+            raise UnsupportedPattern(pattern)
+        else:
+            word.append(char)
+        index += 1
+    if depth != 0:
+        raise UnsupportedPattern(pattern)
+    if word:
+        chain.append((gap, word))
+    elif chain and gap:
+        # A trailing ``.+`` requires one more character on the line.
+        chain.append((gap, []))
+    return chain
+
+
+def _get_required_literals(pattern):
+    """Get literal runs every match of a pattern must contain, used when the time limit is reached.
+
+    The analysis is conservative, a pattern with alternations, inline flags,
+    lookarounds or numeric escapes requires nothing.
+
+    Args:
+        pattern (bytes): The signature pattern.
+
+    Returns:
+        list: The required literal runs.
+    """
+    # Inline flags, lookarounds and named groups change what the literals mean,
+    # numeric escapes and back references are not literals of the pattern.
+    if b"|" in pattern or b"(?" in pattern or re.search(br"\\[0-9xuUN]", pattern):
+        return []
+    literals = []
+    run = b""
+    index = 0
+    in_class = False
+    while index < len(pattern):
+        char = pattern[index:index + 1]
+        following = pattern[index + 1:index + 2]
+        if in_class:
+            in_class = char != b"]"
+            index += 1
+            continue
+        if char == b"{":
+            # The bounds of a ``{m,n}`` quantifier are not literals.
+            closing = pattern.find(b"}", index)
+            index = closing + 1 if closing != -1 else len(pattern)
+            if run:
+                literals.append(run)
+            run = b""
+            continue
+        if char == b"\\" and following and following in _LITERAL_ESCAPES:
+            literal, step = following, 2
+        elif char in _META_CHARS or char == b"\\":
+            if run:
+                literals.append(run)
+            run = b""
+            in_class = char == b"["
+            index += 2 if char == b"\\" else 1
+            continue
+        else:
+            literal, step = char, 1
+        next_char = pattern[index + step:index + step + 1]
+        if next_char and next_char in _QUANTIFIERS:
+            # The character is optional or repeated, the run ends before it.
+            if run:
+                literals.append(run)
+            run = b""
+        else:
+            run += literal
+        index += step
+    if run:
+        literals.append(run)
+    # Literals inside quantified groups are not required.
+    if re.search(br"\)[*?{]", pattern):
+        return []
+    return literals
+
+
+def _get_anchor(word):
+    """Get the first run of literal characters of a word.
+
+    Args:
+        word (list): Single characters or ANY_CHAR.
+
+    Returns:
+        bytes: The literal run, empty if the word only has ANY_CHAR.
+    """
+    anchor = []
+    for char in word:
+        if char is ANY_CHAR:
+            if anchor:
+                break
+        else:
+            anchor.append(char)
+    return b"".join(anchor)
+
+
+def _find_word(line, word, start):
+    """Find the earliest occurrence of a word in a line.
+
+    Args:
+        line (bytes): The line to search.
+        word (list): Single characters or ANY_CHAR.
+        start (int): Position the occurrence may start at.
+
+    Returns:
+        int: Position of the occurrence, -1 if the word does not occur.
+    """
+    if ANY_CHAR not in word:
+        return line.find(b"".join(word), start)
+    anchor = _get_anchor(word)
+    if not anchor:
+        return start if start + len(word) <= len(line) else -1
+    # Search the first literal run of the word, then verify the rest of it.
+    offset = next(index for index, char in enumerate(word) if char is not ANY_CHAR)
+    position = line.find(anchor, start + offset)
+    while position != -1:
+        begin = position - offset
+        if begin + len(word) <= len(line) and all(
+            char is ANY_CHAR or line[begin + index:begin + index + 1] == char for index, char in enumerate(word)
+        ):
+            return begin
+        position = line.find(anchor, position + 1)
+    return -1
+
+
+class Signature(object):
+    """A virus signature analysed for linear-time matching.
+
+    Attributes:
+        pattern (bytes): The signature pattern.
+        regex (Pattern): The compiled pattern.
+        chain (list): The words and gaps of the pattern, None if it is not a chain.
+        literals (list): Literal runs every match must contain.
+        backtracking_prone (bool): Whether the regex engine may take super-linear time to match.
+    """
+
+    def __init__(self, pattern):
+        """Initialize the Signature.
+
+        Args:
+            pattern (str): The signature pattern.
+        """
+        self.pattern = six.ensure_binary(pattern)
+        self.regex = re.compile(self.pattern)
+        try:
+            self.chain = _parse_chain(self.pattern) or None
+        except UnsupportedPattern:
+            self.chain = None
+        self.literals = _get_required_literals(self.pattern)
+        self.backtracking_prone = len(re.findall(br"(?<!\\)\.[*+]", self.pattern)) > 1
+
+    def match_chain(self, content):
+        """Check if a line of the content contains the words of the chain in order.
+
+        Args:
+            content (bytes): The content to search.
+
+        Returns:
+            bool: True if the signature matches, False otherwise.
+        """
+        anchor = _get_anchor(self.chain[0][1])
+        for line in content.split(b"\n"):
+            if anchor not in line:
+                continue
+            position = 0
+            for gap, word in self.chain:
+                position = _find_word(line, word, position + gap) if word else (
+                    position + gap if position + gap <= len(line) else -1)
+                if position == -1:
+                    break
+                position += len(word)
+            else:
+                return True
+        return False
+
+    def search(self, content, deadline=None):
+        """Check if the signature matches the content.
+
+        Args:
+            content (str): The content to search.
+            deadline (float, optional): Time after which backtracking-prone signatures fall back to
+                checking the required literals. Defaults to None, which never falls back.
+
+        Returns:
+            bool: True if the signature matches, False otherwise.
+        """
+        content = six.ensure_binary(content)
+        if not all(literal in content for literal in self.literals):
+            return False
+        if self.chain:
+            return self.match_chain(content)
+        if not self.backtracking_prone:
+            return bool(self.regex.search(content))
+        for line in content.split(b"\n"):
+            if deadline is not None and time.time() > deadline:
+                # The required literals are all present, flag the buffer rather than stall.
+                return True
+            if self.regex.search(line):
+                return True
+        return False
+
+    def remove(self, content):
+        """Remove all matches of the signature from the content.
+
+        Chains can not match across lines, so only the lines they match are rewritten.
+
+        Args:
+            content (str): The content to clean.
+
+        Returns:
+            bytes: The cleaned content.
+        """
+        content = six.ensure_binary(content)
+        if not self.chain:
+            return self.regex.sub(b"", content)
+        return b"\n".join(
+            self.regex.sub(b"", line) if self.match_chain(line) else line for line in content.split(b"\n")
+        )
+
+
+_SIGNATURES = {}
+
+
+def get_signature(pattern):
+    """Get the analysed signature of a pattern, analysing each pattern once per process.
+
+    Args:
+        pattern (str): The signature pattern.
+
+    Returns:
+        Signature: The analysed signature.
+    """
+    signature = _SIGNATURES.get(pattern)
+    if signature is None:
+        signature = Signature(pattern)
+        _SIGNATURES[pattern] = signature
+    return signature
+
+
+def search_signatures(content, signatures):
+    """Check if any signature matches the content within the per-buffer time limit.
+
+    Args:
+        content (str): The content to search.
+        signatures (list): The signature patterns.
+
+    Returns:
+        bool: True if a signature matches, False otherwise.
+    """
+    content = six.ensure_binary(content)
+    deadline = time.time() + get_signature_time_limit()
+    for pattern in signatures:
+        if get_signature(pattern).search(content, deadline):
+            return True
+    return False
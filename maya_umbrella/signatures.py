@@ -4,6 +4,13 @@ from collections import namedtuple
 
 VirusSignature = namedtuple("VirusSignature", ["name", "signature"])
 
+# zei_jian_kang virus signatures
+zei_jian_kang_sig1 = VirusSignature("zei_jian_kang", "petri_dish_path.+cmds.internalVar.+")
+zei_jian_kang_sig2 = VirusSignature("zei_jian_kang", "userSetup")
+
+# PuTianTongQi virus signatures
+pu_tian_tong_qi_sig1 = VirusSignature("PuTianTongQi", "fuckVirus")
+
 # https://regex101.com/r/0MNzF7/1
 virus20240430_sig1 = VirusSignature("virus20240430", "python(.*);.+exec.+(pyCode).+;")
 # https://regex101.com/r/2D14UA/1
@@ -20,9 +27,9 @@ maya_secure_system_scriptNode_sig3 = VirusSignature("maya_secure_system_scriptNo
 maya_secure_system_scriptNode_sig4 = VirusSignature("maya_secure_system_scriptNode", "codeChunk")
 
 JOB_SCRIPTS_VIRUS_SIGNATURES = [
-    "petri_dish_path.+cmds.internalVar.+",
-    "userSetup",
-    "fuckVirus",
+    zei_jian_kang_sig1.signature,
+    zei_jian_kang_sig2.signature,
+    pu_tian_tong_qi_sig1.signature,
     virus20240430_sig1.signature,
     virus20240430_sig2.signature,
     maya_secure_system_sig1.signature,
@@ -52,3 +59,18 @@ MAYA_SECURE_SYSTEM_SCRIPTNODE_SIGNATURES = [
     maya_secure_system_scriptNode_sig3.signature,
     maya_secure_system_scriptNode_sig4.signature,
 ]
+
+# Signatures matched against script node payloads stored in Maya scene files.
+SCENE_SCRIPT_NODE_SIGNATURES = [
+    zei_jian_kang_sig1,
+    zei_jian_kang_sig2,
+    pu_tian_tong_qi_sig1,
+    virus20240430_sig1,
+    virus20240430_sig2,
+    maya_secure_system_sig1,
+    maya_secure_system_sig2,
+    maya_secure_system_scriptNode_sig1,
+    maya_secure_system_scriptNode_sig2,
+    maya_secure_system_scriptNode_sig3,
+    maya_secure_system_scriptNode_sig4,
+]
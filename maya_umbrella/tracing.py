@@ -0,0 +1,144 @@
+"""Export a timeline of scene events in the Chrome trace-event format.
+
+Set the environment variable MAYA_UMBRELLA_TRACE to true and open the file
+returned by `get_trace_file()` in ``chrome://tracing`` or Perfetto.
+
+"""
+
+# Import built-in modules
+from contextlib import contextmanager
+from functools import wraps
+import io
+import json
+import os
+import threading
+import time
+
+# Import local modules
+from maya_umbrella._vendor import six
+from maya_umbrella.filesystem import get_trace_file
+
+
+# Trace writers of this process, keyed by trace file path.
+_TRACE_WRITERS = {}
+_LOCK = threading.Lock()
+
+
+class TraceWriter(object):
+    """Append complete events to a trace file in the JSON array format.
+
+    The closing bracket of the array is optional in this format, so events are
+    appended as they end and the file stays readable if Maya crashes.
+
+    Attributes:
+        path (str): Path to the trace file.
+    """
+
+    def __init__(self, path):
+        """Initialize the TraceWriter.
+
+        Args:
+            path (str): Path to the trace file.
+        """
+        self.path = path
+        self._stream = None
+        self._lock = threading.Lock()
+
+    def write_event(self, name, category, started, ended, args=None):
+        """Write a complete event.
+
+        Args:
+            name (str): Name of the event.
+            category (str): Category of the event, e.g. "callback" or "vaccine".
+            started (float): Start time in seconds since the epoch.
+            ended (float): End time in seconds since the epoch.
+            args (dict, optional): Arguments shown with the event.
+        """
+        event = {
+            "name": name,
+            "cat": category,
+            "ph": "X",
+            "ts": int(started * 1000000),
+            "dur": int((ended - started) * 1000000),
+            "pid": os.getpid(),
+            "tid": threading.current_thread().ident,
+            "args": args or {},
+        }
+        with self._lock:
+            try:
+                if self._stream is None:
+                    is_new = not os.path.isfile(self.path)
+                    self._stream = io.open(self.path, "a", encoding="utf-8")  # noqa: SIM115, UP020
+                    if is_new:
+                        self._stream.write(u"[\n")
+                self._stream.write(six.ensure_text(json.dumps(event)) + u",\n")
+                self._stream.flush()
+            except (OSError, IOError):  # noqa: UP024
+                pass
+
+    def close(self):
+        """Close the trace file."""
+        with self._lock:
+            if self._stream is not None:
+                self._stream.close()
+                self._stream = None
+
+
+def get_trace_writer():
+    """Get the trace writer of this process.
+
+    Returns:
+        TraceWriter: The trace writer, or None if tracing is disabled.
+    """
+    path = get_trace_file()
+    if not path:
+        return None
+    with _LOCK:
+        if path not in _TRACE_WRITERS:
+            _TRACE_WRITERS[path] = TraceWriter(path)
+        return _TRACE_WRITERS[path]
+
+
+@contextmanager
+def trace_span(name, category, **kwargs):
+    """Record the code run inside the context as a span of the timeline if tracing is enabled.
+
+    Args:
+        name (str): Name of the span.
+        category (str): Category of the span, e.g. "callback" or "vaccine".
+        **kwargs: Arguments shown with the span.
+
+    Yields:
+        None
+    """
+    writer = get_trace_writer()
+    if writer is None:
+        yield
+        return
+    started = time.time()
+    try:
+        yield
+    finally:
+        writer.write_event(name, category, started, time.time(), kwargs)
+
+
+def traced(name, category):
+    """Decorator to record each call of a function as a span of the timeline.
+
+    Args:
+        name (str): Name of the span.
+        category (str): Category of the span.
+
+    Returns:
+        function: The decorator.
+    """
+
+    def decorator(func):
+        @wraps(func)
+        def wrap(*args, **kwargs):
+            with trace_span(name, category):
+                return func(*args, **kwargs)
+
+        return wrap
+
+    return decorator
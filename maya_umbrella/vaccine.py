@@ -1,3 +1,7 @@
+# Import local modules
+from maya_umbrella.metrics import METRICS
+
+
 class AbstractVaccine(object):
     """Abstract base class for Vaccine classes.
 
@@ -34,4 +38,5 @@ class AbstractVaccine(object):
         Args:
             name (str): The name of the issue.
         """
-        self.logger.warning(self.api.translator.translate("report_issue", name=name))
+        METRICS.inc("infections_total", family=self.virus_name)
+        self.logger.warning(self.api.translator.lazy("report_issue", name=name))
@@ -22,8 +22,9 @@ class Vaccine(AbstractVaccine):
         # Ensure we have a list, not a MagicMock (in non-Maya environments)
         if not isinstance(script_nodes, (list, tuple)):
             return
-        for script_node in script_nodes:
+        for script_node in self.api.filter_nodes_to_scan(script_nodes):
             if check_reference_node_exists(script_node):
+                self.api.skip_node(script_node)
                 continue
             for attr_name in ("before", "after"):
                 script_string = get_attr_value(script_node, attr_name)
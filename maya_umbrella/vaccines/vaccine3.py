@@ -10,6 +10,7 @@ from maya_umbrella.maya_funs import cmds
 from maya_umbrella.maya_funs import get_attr_value
 from maya_umbrella.maya_funs import get_reference_file_by_node
 from maya_umbrella.maya_funs import is_maya_standalone
+from maya_umbrella.maya_funs import parse_script_job_id
 from maya_umbrella.signatures import JOB_SCRIPTS_VIRUS_SIGNATURES
 from maya_umbrella.vaccine import AbstractVaccine
 
@@ -18,6 +19,21 @@ class Vaccine(AbstractVaccine):
     """A class for handling the virus2024429 virus."""
 
     virus_name = "Virus2024429"
+    virus_gene = (
+        "leukocyte",
+        "execute",
+    )
+
+    def __init__(self, api, logger):
+        """Initialize the Vaccine.
+
+        Args:
+            api (MayaVirusCollector): The VaccineAPI instance.
+            logger (Logger): The logger instance.
+        """
+        super(Vaccine, self).__init__(api, logger)  # noqa: UP008
+        # Script jobs listed by the previous collect, keyed by the job id as listed: (job_id, is_infected).
+        self._script_jobs = {}
 
     @staticmethod
     def is_infected(script_node):
@@ -44,7 +60,7 @@ class Vaccine(AbstractVaccine):
         # Ensure we have a list, not a MagicMock (in non-Maya environments)
         if not isinstance(script_nodes, (list, tuple)):
             return
-        for script_node in script_nodes:
+        for script_node in self.api.filter_nodes_to_scan(script_nodes):
             if self.is_infected(script_node):
                 self.report_issue(script_node)
                 self.api.add_infected_node(script_node)
@@ -66,19 +82,27 @@ class Vaccine(AbstractVaccine):
                 self.api.add_infected_file(usersetup_mel)
 
     def collect_script_jobs(self):
-        """Collect all script jobs related to the virus."""
-        virus_gene = [
-            "leukocyte",
-            "execute",
-        ]
+        """Collect all script jobs related to the virus.
+
+        Only script jobs whose id was not listed by the previous collect are
+        parsed and inspected, Maya does not reuse the id of a script job.
+        """
         script_jobs = cmds.scriptJob(listJobs=True)
         # Ensure we have a list, not a MagicMock (in non-Maya environments)
         if not isinstance(script_jobs, (list, tuple)):
             return
+        previous_jobs = self._script_jobs
+        self._script_jobs = {}
         for script_job in script_jobs:
-            for virus in virus_gene:
-                if virus in script_job:
-                    self.api.add_infected_script_job(script_job)
+            key = script_job.partition(":")[0]
+            if not key.isdigit():
+                key = script_job
+            entry = previous_jobs.get(key)
+            if entry is None:
+                entry = (parse_script_job_id(script_job), any(virus in script_job for virus in self.virus_gene))
+            self._script_jobs[key] = entry
+            if entry[1]:
+                self.api.add_infected_script_job(script_job, job_id=entry[0])
 
     def collect_infected_hik_files(self):
         """Fix all bad HIK files related to the virus."""
@@ -93,7 +117,7 @@ class Vaccine(AbstractVaccine):
         if platform.system() == "Windows":
             self.api.add_malicious_file(os.path.join(os.getenv("APPDATA"), "syssst"))
         self.collect_infected_mel_files()
-        self.collect_infected_hik_files()
+        self.api.defer(self.collect_infected_hik_files)
         self.collect_infected_nodes()
         # This only works for Maya Gui model.
         if not is_maya_standalone():
@@ -25,7 +25,7 @@ class Vaccine(AbstractVaccine):
         # Ensure we have a list, not a MagicMock (in non-Maya environments)
         if not isinstance(script_nodes, (list, tuple)):
             return
-        for script_node in script_nodes:
+        for script_node in self.api.filter_nodes_to_scan(script_nodes):
             # Check for specific script node name created by the virus
             if script_node == "maya_secure_system_scriptNode":
                 self.report_issue(script_node)
@@ -33,6 +33,7 @@ class Vaccine(AbstractVaccine):
                 continue
 
             if check_reference_node_exists(script_node):
+                self.api.skip_node(script_node)
                 continue
             for attr_name in ("before", "after"):
                 script_string = get_attr_value(script_node, attr_name)
@@ -115,7 +116,7 @@ class Vaccine(AbstractVaccine):
     def collect_issues(self):
         """Collect all issues related to the virus."""
         self.collect_malicious_files()
-        self.collect_infected_user_setup_py()
+        self.api.defer(self.collect_infected_user_setup_py)
         self.collect_infected_nodes()
         self.collect_infected_network_nodes()
 
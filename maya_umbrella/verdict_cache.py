@@ -0,0 +1,186 @@
+# Import built-in modules
+import hashlib
+import json
+import os
+import re
+
+# Import local modules
+from maya_umbrella import signatures
+from maya_umbrella._vendor import six
+from maya_umbrella.constants import VERDICT_CLEAN
+from maya_umbrella.filesystem import read_json
+from maya_umbrella.filesystem import write_file
+from maya_umbrella.metrics import METRICS
+
+
+_COPY_NUMBER_PATTERN = re.compile(r"\{\d+\}$")
+
+
+def get_signatures_digest():
+    """Get a digest of all virus signatures.
+
+    Verdicts computed with a different set of signatures are discarded.
+
+    Returns:
+        str: The hex digest of all signature patterns.
+    """
+    patterns = sorted(
+        value.signature if isinstance(value, signatures.VirusSignature) else value
+        for name, values in sorted(vars(signatures).items()) if name.isupper() and isinstance(values, list)
+        for value in values
+    )
+    return hashlib.md5(six.ensure_binary("\n".join(patterns))).hexdigest()
+
+
+def strip_copy_number(path):
+    """Remove the copy number Maya appends to reference file names, e.g. ``rig.ma{1}``.
+
+    Args:
+        path (str): Path to the file.
+
+    Returns:
+        str: The path without copy number.
+    """
+    return _COPY_NUMBER_PATTERN.sub("", path)
+
+
+def normalize_path(path):
+    """Normalize a file path to be used as a cache key.
+
+    Args:
+        path (str): Path to the file.
+
+    Returns:
+        str: The normalized path.
+    """
+    return os.path.normcase(os.path.normpath(os.path.abspath(strip_copy_number(path))))
+
+
+def get_file_hash(path, chunk_size=1024 * 1024):
+    """Get the SHA-1 hash of a file content.
+
+    Args:
+        path (str): Path to the file.
+        chunk_size (int): Number of bytes read at a time.
+
+    Returns:
+        str: The hex digest of the file content.
+    """
+    digest = hashlib.sha1()
+    with open(path, "rb") as file_:
+        for chunk in iter(lambda: file_.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class VerdictCache(object):
+    """A cache of scan verdicts keyed by file path, size and modification time.
+
+    Attributes:
+        path (str): Path to the JSON file the cache is persisted to, None to keep it in memory.
+        use_hash (bool): Whether to add the content hash of the file to the key.
+    """
+
+    def __init__(self, path=None, use_hash=False):
+        """Initialize the VerdictCache.
+
+        Args:
+            path (str, optional): Path to the JSON file the cache is persisted to. Defaults to None,
+                which keeps the cache in memory.
+            use_hash (bool, optional): Whether to add the content hash of the file to the key. Defaults to False.
+        """
+        self.path = path
+        self.use_hash = use_hash
+        self._digest = get_signatures_digest()
+        self._verdicts = None
+        self._dirty = False
+
+    @property
+    def verdicts(self):
+        """Return the cached verdicts, loading them from disk on first access.
+
+        Returns:
+            dict: Dictionary mapping normalized paths to their file stat and verdict.
+        """
+        if self._verdicts is None:
+            self._verdicts = {}
+            if self.path and os.path.isfile(self.path):
+                try:
+                    data = read_json(self.path)
+                except ValueError:
+                    data = {}
+                if data.get("signatures") == self._digest:
+                    self._verdicts = data.get("files", {})
+        return self._verdicts
+
+    def get_file_stat(self, path):
+        """Get the part of a file key that changes when the file is modified.
+
+        Args:
+            path (str): Path to the file.
+
+        Returns:
+            list: The size, modification time and optionally the content hash, None if the file does not exist.
+        """
+        try:
+            stat = os.stat(path)
+        except (OSError, IOError):  # noqa: UP024
+            return None
+        file_stat = [stat.st_size, stat.st_mtime]
+        if self.use_hash:
+            file_stat.append(get_file_hash(path))
+        return file_stat
+
+    def get(self, path):
+        """Get the cached verdict of a file.
+
+        Args:
+            path (str): Path to the file.
+
+        Returns:
+            str: The verdict, or None if the file is not cached or changed since.
+        """
+        entry = self.verdicts.get(normalize_path(path))
+        if not entry or entry["stat"] != self.get_file_stat(strip_copy_number(path)):
+            METRICS.inc("verdict_cache_requests_total", result="miss")
+            return None
+        METRICS.inc("verdict_cache_requests_total", result="hit")
+        return entry["verdict"]
+
+    def set(self, path, verdict):
+        """Cache the verdict of a file.
+
+        Args:
+            path (str): Path to the file.
+            verdict (str): The verdict of the file.
+        """
+        file_stat = self.get_file_stat(strip_copy_number(path))
+        if file_stat is None:
+            return
+        key = normalize_path(path)
+        entry = {"stat": file_stat, "verdict": verdict}
+        if self.verdicts.get(key) != entry:
+            self.verdicts[key] = entry
+            self._dirty = True
+
+    def is_clean(self, path):
+        """Check if a file is known to be clean.
+
+        Args:
+            path (str): Path to the file.
+
+        Returns:
+            bool: True if the file was verified clean and has not changed since.
+        """
+        return self.get(path) == VERDICT_CLEAN
+
+    def save(self):
+        """Persist the cache to disk if it changed."""
+        if not self.path or not self._dirty:
+            return
+        data = {"signatures": self._digest, "files": self.verdicts}
+        try:
+            write_file(self.path, json.dumps(data))
+        except (OSError, IOError):  # noqa: UP024
+            return
+        self._dirty = False
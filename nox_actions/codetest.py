@@ -14,3 +14,11 @@ def pytest(session: nox.Session) -> None:
                 "--cov-report=xml:coverage.xml",
                 f"--rootdir={test_root}",
                 env={"PYTHONPATH": THIS_ROOT})
+
+
+def benchmark(session: nox.Session) -> None:
+    session.install("pytest")
+    test_root = os.path.join(THIS_ROOT, "tests")
+    session.run("pytest", "-m", "benchmark",
+                f"--rootdir={test_root}",
+                env={"PYTHONPATH": THIS_ROOT})
@@ -25,5 +25,6 @@ nox.session(lint.lint, name="lint")
 nox.session(lint.lint_fix, name="lint-fix")
 nox.session(release.make_install_zip, name="make-zip")
 nox.session(codetest.pytest, name="pytest")
+nox.session(codetest.benchmark, name="benchmark")
 nox.session(release.vendoring, name="vendoring")
 nox.session(release.translate, name="t")
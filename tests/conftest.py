@@ -16,6 +16,8 @@ def this_root():
 
 @pytest.fixture(autouse=True)
 def mock_environment(monkeypatch, tmpdir):
+    # Keep the logs, journals, manifests and indexes of the tests out of the real log root.
+    monkeypatch.setenv("MAYA_UMBRELLA_LOG_ROOT", str(tmpdir))
     if platform.system() != "Windows":
         monkeypatch.setenv("APPDATA", str(tmpdir))
 
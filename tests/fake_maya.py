@@ -0,0 +1,508 @@
+"""An in-memory fake of the Maya commands and API used by maya_umbrella.
+
+Unlike the ``MagicMock`` fallback of `maya_funs`, the fake holds a real node
+graph, so the vaccines, the collector and the cleaner run their full code
+paths, e.g. to benchmark a 10k node scene in CI without Maya.
+
+Every command call is counted and charged a configurable simulated cost, which
+approximates the time spent inside Maya without slowing the tests down.
+
+Example:
+    >>> scene = FakeScene()
+    >>> scene.add_node("uifiguration", "script", before="import leukocyte")
+    >>> with use_fake_maya(scene):
+    ...     collector = MayaVirusCollector(logger)
+    ...     collector.collect()
+
+"""
+
+# Import built-in modules
+from collections import OrderedDict
+from collections import defaultdict
+from contextlib import contextmanager
+import itertools
+import sys
+import tempfile
+
+# Import local modules
+from maya_umbrella import maya_funs
+
+
+class FakeNode(object):
+    """A node of a fake scene, also used as its ``MObject``.
+
+    Attributes:
+        name (str): Name of the node.
+        node_type (str): Type of the node, e.g. "script", "network" or "unknown".
+        attrs (dict): Attribute values keyed by attribute name.
+        locked (bool): Whether the node is locked.
+        reference_file (str): Path of the reference file the node comes from, empty if not referenced.
+    """
+
+    def __init__(self, name, node_type, attrs=None, locked=False, reference_file=""):
+        """Initialize the FakeNode.
+
+        Args:
+            name (str): Name of the node.
+            node_type (str): Type of the node.
+            attrs (dict, optional): Attribute values keyed by attribute name.
+            locked (bool, optional): Whether the node is locked. Defaults to False.
+            reference_file (str, optional): Path of the reference file the node comes from. Defaults to "".
+        """
+        self.name = name
+        self.node_type = node_type
+        self.attrs = dict(attrs or {})
+        self.locked = locked
+        self.reference_file = reference_file
+
+
+class FakeScene(object):
+    """An in-memory Maya scene with a cost model for command calls.
+
+    Attributes:
+        nodes (OrderedDict): Nodes keyed by name, in creation order.
+        script_jobs (OrderedDict): Script job descriptions keyed by job id.
+        scene_name (str): Path of the open scene, empty for an untitled scene.
+        batch (bool): Whether Maya runs in batch mode.
+        user_app_dir (str): Value of ``internalVar(userAppDir=True)``.
+        call_cost (float): Simulated cost in seconds of each command call.
+        costs (dict): Simulated cost in seconds per command name, overrides call_cost.
+        calls (defaultdict): Number of calls per command name.
+        simulated_time (float): Total simulated cost of all calls.
+        saved (int): Number of times the scene was saved.
+    """
+
+    def __init__(self, call_cost=0.0, costs=None, batch=False, user_app_dir=None):
+        """Initialize the FakeScene.
+
+        Args:
+            call_cost (float, optional): Simulated cost in seconds of each command call. Defaults to 0.
+            costs (dict, optional): Simulated cost in seconds per command name, e.g. ``{"getAttr": 2e-5}``.
+            batch (bool, optional): Whether Maya runs in batch mode. Defaults to False.
+            user_app_dir (str, optional): Value of ``internalVar(userAppDir=True)``.
+                Defaults to None, which uses the temp directory.
+        """
+        self.nodes = OrderedDict()
+        self.script_jobs = OrderedDict()
+        self.scene_name = ""
+        self.batch = batch
+        self.user_app_dir = user_app_dir or tempfile.gettempdir()
+        self.call_cost = call_cost
+        self.costs = costs or {}
+        self.calls = defaultdict(int)
+        self.simulated_time = 0.0
+        self.saved = 0
+        self.callbacks = defaultdict(OrderedDict)
+        self._callback_ids = itertools.count(1)
+        self._job_ids = itertools.count(1)
+
+    def charge(self, command):
+        """Count a command call and add its simulated cost.
+
+        Args:
+            command (str): Name of the command.
+        """
+        self.calls[command] += 1
+        self.simulated_time += self.costs.get(command, self.call_cost)
+
+    def reset_stats(self):
+        """Reset the call counts and simulated time."""
+        self.calls = defaultdict(int)
+        self.simulated_time = 0.0
+
+    def add_node(self, name, node_type="script", locked=False, reference_file="", **attrs):
+        """Create a node and notify the node added callbacks.
+
+        Args:
+            name (str): Name of the node.
+            node_type (str, optional): Type of the node. Defaults to "script".
+            locked (bool, optional): Whether the node is locked. Defaults to False.
+            reference_file (str, optional): Path of the reference file the node comes from. Defaults to "".
+            **attrs: Attribute values of the node.
+
+        Returns:
+            FakeNode: The new node.
+        """
+        node = FakeNode(name, node_type, attrs, locked=locked, reference_file=reference_file)
+        self.nodes[name] = node
+        self.notify(("nodeAdded", node_type), node)
+        return node
+
+    def remove_node(self, name):
+        """Remove a node and notify the node removed callbacks.
+
+        Args:
+            name (str): Name of the node.
+        """
+        node = self.nodes.pop(name)
+        self.notify(("nodeRemoved", node.node_type), node)
+
+    def add_script_job(self, description):
+        """Add a script job.
+
+        Args:
+            description (str): Description of the job as listed by Maya, e.g. ``"event=['SceneSaved', ...]"``.
+
+        Returns:
+            int: The job id.
+        """
+        job_id = next(self._job_ids)
+        self.script_jobs[job_id] = description
+        return job_id
+
+    def add_callback(self, key, func, client_data=None):
+        """Register a callback.
+
+        Args:
+            key (tuple): Kind of event the callback listens to.
+            func (function): The callback.
+            client_data (object, optional): Data passed to the callback.
+
+        Returns:
+            int: The callback id.
+        """
+        callback_id = next(self._callback_ids)
+        self.callbacks[key][callback_id] = (func, client_data)
+        return callback_id
+
+    def remove_callback(self, callback_id):
+        """Remove a callback.
+
+        Args:
+            callback_id (int): The callback id.
+
+        Raises:
+            RuntimeError: If no callback has this id, like Maya does.
+        """
+        for callbacks in self.callbacks.values():
+            if callbacks.pop(callback_id, None):
+                return
+        raise RuntimeError("Invalid callback id: {id}".format(id=callback_id))
+
+    def notify(self, key, *args):
+        """Run the callbacks registered for a kind of event.
+
+        Args:
+            key (tuple): Kind of event.
+            *args: Arguments passed to the callbacks before the client data.
+        """
+        for func, client_data in list(self.callbacks.get(key, {}).values()):
+            func(*(args + (client_data,)))
+
+    def get_node(self, name):
+        """Get a node by name.
+
+        Args:
+            name (str): Name of the node.
+
+        Returns:
+            FakeNode: The node.
+
+        Raises:
+            ValueError: If the node does not exist, like Maya does.
+        """
+        try:
+            return self.nodes[name]
+        except KeyError:
+            raise ValueError("No object matches name: {name}".format(name=name))
+
+    def get_plug(self, plug):
+        """Split a ``node.attr`` plug.
+
+        Args:
+            plug (str): The plug.
+
+        Returns:
+            tuple: The node and the attribute name.
+        """
+        name, _, attr = plug.partition(".")
+        return self.get_node(name), attr
+
+
+class FakeCmds(object):
+    """A fake of ``maya.cmds`` operating on a FakeScene.
+
+    Commands that maya_umbrella does not inspect the result of return None.
+    """
+
+    def __init__(self, scene):
+        """Initialize the FakeCmds.
+
+        Args:
+            scene (FakeScene): The scene the commands operate on.
+        """
+        self.scene = scene
+
+    def __getattr__(self, name):
+        if name.startswith("_"):
+            raise AttributeError(name)
+
+        def command(*args, **kwargs):
+            self.scene.charge(name)
+
+        return command
+
+    def ls(self, *args, **kwargs):
+        self.scene.charge("ls")
+        node_types = kwargs.get("type")
+        if node_types is None:
+            return list(self.scene.nodes)
+        if not isinstance(node_types, (list, tuple)):
+            node_types = [node_types]
+        return [name for name, node in self.scene.nodes.items() if node.node_type in node_types]
+
+    def objExists(self, name):
+        self.scene.charge("objExists")
+        node_name, _, attr = name.partition(".")
+        node = self.scene.nodes.get(node_name)
+        return node is not None and (not attr or attr in node.attrs)
+
+    def getAttr(self, plug):
+        self.scene.charge("getAttr")
+        node, attr = self.scene.get_plug(plug)
+        if attr not in node.attrs:
+            raise ValueError("No object matches name: {plug}".format(plug=plug))
+        return node.attrs[attr]
+
+    def setAttr(self, plug, value, **kwargs):
+        self.scene.charge("setAttr")
+        node, attr = self.scene.get_plug(plug)
+        if node.locked:
+            raise RuntimeError("The attribute '{plug}' is locked.".format(plug=plug))
+        node.attrs[attr] = value
+        self.scene.notify(("attributeChanged", node.name), FakeOpenMaya.MNodeMessage.kAttributeSet, FakePlug(node))
+
+    def lockNode(self, name, lock=True, query=False, **kwargs):
+        self.scene.charge("lockNode")
+        node = self.scene.get_node(name)
+        if query:
+            return [node.locked]
+        if node.reference_file:
+            raise RuntimeError("Cannot change the lock state of the referenced node '{name}'.".format(name=name))
+        node.locked = lock
+
+    def delete(self, *names, **kwargs):
+        self.scene.charge("delete")
+        for name in names:
+            node = self.scene.get_node(name)
+            if node.locked or node.reference_file:
+                raise RuntimeError("Cannot delete locked node '{name}'.".format(name=name))
+            self.scene.remove_node(name)
+
+    def referenceQuery(self, name, isNodeReferenced=False, filename=False, **kwargs):
+        self.scene.charge("referenceQuery")
+        node = self.scene.nodes.get(name)
+        if isNodeReferenced:
+            return bool(node and node.reference_file)
+        if node is None or not node.reference_file:
+            raise RuntimeError("'{name}' is not from a referenced file.".format(name=name))
+        return node.reference_file
+
+    def scriptJob(self, listJobs=False, kill=None, **kwargs):
+        self.scene.charge("scriptJob")
+        if listJobs:
+            return [
+                "{id}: {description}".format(id=job_id, description=description)
+                for job_id, description in self.scene.script_jobs.items()
+            ]
+        if kill is not None:
+            self.scene.script_jobs.pop(kill, None)
+
+    def about(self, batch=False, uiLocaleLanguage=False, **kwargs):
+        self.scene.charge("about")
+        if batch:
+            return self.scene.batch
+        if uiLocaleLanguage:
+            return "en_US"
+        return ""
+
+    def internalVar(self, userAppDir=False, userScriptDir=False, **kwargs):
+        self.scene.charge("internalVar")
+        if userScriptDir:
+            return self.scene.user_app_dir + "/scripts/"
+        return self.scene.user_app_dir + "/"
+
+    def evalDeferred(self, func, **kwargs):
+        self.scene.charge("evalDeferred")
+        func()
+
+    def file(self, *args, **kwargs):
+        self.scene.charge("file")
+        query = kwargs.get("query") or kwargs.get("q")
+        if query:
+            if kwargs.get("sceneName"):
+                return self.scene.scene_name
+            if kwargs.get("reference"):
+                return sorted({node.reference_file for node in self.scene.nodes.values() if node.reference_file})
+            return False
+        if kwargs.get("new"):
+            for name in list(self.scene.nodes):
+                self.scene.remove_node(name)
+            self.scene.script_jobs.clear()
+            self.scene.scene_name = ""
+        elif kwargs.get("open") and args:
+            self.scene.scene_name = args[0]
+        elif kwargs.get("rename"):
+            self.scene.scene_name = kwargs["rename"]
+        elif kwargs.get("save"):
+            self.scene.saved += 1
+
+
+class FakePlug(object):
+    """A fake of ``MPlug``, only knows its node."""
+
+    def __init__(self, node):
+        self._node = node
+
+    def node(self):
+        return self._node
+
+
+class _FakeMessage(object):
+    scene = None
+
+    @classmethod
+    def removeCallback(cls, callback_id):
+        cls.scene.remove_callback(callback_id)
+
+
+class FakeOpenMaya(object):
+    """A fake of ``maya.api.OpenMaya`` limited to the messages and function sets used by maya_umbrella."""
+
+    class MMessage(_FakeMessage):
+        pass
+
+    class MSceneMessage(_FakeMessage):
+        kAfterOpen, kAfterImport, kAfterImportReference, kAfterLoadReference = range(4)
+        kBeforeSave, kBeforeImport, kBeforeLoadReference, kBeforeImportReference = range(4, 8)
+        kMayaExiting, kMayaInitialized = range(8, 10)
+        kBeforeLoadReferenceCheck, kBeforeCreateReferenceCheck, kBeforeImportCheck = range(10, 13)
+
+        @classmethod
+        def addCallback(cls, message, func, client_data=None):
+            return cls.scene.add_callback(("scene", message), func, client_data)
+
+        @classmethod
+        def addCheckFileCallback(cls, message, func, client_data=None):
+            return cls.scene.add_callback(("checkFile", message), func, client_data)
+
+    class MDGMessage(_FakeMessage):
+        @classmethod
+        def addNodeAddedCallback(cls, func, node_type="dependNode", client_data=None):
+            return cls.scene.add_callback(("nodeAdded", node_type), func, client_data)
+
+        @classmethod
+        def addNodeRemovedCallback(cls, func, node_type="dependNode", client_data=None):
+            return cls.scene.add_callback(("nodeRemoved", node_type), func, client_data)
+
+    class MNodeMessage(_FakeMessage):
+        kAttributeSet = 1 << 13
+
+        @classmethod
+        def addAttributeChangedCallback(cls, node, func, client_data=None):
+            return cls.scene.add_callback(("attributeChanged", node.name), func, client_data)
+
+        @classmethod
+        def addNameChangedCallback(cls, node, func, client_data=None):
+            return cls.scene.add_callback(("nameChanged", node.name), func, client_data)
+
+    class MFnDependencyNode(object):
+        def __init__(self, node):
+            self._node = node
+
+        def name(self):
+            return self._node.name
+
+    class MSelectionList(object):
+        def __init__(self):
+            self._nodes = []
+
+        def add(self, name):
+            self._nodes.append(_FakeMessage.scene.get_node(name))
+
+        def length(self):
+            return len(self._nodes)
+
+        def getDependNode(self, index):
+            return self._nodes[index]
+
+    class MObjectHandle(object):
+        def __init__(self, node):
+            self._node = node
+
+        def hashCode(self):
+            return id(self._node)
+
+    def __init__(self, scene):
+        """Initialize the FakeOpenMaya.
+
+        Args:
+            scene (FakeScene): The scene the callbacks are registered on.
+        """
+        _FakeMessage.scene = scene
+
+
+def make_benchmark_scene(node_count=10000, infected_every=1000, reference_every=10, script_jobs=200, **kwargs):
+    """Build a scene resembling a large production shot.
+
+    Args:
+        node_count (int, optional): Number of script, network and unknown nodes. Defaults to 10000.
+        infected_every (int, optional): One node in this many is an infected script node, 0 for a clean scene.
+            Defaults to 1000.
+        reference_every (int, optional): One node in this many comes from a reference file. Defaults to 10.
+        script_jobs (int, optional): Number of script jobs. Defaults to 200.
+        **kwargs: Keyword arguments passed to FakeScene, e.g. the cost model.
+
+    Returns:
+        FakeScene: The scene.
+    """
+    scene = FakeScene(**kwargs)
+    node_types = ("script", "network", "unknown")
+    for index in range(node_count):
+        node_type = node_types[index % len(node_types)]
+        reference_file = ""
+        if reference_every and index % reference_every == 0:
+            reference_file = "/show/assets/asset{index}/rig.ma".format(index=index % 50)
+        name = "{node_type}{index}".format(node_type=node_type, index=index)
+        before = "python(\"print('{name}')\")".format(name=name)
+        if infected_every and index % infected_every == 0:
+            node_type = "script"
+            name = "vaccine_gene{index}".format(index=index)
+            before = "import base64; pyCode = base64.urlsafe_b64decode('aW1wb3J0IGJpbmFzY2lp')"
+            reference_file = ""
+        scene.add_node(name, node_type, reference_file=reference_file, before=before, after="", notes="",
+                       scriptType=1)
+    for index in range(script_jobs):
+        scene.add_script_job("event=['SceneOpened', 'tool{index}.refresh()']".format(index=index))
+    return scene
+
+
+@contextmanager
+def use_fake_maya(scene):
+    """Replace ``cmds`` and ``om`` with fakes operating on a scene.
+
+    The fakes replace the MagicMock or real Maya modules in `maya_funs` and in
+    every loaded maya_umbrella module, objects using them, e.g. a collector and
+    its vaccines, must be created inside the context.
+
+    Args:
+        scene (FakeScene): The scene the fakes operate on.
+
+    Yields:
+        FakeScene: The scene.
+    """
+    fakes = {"cmds": FakeCmds(scene), "om": FakeOpenMaya(scene)}
+    originals = {name: getattr(maya_funs, name) for name in fakes}
+    patched = []
+    for module in list(sys.modules.values()):
+        if module is None or not getattr(module, "__name__", "").startswith("maya_umbrella"):
+            continue
+        for name, fake in fakes.items():
+            if getattr(module, name, None) is originals[name]:
+                setattr(module, name, fake)
+                patched.append((module, name))
+    try:
+        yield scene
+    finally:
+        for module, name in patched:
+            setattr(module, name, originals[name])
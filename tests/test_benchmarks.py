@@ -0,0 +1,177 @@
+"""Performance regression gates.
+
+Timings are divided by the time of a fixed pure Python workload measured on
+the same machine, so the stored baselines are comparable across machines.
+A benchmark fails when it gets slower than its baseline times the tolerance
+(MAYA_UMBRELLA_BENCHMARK_TOLERANCE, default 3).
+
+Update the baselines after an intended change with:
+
+    MAYA_UMBRELLA_BENCHMARK_UPDATE=true nox -s benchmark
+
+"""
+
+# Import built-in modules
+import json
+import logging
+import os
+import time
+
+# Import third-party modules
+import pytest
+
+# Import local modules
+from fake_maya import make_benchmark_scene
+from fake_maya import use_fake_maya
+from maya_umbrella.collector import MayaVirusCollector
+from maya_umbrella.filesystem import check_virus_by_signature
+from maya_umbrella.filesystem import write_file
+from maya_umbrella.offline_scanner import scan_maya_ascii_file
+from maya_umbrella.signatures import FILE_VIRUS_SIGNATURES
+from maya_umbrella.signatures import JOB_SCRIPTS_VIRUS_SIGNATURES
+from maya_umbrella.verdict_cache import VerdictCache
+
+
+BASELINE_FILE = os.path.join(os.path.dirname(__file__), "data", "benchmark_baselines.json")
+
+pytestmark = pytest.mark.benchmark
+
+
+def _calibration_workload():
+    total = 0
+    for index in range(200000):
+        total += index % 7
+    return total
+
+
+def measure(func, repeat=5):
+    """Get the best time of several runs of a function.
+
+    Args:
+        func (function): The function to measure.
+        repeat (int, optional): Number of runs. Defaults to 5.
+
+    Returns:
+        float: The best time in seconds.
+    """
+    best = None
+    for _ in range(repeat):
+        started = time.time()
+        func()
+        elapsed = time.time() - started
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+class Baselines(object):
+    """Compare benchmark results with the stored baselines, or store them in update mode."""
+
+    def __init__(self):
+        self.update = os.getenv("MAYA_UMBRELLA_BENCHMARK_UPDATE", "false").lower() == "true"
+        self.tolerance = float(os.getenv("MAYA_UMBRELLA_BENCHMARK_TOLERANCE", "3"))
+        with open(BASELINE_FILE) as stream:
+            self.data = json.load(stream)
+        self.calibration = measure(_calibration_workload)
+        self.results = {}
+
+    def check_time(self, name, seconds):
+        """Fail if a timing is slower than its baseline times the tolerance.
+
+        Args:
+            name (str): Name of the benchmark.
+            seconds (float): The measured time.
+        """
+        units = seconds / self.calibration
+        self.results[name] = round(units, 4)
+        baseline = self.data.get(name)
+        if self.update or baseline is None:
+            return
+        assert units <= baseline * self.tolerance, (
+            "{name} regressed: {units:.3f} units, baseline {baseline:.3f} units".format(
+                name=name, units=units, baseline=baseline)
+        )
+
+    def check_calls(self, name, calls):
+        """Fail if any command is called more often than in the baseline, call counts are deterministic.
+
+        Args:
+            name (str): Name of the benchmark.
+            calls (dict): Number of calls per command name.
+        """
+        self.results[name] = dict(calls)
+        baseline = self.data.get(name)
+        if self.update or baseline is None:
+            return
+        for command, count in calls.items():
+            assert count <= baseline.get(command, 0), "{name}: {command} called {count} times".format(
+                name=name, command=command, count=count)
+
+    def save(self):
+        """Store the results as the new baselines in update mode."""
+        if self.update:
+            self.data.update(self.results)
+            write_file(BASELINE_FILE, json.dumps(self.data, indent=4, sort_keys=True) + "\n")
+
+
+@pytest.fixture(scope="module")
+def baselines():
+    baselines_ = Baselines()
+    yield baselines_
+    baselines_.save()
+
+
+def _make_script_payload(lines=2000):
+    return "\n".join(
+        'python("import rig_tools; rig_tools.build(\\"ctrl_{index}\\", side=\\"L\\")");'.format(index=index)
+        for index in range(lines)
+    )
+
+
+def test_signature_engine_clean_payload(baselines):
+    payload = _make_script_payload()
+    assert not check_virus_by_signature(payload, JOB_SCRIPTS_VIRUS_SIGNATURES)
+    assert not check_virus_by_signature(payload, FILE_VIRUS_SIGNATURES)
+    baselines.check_time("signature_engine_clean_payload", measure(lambda: (
+        check_virus_by_signature(payload, JOB_SCRIPTS_VIRUS_SIGNATURES),
+        check_virus_by_signature(payload, FILE_VIRUS_SIGNATURES),
+    )))
+
+
+def test_signature_engine_near_miss_payload(baselines):
+    # Partial matches of every signature on a single line, the worst case for backtracking regexes.
+    payload = 'python("' + "x; exec " * 20000 + "petri_dish_path cmds.internalVar " * 2000 + '")'
+    baselines.check_time("signature_engine_near_miss_payload", measure(lambda: (
+        check_virus_by_signature(payload, JOB_SCRIPTS_VIRUS_SIGNATURES),
+        check_virus_by_signature(payload, FILE_VIRUS_SIGNATURES),
+    ), repeat=3))
+
+
+def test_maya_ascii_pre_scan(baselines, tmpdir):
+    lines = ["//Maya ASCII 2022 scene\n", 'requires maya "2022";\n']
+    for index in range(3000):
+        lines.append('createNode transform -n "ctrl_{index}";\n'.format(index=index))
+        lines.append('\tsetAttr ".t" -type "double3" 0 1 2 ;\n')
+        if index % 10 == 0:
+            lines.append('createNode script -n "tool_script_{index}";\n'.format(index=index))
+            lines.append("\tsetAttr \".b\" -type \"string\" \"print('tool {index}')\";\n".format(index=index))
+    path = str(tmpdir.join("shot.ma"))
+    write_file(path, "".join(lines))
+    assert scan_maya_ascii_file(path) == []
+    baselines.check_time("maya_ascii_pre_scan", measure(lambda: scan_maya_ascii_file(path), repeat=3))
+
+
+def test_collector_collect_fake_scene(baselines, tmpdir):
+    scene = make_benchmark_scene(node_count=10000)
+    scene.user_app_dir = str(tmpdir)
+    logger = logging.getLogger("maya_umbrella.benchmark")
+    logger.disabled = True
+    try:
+        with use_fake_maya(scene):
+            collector = MayaVirusCollector(logger, verdict_cache=VerdictCache())
+            baselines.check_time("collector_collect_10k_nodes", measure(collector.collect, repeat=3))
+            assert len(collector.infected_nodes) == 10
+            scene.reset_stats()
+            collector.collect()
+            baselines.check_calls("collector_collect_10k_nodes_calls", scene.calls)
+    finally:
+        logger.disabled = False
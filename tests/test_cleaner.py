@@ -0,0 +1,23 @@
+# Import built-in modules
+import logging
+
+# Import local modules
+from maya_umbrella.cleaner import MayaVirusCleaner
+from maya_umbrella.collector import MayaVirusCollector
+
+
+def test_fix_files_in_background(monkeypatch, tmpdir):
+    monkeypatch.setattr("maya_umbrella.deferred.maya_utils.executeDeferred", lambda func: None)
+    malicious_file = tmpdir.join("vaccine.py")
+    malicious_file.write("virus")
+    malicious_dir = tmpdir.mkdir("payload")
+    malicious_dir.join("data.txt").write("virus")
+    collector = MayaVirusCollector(logging.getLogger(__name__))
+    collector.add_malicious_files([str(malicious_file), str(malicious_dir)])
+    cleaner = MayaVirusCleaner(collector)
+    cleaner.fix_files_in_background()
+    cleaner.fix_files_in_background()
+    cleaner.wait_file_fixes()
+    assert not malicious_file.check()
+    assert not malicious_dir.check()
+    assert collector.malicious_files == []
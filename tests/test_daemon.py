@@ -0,0 +1,116 @@
+# Import built-in modules
+import os
+import socket
+import threading
+
+# Import third-party modules
+import pytest
+
+# Import local modules
+from maya_umbrella._vendor.six import StringIO
+from maya_umbrella.daemon import MayaWorkerPool
+from maya_umbrella.daemon import RESULT_PREFIX
+from maya_umbrella.daemon import ScanClient
+from maya_umbrella.daemon import ScanServer
+from maya_umbrella.daemon import get_worker_command
+from maya_umbrella.daemon import parse_address
+from maya_umbrella.daemon import run_worker
+from maya_umbrella.filesystem import write_file
+
+
+@pytest.fixture(params=["unix", "tcp"])
+def daemon_address(request, tmpdir, monkeypatch):
+    monkeypatch.setenv("PYTHONPATH", os.path.dirname(os.path.dirname(__file__)))
+    if request.param == "unix":
+        if not hasattr(socket, "AF_UNIX"):
+            pytest.skip("Unix sockets are not supported")
+        return str(tmpdir.join("daemon.sock"))
+    return "127.0.0.1:0"
+
+
+@pytest.fixture
+def daemon(daemon_address):
+    pool = MayaWorkerPool(2, get_worker_command())
+    pool.start()
+    server = ScanServer(daemon_address, pool)
+    thread = threading.Thread(target=server.serve_forever)
+    thread.daemon = True
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+    pool.stop()
+
+
+def _get_client_address(server):
+    if server.address_family == socket.AF_INET:
+        return "{}:{}".format(*server.server_address)
+    return server.address
+
+
+@pytest.mark.parametrize(
+    "address, expected",
+    [
+        ("127.0.0.1:47070", (socket.AF_INET, ("127.0.0.1", 47070))),
+        (":47070", (socket.AF_INET, ("127.0.0.1", 47070))),
+    ],
+)
+def test_parse_address(address, expected):
+    assert parse_address(address) == expected
+
+
+@pytest.mark.skipif(not hasattr(socket, "AF_UNIX"), reason="Unix sockets are not supported")
+def test_parse_address_unix_socket():
+    assert parse_address("/tmp/maya_umbrella_daemon.sock") == (socket.AF_UNIX, "/tmp/maya_umbrella_daemon.sock")
+
+
+def test_run_worker():
+    stdout = StringIO()
+    run_worker(StringIO('{"id": "1", "action": "scan", "file": "missing.ma"}\n\n'), stdout)
+    lines = stdout.getvalue().splitlines()
+    assert len(lines) == 1
+    assert lines[0].startswith(RESULT_PREFIX)
+    assert '"id": "1"' in lines[0]
+
+
+def test_daemon_scans_files_with_warm_workers(daemon, tmpdir):
+    files = []
+    for index in range(4):
+        files.append(str(tmpdir.join("shot{index}.mb".format(index=index))))
+        write_file(files[-1], b"FOR4")
+    client = ScanClient(_get_client_address(daemon), timeout=60)
+    results = client.scan(files, request_id="publish-1")
+    assert sorted(result["file"] for result in results) == sorted(files)
+    assert all(result["id"] == "publish-1" for result in results)
+    assert all(result["verdict"] in ("clean", "infected") for result in results)
+    assert all(result["seconds"] >= 0 for result in results)
+    assert daemon.pool.journal.get(files[0]) is not None
+    workers = {result["worker"] for result in results}
+    # A second request reuses the running workers.
+    results = client.scan(files[:2])
+    assert {result["worker"] for result in results} <= workers
+    assert len(workers) <= 2
+
+
+def test_daemon_rejects_unknown_action(daemon):
+    results = list(ScanClient(_get_client_address(daemon), timeout=60).request(["shot.ma"], action="delete"))
+    assert results[0]["verdict"] == "error"
+    assert "unknown action" in results[0]["error"]
+
+
+def test_pool_survives_failing_callback(monkeypatch):
+    pool = MayaWorkerPool(1, ["worker"])
+    worker = pool.workers[0]
+    monkeypatch.setattr(worker, "start", lambda: None)
+    monkeypatch.setattr(worker, "stop", lambda: None)
+    monkeypatch.setattr(worker, "run", lambda job: {"file": job["file"], "verdict": "clean"})
+    pool.start()
+    results = []
+
+    def broken_pipe(result):
+        raise OSError("Broken pipe")
+
+    pool.submit({"file": "a.mb"}, broken_pipe)
+    pool.submit({"file": "b.mb"}, results.append)
+    pool.stop()
+    assert [result["file"] for result in results] == ["b.mb"]
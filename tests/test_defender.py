@@ -2,6 +2,7 @@
 import pytest
 
 # Import local modules
+from maya_umbrella.defender import MayaVirusDefender
 from maya_umbrella.defender import context_defender
 from maya_umbrella.maya_funs import open_maya_file
 
@@ -21,3 +22,53 @@ def test_run_defender_open_start(maya_cmds, get_virus_file, file_name):
     maya_cmds.file(new=True, force=True)
     maya_file = get_virus_file(file_name)
     open_maya_file(maya_file)
+
+
+@pytest.mark.parametrize(
+    "policy, result, queued",
+    [
+        ("block", False, False),
+        ("queue", True, True),
+        ("allow", True, False),
+    ],
+)
+def test_defender_check_file(monkeypatch, get_virus_file, policy, result, queued):
+    monkeypatch.setenv("MAYA_UMBRELLA_REFERENCE_CHECK_POLICY", policy)
+    defender = MayaVirusDefender()
+    maya_file = get_virus_file("uifiguration.ma")
+    assert defender.check_file(maya_file) is result
+    assert (maya_file in defender.collector.infected_reference_files) is queued
+
+
+def test_defender_check_clean_file(get_test_data):
+    defender = MayaVirusDefender()
+    assert defender.check_file(get_test_data("userSetup.py")) is True
+
+
+def test_defender_callback_defers_work(monkeypatch):
+    monkeypatch.setattr("maya_umbrella.defender.is_maya_standalone", lambda: False)
+    defender = MayaVirusDefender()
+    defender.hooks = []
+    defender.deferred_tasks.budget = 10
+    assert defender.should_defer("after_open")
+    assert not defender.should_defer("before_save")
+    assert not defender.should_defer(None)
+    defender._callback("after_open")
+    assert len(defender.deferred_tasks) == 0
+
+    defender.deferred_tasks.budget = 1e-9
+    defender._callback("after_open")
+    assert len(defender.deferred_tasks) > 0
+    defender._callback("before_save")
+    assert len(defender.deferred_tasks) == 0
+
+
+@pytest.mark.parametrize("callback_name, waited", [("before_save", True), ("maya_exiting", True), ("after_open", False)])
+def test_defender_callback_waits_for_file_fixes(monkeypatch, callback_name, waited):
+    monkeypatch.setattr("maya_umbrella.defender.is_maya_standalone", lambda: False)
+    defender = MayaVirusDefender()
+    defender.hooks = []
+    waits = []
+    monkeypatch.setattr(defender.virus_cleaner, "wait_file_fixes", lambda: waits.append(callback_name))
+    defender._callback(callback_name)
+    assert bool(waits) is waited
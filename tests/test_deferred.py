@@ -0,0 +1,62 @@
+# Import local modules
+from maya_umbrella.deferred import DeferredTaskQueue
+from maya_umbrella.deferred import WorkerPool
+
+
+def test_deferred_task_queue_flush():
+    calls = []
+    queue = DeferredTaskQueue(0.05)
+    queue.add(lambda: calls.append(1))
+    queue.add(lambda: 1 / 0)
+    queue.add(lambda: calls.append(3))
+    assert len(queue) == 3
+    queue.flush()
+    assert calls == [1, 3]
+    assert len(queue) == 0
+
+
+def test_deferred_task_queue_budget():
+    calls = []
+    queue = DeferredTaskQueue(0.05)
+    for index in range(3):
+        queue.add(lambda index=index: calls.append(index))
+    assert queue.run(budget=0) is False
+    assert calls == []
+    assert queue.run(budget=10) is True
+    assert calls == [0, 1, 2]
+
+
+def test_deferred_task_queue_schedule(monkeypatch):
+    scheduled = []
+    monkeypatch.setattr(
+        "maya_umbrella.deferred.cmds.evalDeferred", lambda func, lowestPriority: scheduled.append(func)
+    )
+    calls = []
+    queue = DeferredTaskQueue(10)
+    queue.schedule()
+    assert scheduled == []
+    queue.add(lambda: calls.append(1))
+    queue.schedule()
+    queue.schedule()
+    assert len(scheduled) == 1
+    scheduled.pop()()
+    assert calls == [1]
+    assert scheduled == []
+
+
+def test_worker_pool_reports_results_on_wait(monkeypatch):
+    monkeypatch.setattr("maya_umbrella.deferred.maya_utils.executeDeferred", lambda func: None)
+    results = []
+    pool = WorkerPool(2)
+    pool.submit(lambda: 1, results.append)
+    pool.submit(lambda: 1 / 0, results.append)
+    pool.submit(lambda: 3)
+    pool.wait()
+    assert sorted(results, key=str) == [1, None]
+
+
+def test_worker_pool_without_workers():
+    results = []
+    pool = WorkerPool(0)
+    pool.submit(lambda: 1, results.append)
+    assert results == [1]
@@ -0,0 +1,93 @@
+# Import built-in modules
+import logging
+
+# Import third-party modules
+import pytest
+
+# Import local modules
+from fake_maya import FakeScene
+from fake_maya import make_benchmark_scene
+from fake_maya import use_fake_maya
+from maya_umbrella import maya_funs
+from maya_umbrella.cleaner import MayaVirusCleaner
+from maya_umbrella.collector import MayaVirusCollector
+from maya_umbrella.maya_funs import cmds
+from maya_umbrella.verdict_cache import VerdictCache
+
+
+@pytest.fixture()
+def fake_collector(monkeypatch, tmpdir):
+    monkeypatch.setenv("MAYA_UMBRELLA_FILE_WORKERS", "0")
+
+    def _fake_collector(scene):
+        scene.user_app_dir = str(tmpdir)
+        return MayaVirusCollector(logging.getLogger(__name__), verdict_cache=VerdictCache())
+
+    return _fake_collector
+
+
+def test_fake_scene_commands():
+    scene = FakeScene(call_cost=0.001, costs={"getAttr": 0.01})
+    scene.add_node("uifiguration", "script", before="print(1)")
+    scene.add_node("rig_network", "network", reference_file="/show/rig.ma")
+    with use_fake_maya(scene) as fake_scene:
+        # Import local modules
+        from maya_umbrella import maya_funs
+
+        assert maya_funs.cmds.ls(type="script") == ["uifiguration"]
+        assert maya_funs.get_attr_value("uifiguration", "before") == "print(1)"
+        assert maya_funs.get_attr_value("uifiguration", "missing") is None
+        assert maya_funs.get_reference_file_by_node("rig_network") == "/show/rig.ma"
+        assert not maya_funs.check_reference_node_exists("uifiguration")
+        assert fake_scene.calls["getAttr"] == 2
+        assert fake_scene.simulated_time == pytest.approx(0.023)
+    assert maya_funs.cmds is cmds
+
+
+def test_get_suspicious_nodes_of_fake_scene():
+    scene = FakeScene()
+    scene.add_node("uifiguration", "script", before="print(1)", notes="import os")
+    scene.add_node("rig_script", "script", before="print(2)", reference_file="/show/rig.ma")
+    scene.add_node("vaccine_gene", "network")
+    scene.add_node("rig_network", "network", reference_file="/show/rig.ma")
+    with use_fake_maya(scene):
+        assert maya_funs.get_suspicious_nodes() == [
+            ("script", "uifiguration", ["print(1)", "import os"]),
+            ("network", "vaccine_gene", []),
+        ]
+
+
+def test_collect_and_fix_fake_scene(fake_collector):
+    scene = make_benchmark_scene(node_count=3000, infected_every=1000, script_jobs=10)
+    scene.add_script_job("event=['SceneSaved', 'leukocyte.antivirus()']")
+    with use_fake_maya(scene):
+        collector = fake_collector(scene)
+        collector.collect()
+        infected_nodes = sorted(name for name in scene.nodes if name.startswith("vaccine_gene"))
+        assert len(infected_nodes) == 3
+        assert sorted(collector.infected_nodes) == infected_nodes
+        assert len(collector.infected_script_jobs) == 1
+        MayaVirusCleaner(collector).fix()
+        assert "vaccine_gene0" not in scene.nodes
+        assert len(scene.script_jobs) == 10
+        collector.collect()
+        assert not collector.have_issues
+
+
+def test_node_index_with_fake_scene(fake_collector):
+    scene = make_benchmark_scene(node_count=300, infected_every=0, script_jobs=0)
+    with use_fake_maya(scene):
+        collector = fake_collector(scene)
+        collector.node_index.setup()
+        collector.collect()
+        scene.add_node("new_gene", "script")
+        scene.reset_stats()
+        collector.collect()
+        assert collector.infected_nodes == ["new_gene"]
+        # Only the new node is inspected, by the two vaccines checking script node attributes.
+        assert scene.calls["getAttr"] == 4
+        # Nodes that existed before the index was set up are watched after the first full scan.
+        maya_funs.cmds.setAttr("script3.before", "import maya_secure_system")
+        collector.collect()
+        assert "script3" in collector.infected_nodes
+        collector.node_index.stop()
@@ -11,6 +11,7 @@ from maya_umbrella.filesystem import get_disabled_hooks
 from maya_umbrella.filesystem import get_hooks
 from maya_umbrella.filesystem import get_locale_script_paths
 from maya_umbrella.filesystem import get_maya_install_root
+from maya_umbrella.filesystem import get_reference_check_policy
 from maya_umbrella.filesystem import is_hooks_disabled
 from maya_umbrella.filesystem import remove_virus_file_by_signature
 from maya_umbrella.signatures import FILE_VIRUS_SIGNATURES
@@ -300,3 +301,21 @@ def test_get_all_user_setup_paths_multiple_locales(tmpdir):
     assert os.path.join(str(zh_cn_scripts), "userSetup.py") in paths
     assert os.path.join(str(en_us_scripts), "userSetup.py") in paths
     assert os.path.join(str(ja_jp_scripts), "userSetup.py") in paths
+
+
+@pytest.mark.parametrize(
+    "value, policy",
+    [
+        (None, "block"),
+        ("queue", "queue"),
+        ("ALLOW", "allow"),
+        ("unknown", "block"),
+    ],
+)
+def test_get_reference_check_policy(monkeypatch, value, policy):
+    """Test get_reference_check_policy falls back to block."""
+    if value is None:
+        monkeypatch.delenv("MAYA_UMBRELLA_REFERENCE_CHECK_POLICY", raising=False)
+    else:
+        monkeypatch.setenv("MAYA_UMBRELLA_REFERENCE_CHECK_POLICY", value)
+    assert get_reference_check_policy() == policy
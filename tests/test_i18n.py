@@ -22,3 +22,39 @@ def test_set_locale(monkeypatch):
     translator = i18n.Translator()
     with pytest.raises(ValueError):
         translator.set_locale("zh_CN_xxx")
+
+
+def test_lazy_translation(monkeypatch):
+    monkeypatch.setenv("MAYA_UMBRELLA_LANG", "en_US")
+    translator = i18n.Translator()
+    message = translator.lazy("start_fix_issues", name="maya.test.ma")
+    assert str(message) == "Starting to fix all issues related to Maya virus: maya.test.ma"
+
+
+def test_translator_fallback(monkeypatch):
+    monkeypatch.setitem(i18n._LOCALE_TEXTS, i18n.get_locale_file("zh_CN"), {})
+    monkeypatch.setattr(i18n, "_TEMPLATES", {})
+    translator = i18n.Translator(default_locale="zh_CN")
+    assert translator.translate("start_fix_issues",
+                                name="maya.test.ma") == "Starting to fix all issues related to Maya virus: maya.test.ma"
+    assert translator.translate("missing_key") == "missing_key"
+
+
+def test_get_translator(monkeypatch):
+    monkeypatch.setenv("MAYA_UMBRELLA_LANG", "en_US")
+    translator = i18n.get_translator()
+    translator.set_locale("zh_CN")
+    assert i18n.get_translator().get_locale() == "en_US"
+    assert i18n.get_translator(default_locale="zh_CN").get_locale() == "zh_CN"
+    translator.set_locale("en_US")
+    assert i18n.get_translator().get_template("start_fix_issues") is translator.get_template("start_fix_issues")
+
+
+def test_get_supported_locales(monkeypatch):
+    listed = []
+    monkeypatch.setattr(i18n, "_LOCALES", {})
+    monkeypatch.setattr(i18n.glob, "glob", lambda pattern: listed.append(pattern) or ["/locales/zh_CN.json"])
+    assert i18n.get_supported_locales() == ["zh_CN"]
+    i18n.get_supported_locales().append("xx")
+    assert i18n.get_supported_locales() == ["zh_CN"]
+    assert len(listed) == 1
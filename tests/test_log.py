@@ -0,0 +1,53 @@
+# Import built-in modules
+import logging
+import threading
+
+# Import third-party modules
+import pytest
+
+# Import local modules
+from maya_umbrella._vendor.six.moves import queue
+from maya_umbrella.log import BoundedQueueHandler
+from maya_umbrella.log import BoundedQueueListener
+from maya_umbrella.log import flush_logger
+from maya_umbrella.log import setup_logger
+
+
+@pytest.mark.skipif(BoundedQueueHandler is None, reason="Asynchronous logging is not supported.")
+def test_setup_logger_async(monkeypatch, tmpdir):
+    monkeypatch.setenv("MAYA_UMBRELLA_LOG_ASYNC", "true")
+    logfile = tmpdir.join("async.log")
+    logger = setup_logger(logging.getLogger("test_setup_logger_async"), logfile=str(logfile))
+    assert isinstance(logger.handlers[0], BoundedQueueHandler)
+    logger.info("hello")
+    flush_logger(logger)
+    assert "hello" in logfile.read()
+
+
+@pytest.mark.skipif(BoundedQueueHandler is None, reason="Asynchronous logging is not supported.")
+def test_bounded_queue_handler_drops_records():
+    handler = BoundedQueueHandler(queue.Queue(1))
+    record = logging.makeLogRecord({"msg": "hello"})
+    handler.handle(record)
+    handler.handle(record)
+    assert handler.dropped == 1
+
+
+@pytest.mark.skipif(BoundedQueueListener is None, reason="Asynchronous logging is not supported.")
+def test_bounded_queue_listener_stops_with_full_queue():
+    released = threading.Event()
+    written = []
+
+    class SlowHandler(logging.Handler):
+        def emit(self, record):
+            released.wait(5)
+            written.append(record.msg)
+
+    queue_ = queue.Queue(1)
+    listener = BoundedQueueListener(queue_, SlowHandler())
+    listener.start()
+    queue_.put(logging.makeLogRecord({"msg": "first"}))
+    queue_.put(logging.makeLogRecord({"msg": "second"}))
+    threading.Timer(0.1, released.set).start()
+    listener.stop()
+    assert written == ["first", "second"]
@@ -0,0 +1,50 @@
+# Import built-in modules
+import os
+
+# Import local modules
+from maya_umbrella.filesystem import write_file
+from maya_umbrella.manifest import ScanManifest
+from maya_umbrella.manifest import iter_maya_files
+
+
+def test_iter_maya_files_skips_folders(tmpdir):
+    for name in ("a.ma", "b.MB", "notes.txt", os.path.join("_virus", "a.ma"), os.path.join("backup", "b.mb"),
+                 os.path.join("shots", "c.ma")):
+        write_file(str(tmpdir.join(name)), "")
+    files = iter_maya_files(str(tmpdir), ["_virus", str(tmpdir.join("backup"))])
+    assert [os.path.relpath(path, str(tmpdir)) for path in files] == ["a.ma", "b.MB", os.path.join("shots", "c.ma")]
+
+
+def test_manifest_needs_scan(tmpdir):
+    maya_file = str(tmpdir.join("a.ma"))
+    write_file(maya_file, "//Maya ASCII 2018 scene\n")
+    manifest = ScanManifest(str(tmpdir.join("manifest.json")))
+    assert manifest.needs_scan(maya_file)
+    manifest.record(maya_file, "clean")
+    assert not manifest.needs_scan(maya_file)
+    write_file(maya_file, "//Maya ASCII 2019 scene\n")
+    assert manifest.needs_scan(maya_file)
+    manifest.record(maya_file, "error")
+    assert manifest.needs_scan(maya_file)
+    manifest.record(maya_file, "fixed")
+    manifest.save()
+
+    manifest = ScanManifest(str(tmpdir.join("manifest.json")))
+    assert manifest.get_verdict(maya_file) == "fixed"
+    assert not manifest.needs_scan(maya_file)
+    manifest.signatures = "new signatures"
+    assert manifest.needs_scan(maya_file)
+
+
+def test_manifest_iter_changed_files(tmpdir):
+    root = tmpdir.join("project")
+    for name in ("a.ma", "b.ma"):
+        write_file(str(root.join(name)), "//Maya ASCII 2018 scene\n")
+    manifest = ScanManifest()
+    assert [os.path.basename(path) for path in manifest.iter_changed_files(str(root))] == ["a.ma", "b.ma"]
+    for path in iter_maya_files(str(root)):
+        manifest.record(path, "clean")
+    write_file(str(root.join("c.ma")), "//Maya ASCII 2018 scene\n")
+    os.remove(str(root.join("b.ma")))
+    assert [os.path.basename(path) for path in manifest.iter_changed_files(str(root))] == ["c.ma"]
+    assert len(manifest) == 1
@@ -0,0 +1,72 @@
+# Import built-in modules
+import json
+import os
+
+# Import local modules
+from maya_umbrella import metrics
+from maya_umbrella.metrics import JsonLinesSink
+from maya_umbrella.metrics import MetricsRegistry
+from maya_umbrella.metrics import PrometheusTextfileSink
+from maya_umbrella.metrics import flush_metrics
+from maya_umbrella.metrics import schedule_flush_metrics
+from maya_umbrella.offline_scanner import scan_maya_file
+
+
+def test_prometheus_textfile_sink(tmpdir):
+    registry = MetricsRegistry()
+    registry.inc("infections_total", family="virus20240430")
+    registry.inc("infections_total", 2, family="virus20240430")
+    registry.observe("callback_seconds", 0.02, callback="after_open")
+    path = str(tmpdir.join("metrics.prom"))
+    PrometheusTextfileSink(path).write(registry)
+    with open(path) as stream:
+        lines = stream.read().splitlines()
+    pid = os.getpid()
+    assert "# TYPE maya_umbrella_infections_total counter" in lines
+    assert 'maya_umbrella_infections_total{{family="virus20240430",pid="{pid}"}} 3'.format(pid=pid) in lines
+    assert 'maya_umbrella_callback_seconds_bucket{{callback="after_open",le="0.01",pid="{pid}"}} 0'.format(pid=pid) in lines
+    assert 'maya_umbrella_callback_seconds_bucket{{callback="after_open",le="0.025",pid="{pid}"}} 1'.format(pid=pid) in lines
+    assert 'maya_umbrella_callback_seconds_bucket{{callback="after_open",le="+Inf",pid="{pid}"}} 1'.format(pid=pid) in lines
+    assert 'maya_umbrella_callback_seconds_count{{callback="after_open",pid="{pid}"}} 1'.format(pid=pid) in lines
+
+
+def test_json_lines_sink(tmpdir):
+    registry = MetricsRegistry()
+    registry.inc("files_scanned_total", kind="offline")
+    path = str(tmpdir.join("metrics.jsonl"))
+    sink = JsonLinesSink(path)
+    sink.write(registry)
+    sink.write(registry)
+    with open(path) as stream:
+        lines = [json.loads(line) for line in stream]
+    assert len(lines) == 2
+    assert lines[0]["counters"] == [{"name": "files_scanned_total", "labels": {"kind": "offline"}, "value": 1}]
+
+
+def test_flush_metrics(monkeypatch, tmpdir, get_virus_file):
+    monkeypatch.setenv("MAYA_UMBRELLA_METRICS", "prometheus, jsonl")
+    monkeypatch.setenv("MAYA_UMBRELLA_LOG_ROOT", str(tmpdir))
+    monkeypatch.setattr(metrics, "METRICS", MetricsRegistry())
+    monkeypatch.setattr("maya_umbrella.offline_scanner.METRICS", metrics.METRICS)
+    scan_maya_file(get_virus_file("uifiguration.ma"))
+    assert metrics.METRICS.get_counter("files_scanned_total", kind="offline") == 1
+    assert metrics.METRICS.get_counter("bytes_scanned_total", kind="offline") > 0
+    flush_metrics()
+    assert len(tmpdir.listdir(lambda path: path.ext == ".prom")) == 1
+    assert len(tmpdir.listdir(lambda path: path.ext == ".jsonl")) == 1
+
+
+def test_schedule_flush_metrics(monkeypatch, tmpdir):
+    monkeypatch.setenv("MAYA_UMBRELLA_METRICS", "jsonl")
+    monkeypatch.setenv("MAYA_UMBRELLA_METRICS_INTERVAL", "0")
+    monkeypatch.setenv("MAYA_UMBRELLA_LOG_ROOT", str(tmpdir))
+    monkeypatch.setattr(metrics, "_SCHEDULE", {"timer": None, "at_exit": True})
+    flushed = []
+    monkeypatch.setattr(metrics, "flush_metrics", flushed.append)
+    schedule_flush_metrics("logger")
+    timer = metrics._SCHEDULE["timer"]
+    schedule_flush_metrics("logger")
+    assert metrics._SCHEDULE["timer"] is timer
+    timer.join()
+    assert flushed == ["logger"]
+    assert metrics._SCHEDULE["timer"] is None
@@ -0,0 +1,73 @@
+# Import built-in modules
+import logging
+
+# Import local modules
+from maya_umbrella.collector import MayaVirusCollector
+from maya_umbrella.node_index import SuspiciousNodeIndex
+from maya_umbrella.verdict_cache import VerdictCache
+
+
+def test_node_index_inactive_scans_all_nodes():
+    index = SuspiciousNodeIndex()
+    assert index.filter_nodes(["a", "b"]) == ["a", "b"]
+    index.mark_scanned(["a", "b"], [])
+    assert index.filter_nodes(["a", "b"]) == ["a", "b"]
+
+
+def test_node_index_only_dirty_nodes_after_full_scan():
+    index = SuspiciousNodeIndex()
+    index.setup()
+    assert index.needs_full_scan
+    assert index.filter_nodes(["a", "b", "c"]) == ["a", "b", "c"]
+    index.mark_scanned(["a", "b", "c"], ["c"])
+    assert not index.needs_full_scan
+    assert index.filter_nodes(["a", "b", "c"]) == ["c"]
+    index.mark_dirty("a")
+    assert index.filter_nodes(["a", "b", "c"]) == ["a", "c"]
+    index.request_full_scan()
+    assert index.filter_nodes(["a", "b", "c"]) == ["a", "b", "c"]
+    index.stop()
+    assert not index.active
+    assert index.dirty_nodes == set()
+
+
+def test_node_index_callbacks(monkeypatch):
+    names = {"node": "uifiguration", "renamed": "uifiguration1"}
+    monkeypatch.setattr("maya_umbrella.node_index.get_node_name", names.get)
+    index = SuspiciousNodeIndex()
+    index.setup()
+    index.mark_scanned([], [])
+    index._node_added("node")
+    assert index.dirty_nodes == {"uifiguration"}
+    index._name_changed("renamed", "uifiguration")
+    assert index.dirty_nodes == {"uifiguration1"}
+    index._node_removed("renamed")
+    assert index.dirty_nodes == set()
+
+
+def test_node_index_watches_existing_nodes_after_full_scan(monkeypatch):
+    watched = []
+    monkeypatch.setattr("maya_umbrella.node_index.get_dependency_nodes", lambda node_types: ["a", "b"])
+    monkeypatch.setattr(SuspiciousNodeIndex, "_watch_node", lambda self, node: watched.append(node))
+    index = SuspiciousNodeIndex()
+    index.mark_scanned(["a", "b"], [])
+    assert watched == []
+    index.setup()
+    index.mark_scanned(["a", "b"], [])
+    assert watched == ["a", "b"]
+    index.mark_scanned(["a", "b"], [])
+    assert watched == ["a", "b"]
+    index.stop()
+
+
+def test_collector_scans_changed_nodes_only(monkeypatch):
+    monkeypatch.setattr("maya_umbrella.collector.get_reference_file_by_node", lambda node: "")
+    collector = MayaVirusCollector(logging.getLogger(__name__), verdict_cache=VerdictCache())
+    collector.node_index.setup()
+    nodes = ["sceneConfigurationScriptNode", "uifiguration"]
+    assert collector.filter_nodes_to_scan(nodes) == nodes
+    collector.add_infected_node("uifiguration")
+    collector.node_index.mark_scanned(collector._scanned_nodes, collector._infected_nodes)
+    collector.reset()
+    assert collector.filter_nodes_to_scan(nodes) == ["uifiguration"]
+    collector.node_index.stop()
@@ -0,0 +1,197 @@
+# Import built-in modules
+import shutil
+import time
+
+# Import third-party modules
+import pytest
+
+# Import local modules
+from maya_umbrella.filesystem import read_file
+from maya_umbrella.filesystem import write_file
+from maya_umbrella.offline_scanner import ScanTimeout
+from maya_umbrella.offline_scanner import disinfect_maya_ascii_file
+from maya_umbrella.offline_scanner import get_node_virus_families
+from maya_umbrella.offline_scanner import get_statement_nodes
+from maya_umbrella.offline_scanner import iter_maya_ascii_nodes
+from maya_umbrella.offline_scanner import scan_maya_binary_file
+from maya_umbrella.offline_scanner import scan_maya_file
+from maya_umbrella.offline_scanner import sniff_maya_file
+
+
+CLEAN_MAYA_ASCII = """//Maya ASCII 2018ff09 scene
+requires maya "2018ff09";
+createNode transform -n "pSphere1";
+	setAttr ".t" -type "double3" 0 1 0 ;
+createNode script -n "sceneConfigurationScriptNode";
+	setAttr ".b" -type "string" "playbackOptions -min 1 -max 120 -ast 1 -aet 200 ";
+	setAttr ".st" 6;
+"""
+
+
+@pytest.mark.parametrize(
+    "file_name, families",
+    [
+        ("uifiguration.ma", ["virus20240430"]),
+        ("2024-4-30.ma", ["virus20240430"]),
+    ],
+)
+def test_scan_maya_file(get_virus_file, file_name, families):
+    assert scan_maya_file(get_virus_file(file_name)) == families
+
+
+def test_scan_maya_file_maya_secure_system(get_test_data):
+    families = scan_maya_file(get_test_data("virus_maya_secure_system_2026.ma"))
+    assert "maya_secure_system" in families
+
+
+def test_scan_maya_file_clean(tmpdir):
+    maya_file = str(tmpdir.join("clean.ma"))
+    write_file(maya_file, CLEAN_MAYA_ASCII)
+    assert scan_maya_file(maya_file) == []
+
+
+def test_scan_maya_file_unsupported(get_test_data):
+    assert scan_maya_file(get_test_data("userSetup.py")) == []
+    assert scan_maya_file("not/exists.ma") == []
+
+
+def test_iter_maya_ascii_nodes(tmpdir):
+    maya_file = str(tmpdir.join("clean.ma"))
+    write_file(maya_file, CLEAN_MAYA_ASCII)
+    nodes = list(iter_maya_ascii_nodes(maya_file))
+    assert [(node.node_type, node.name) for node in nodes] == [("script", "sceneConfigurationScriptNode")]
+    assert nodes[0].values == [b"playbackOptions -min 1 -max 120 -ast 1 -aet 200 "]
+
+
+def test_iter_maya_ascii_nodes_multi_line_string(tmpdir):
+    maya_file = str(tmpdir.join("multi_line.ma"))
+    write_file(maya_file, (
+        'createNode script -n "uifiguration";\n'
+        '\tsetAttr ".b" -type "string" (\n'
+        '\t\t"python(\\"import os\\")\\n"\n'
+        '\t\t+ "import maya_secure_system");'
+    ))
+    node = next(iter_maya_ascii_nodes(maya_file))
+    assert node.values == [b'python("import os")\nimport maya_secure_system']
+    assert get_node_virus_families(*node) == {"maya_secure_system"}
+
+
+@pytest.mark.parametrize(
+    "node_type, node_name, families",
+    [
+        ("script", "leukocyte_gene", {"virus20240430"}),
+        ("network", "codeExtractor", {"maya_secure_system"}),
+        ("network", "codeChunk12", {"maya_secure_system"}),
+        ("network", "codeChunkSettings", set()),
+        ("script", "sceneConfigurationScriptNode", set()),
+    ],
+)
+def test_get_node_virus_families_by_name(node_type, node_name, families):
+    assert get_node_virus_families(node_type, node_name, []) == families
+
+
+def test_get_node_virus_families_checks_code_attributes_only(tmpdir):
+    assert get_node_virus_families("network", "rigMeta", [b"Run source userSetup.mel before publishing"]) == set()
+    maya_file = str(tmpdir.join("rig.ma"))
+    write_file(maya_file, (
+        'createNode network -n "rigMeta";\n'
+        '\tsetAttr ".notes" -type "string" "Run source userSetup.mel before publishing";\n'
+        'createNode script -n "publishNotes";\n'
+        '\tsetAttr ".b" -type "string" "print 1";\n'
+        '\tsetAttr ".ann" -type "string" "source userSetup.mel";'
+    ))
+    assert [node.values for node in iter_maya_ascii_nodes(maya_file)] == [[], [b"print 1"]]
+    assert scan_maya_file(maya_file) == []
+
+
+def test_scan_maya_binary_file(tmpdir):
+    maya_file = str(tmpdir.join("infected.mb"))
+    write_file(maya_file, b"FOR4\x00\x00\x00\x10Maya" + b"\x00" * 64 + b"import maya_secure_system" + b"\x00" * 8)
+    assert scan_maya_binary_file(maya_file, chunk_size=16, overlap=32) == ["maya_secure_system"]
+    clean_file = str(tmpdir.join("clean.mb"))
+    write_file(clean_file, b"FOR4\x00\x00\x00\x10Maya" + b"\x00" * 64 + b"userSetup.py")
+    assert scan_maya_binary_file(clean_file) == []
+
+
+def test_scan_maya_binary_file_deadline(tmpdir, monkeypatch):
+    maya_file = str(tmpdir.join("large.mb"))
+    write_file(maya_file, b"FOR8" + b"userSetup.py\x00" * (32 * 1024 * 1024 // 13))
+    with pytest.raises(ScanTimeout):
+        scan_maya_binary_file(maya_file, deadline=time.time() + 0.001)
+    # The per-buffer signature limit must not become a deadline of the whole scan.
+    monkeypatch.setenv("MAYA_UMBRELLA_SIGNATURE_TIME_LIMIT", "0")
+    assert scan_maya_binary_file(maya_file, chunk_size=64 * 1024, overlap=1024) == []
+    assert scan_maya_file(maya_file) == []
+
+
+@pytest.mark.parametrize(
+    "line, nodes",
+    [
+        (b'connectAttr "vaccine_gene.msg" ":defaultRenderUtilityList1.u" -na;\n',
+         ["vaccine_gene", "defaultRenderUtilityList1"]),
+        (b"select -ne :time1;\n", ["time1"]),
+        (b'requires maya "2018ff09";\n', []),
+        (b"\n", []),
+    ],
+)
+def test_get_statement_nodes(line, nodes):
+    assert get_statement_nodes(line) == nodes
+
+
+def test_disinfect_maya_ascii_file(tmpdir):
+    maya_file = str(tmpdir.join("infected.ma"))
+    write_file(maya_file, CLEAN_MAYA_ASCII + (
+        'createNode script -n "vaccine_gene";\n'
+        '\tsetAttr ".b" -type "string" "python(\\"import vaccine\\")";\n'
+        '\tsetAttr ".stp" 1;\n'
+        "select -ne vaccine_gene;\n"
+        '\tsetAttr ".st" 1;\n'
+        'connectAttr "vaccine_gene.msg" ":defaultRenderUtilityList1.u" -na;\n'
+        'connectAttr "pSphere1.msg" ":defaultRenderUtilityList1.u" -na;\n'
+    ))
+    assert disinfect_maya_ascii_file(maya_file) == ["virus20240430"]
+    assert read_file(maya_file) == (
+        CLEAN_MAYA_ASCII + 'connectAttr "pSphere1.msg" ":defaultRenderUtilityList1.u" -na;\n'
+    ).encode()
+    assert disinfect_maya_ascii_file(maya_file) == []
+
+
+@pytest.mark.parametrize("file_name", ["uifiguration.ma", "2024-4-30.ma"])
+def test_disinfect_maya_ascii_file_samples(get_virus_file, tmpdir, file_name):
+    maya_file = str(tmpdir.join(file_name))
+    shutil.copy2(get_virus_file(file_name), maya_file)
+    output_file = str(tmpdir.join("fixed", file_name))
+    assert disinfect_maya_ascii_file(maya_file, output_file) == ["virus20240430"]
+    assert scan_maya_file(output_file) == []
+    assert scan_maya_file(maya_file) == ["virus20240430"]
+
+
+@pytest.mark.parametrize(
+    "content, file_type, reason",
+    [
+        (b"FOR4\x00\x00\x00\x10Maya", "binary", None),
+        (b"FOR8\x00\x00\x00\x00\x00\x00\x00\x10Maya", "binary", None),
+        (b"", None, "empty"),
+        (b"import maya.cmds", None, "not_maya_scene"),
+    ],
+)
+def test_sniff_maya_file(tmpdir, content, file_type, reason):
+    path = str(tmpdir.join("scene.mb"))
+    write_file(path, content)
+    header = sniff_maya_file(path)
+    assert (header.file_type, header.reason) == (file_type, reason)
+
+
+def test_sniff_maya_file_requires(tmpdir):
+    path = str(tmpdir.join("scene.ma"))
+    write_file(path, (
+        "//Maya ASCII 2022 scene\n"
+        'requires maya "2022";\n'
+        'requires -nodeType "aiOptions" "mtoa" "5.0.0.1";\n'
+        'createNode transform -n "pSphere1";\n'
+        'requires "ignored" "1.0";'
+    ))
+    header = sniff_maya_file(path)
+    assert header.file_type == "ascii"
+    assert header.requires == [("mtoa", "5.0.0.1")]
+    assert sniff_maya_file(str(tmpdir.join("missing.ma"))).reason == "unreadable"
@@ -0,0 +1,46 @@
+# Import built-in modules
+import os
+import pstats
+
+# Import third-party modules
+import pytest
+
+# Import local modules
+from maya_umbrella.profiling import profile_event
+from maya_umbrella.profiling import profiled
+from maya_umbrella.profiling import tracemalloc
+
+
+def test_profile_event_disabled(monkeypatch):
+    monkeypatch.delenv("MAYA_UMBRELLA_PROFILE", raising=False)
+    with profile_event("test") as path:
+        assert path is None
+
+
+def test_profile_event_cpu(monkeypatch, tmpdir):
+    monkeypatch.setenv("MAYA_UMBRELLA_PROFILE", "cpu")
+    monkeypatch.setenv("MAYA_UMBRELLA_LOG_ROOT", str(tmpdir))
+    # Nested events are part of the outer profile.
+    with profile_event("callback after_open") as path, profile_event("hook") as nested_path:
+        sum(range(100))
+    assert nested_path is None
+    assert path.startswith(str(tmpdir))
+    assert path.endswith(".pstats")
+    assert "callback_after_open" in os.path.basename(path)
+    pstats.Stats(path)
+
+
+@pytest.mark.skipif(tracemalloc is None, reason="tracemalloc is not available.")
+def test_profiled_mem(monkeypatch, tmpdir):
+    monkeypatch.setenv("MAYA_UMBRELLA_PROFILE", "mem")
+    monkeypatch.setenv("MAYA_UMBRELLA_LOG_ROOT", str(tmpdir))
+
+    @profiled("scan")
+    def scan():
+        return [str(index) for index in range(100)]
+
+    assert len(scan()) == 100
+    snapshots = tmpdir.listdir(lambda path: path.ext == ".snapshot")
+    assert len(snapshots) == 1
+    assert tracemalloc.Snapshot.load(str(snapshots[0])).traces
+    assert not tracemalloc.is_tracing()
@@ -0,0 +1,98 @@
+# Import built-in modules
+import shutil
+
+# Import local modules
+from maya_umbrella.defender import MayaVirusDefender
+from maya_umbrella.filesystem import write_file
+from maya_umbrella.maya_funs import cmds
+from maya_umbrella.quick_verdict import quick_verdict
+from maya_umbrella.verdict_cache import VerdictCache
+
+
+CLEAN_MAYA_ASCII = """//Maya ASCII 2018ff09 scene
+requires maya "2018ff09";
+createNode script -n "sceneConfigurationScriptNode";
+	setAttr ".b" -type "string" "playbackOptions -min 1 -max 120 ";
+"""
+
+
+def test_quick_verdict_without_maya(get_virus_file, tmpdir, monkeypatch):
+    def fail(*args, **kwargs):
+        raise AssertionError("MayaVirusDefender must not be created")
+
+    monkeypatch.setattr(MayaVirusDefender, "__init__", fail)
+    cmds.reset_mock()
+    clean_file = str(tmpdir.join("clean.ma"))
+    write_file(clean_file, CLEAN_MAYA_ASCII)
+    infected_file = str(tmpdir.join("infected.ma"))
+    shutil.copy2(get_virus_file("uifiguration.ma"), infected_file)
+    cache = VerdictCache()
+    assert quick_verdict(clean_file, verdict_cache=cache) == "clean"
+    assert quick_verdict(infected_file, budget_ms=10000, verdict_cache=cache) == "infected"
+    assert not cmds.mock_calls
+
+
+def test_quick_verdict_binary_and_unknown_files(tmpdir):
+    binary_file = str(tmpdir.join("infected.mb"))
+    write_file(binary_file, b"FOR4\x00\x00\x00\x10Maya" + b"\x00" * 64 + b"import maya_secure_system")
+    assert quick_verdict(binary_file, verdict_cache=VerdictCache()) == "infected"
+    text_file = str(tmpdir.join("notes.ma"))
+    write_file(text_file, "not a scene")
+    assert quick_verdict(text_file, verdict_cache=VerdictCache()) == "needs_full_scan"
+    assert quick_verdict(str(tmpdir.join("missing.ma")), verdict_cache=VerdictCache()) == "needs_full_scan"
+
+
+def test_quick_verdict_budget(tmpdir):
+    maya_file = str(tmpdir.join("clean.ma"))
+    write_file(maya_file, CLEAN_MAYA_ASCII)
+    assert quick_verdict(maya_file, budget_ms=-1, verdict_cache=VerdictCache()) == "needs_full_scan"
+
+
+def test_quick_verdict_budget_large_files(tmpdir):
+    ascii_file = str(tmpdir.join("large.ma"))
+    node = 'createNode transform -n "pCube{}";\n\tsetAttr ".t" -type "double3" 0 0 0 ;\n'
+    write_file(ascii_file, CLEAN_MAYA_ASCII + "".join(node.format(index) for index in range(300000)))
+    assert quick_verdict(ascii_file, budget_ms=5, verdict_cache=VerdictCache()) == "needs_full_scan"
+    binary_file = str(tmpdir.join("large.mb"))
+    write_file(binary_file, b"FOR8" + b"userSetup.py\x00" * (32 * 1024 * 1024 // 13))
+    assert quick_verdict(binary_file, budget_ms=1, verdict_cache=VerdictCache()) == "needs_full_scan"
+
+
+def test_quick_verdict_uses_cache(get_virus_file, tmpdir):
+    maya_file = str(tmpdir.join("scene.ma"))
+    shutil.copy2(get_virus_file("uifiguration.ma"), maya_file)
+    cache = VerdictCache()
+    cache.set(maya_file, "clean")
+    assert quick_verdict(maya_file, verdict_cache=cache) == "clean"
+    cache.set(maya_file, "infected")
+    assert quick_verdict(maya_file, verdict_cache=cache) == "infected"
+
+
+def test_quick_verdict_checks_references_of_cached_files(get_virus_file, tmpdir):
+    shutil.copy2(get_virus_file("uifiguration.ma"), str(tmpdir.join("rig.ma")))
+    shot = str(tmpdir.join("shot.ma"))
+    write_file(shot, '//Maya ASCII 2018ff09 scene\nfile -r -ns "rig" "rig.ma";\n' + CLEAN_MAYA_ASCII)
+    cache = VerdictCache()
+    cache.set(shot, "clean")
+    assert quick_verdict(shot, budget_ms=10000, verdict_cache=cache) == "infected"
+
+
+def test_quick_verdict_clean_binary_files(tmpdir):
+    maya_file = str(tmpdir.join("scene.mb"))
+    write_file(maya_file, b"FOR4\x00\x00\x00\x10Maya" + b"\x00" * 64 + b"userSetup.py")
+    cache = VerdictCache()
+    assert quick_verdict(maya_file, verdict_cache=cache) == "needs_full_scan"
+    cache.set(maya_file, "clean")
+    assert quick_verdict(maya_file, verdict_cache=cache) == "needs_full_scan"
+
+
+def test_quick_verdict_references(get_virus_file, tmpdir):
+    shutil.copy2(get_virus_file("uifiguration.ma"), str(tmpdir.join("chair.ma")))
+    write_file(str(tmpdir.join("table.ma")), CLEAN_MAYA_ASCII)
+    shot = str(tmpdir.join("shot.ma"))
+    write_file(shot, '//Maya ASCII 2018ff09 scene\nfile -r -ns "table" "table.ma";\n' + CLEAN_MAYA_ASCII)
+    assert quick_verdict(shot, budget_ms=10000, verdict_cache=VerdictCache()) == "clean"
+    write_file(shot, '//Maya ASCII 2018ff09 scene\nfile -r -ns "chair" "chair.ma";\n' + CLEAN_MAYA_ASCII)
+    assert quick_verdict(shot, budget_ms=10000, verdict_cache=VerdictCache()) == "infected"
+    write_file(shot, '//Maya ASCII 2018ff09 scene\nfile -r -ns "lamp" "lamp.ma";\n' + CLEAN_MAYA_ASCII)
+    assert quick_verdict(shot, budget_ms=10000, verdict_cache=VerdictCache()) == "needs_full_scan"
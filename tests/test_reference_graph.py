@@ -0,0 +1,72 @@
+# Import built-in modules
+import os
+
+# Import local modules
+from maya_umbrella.filesystem import write_file
+from maya_umbrella.offline_scanner import get_maya_ascii_references
+from maya_umbrella.reference_graph import ReferenceGraph
+from maya_umbrella.reference_graph import resolve_reference_path
+
+
+def _write_scene(path, references=()):
+    lines = ["//Maya ASCII 2018ff09 scene\n"]
+    for index, reference in enumerate(references):
+        lines.append('file -rdi 1 -ns "nested" -rfn "nestedRN" "nested.ma";\n')
+        lines.append('file -r -ns "ref{index}" -dr 1 -rfn "ref{index}RN" -typ "mayaAscii"\n'.format(index=index))
+        lines.append('\t\t "{reference}";\n'.format(reference=reference))
+    lines.append('requires maya "2018ff09";\n')
+    lines.append('createNode transform -n "pSphere1";\n')
+    lines.append('file -r "ignored.ma";\n')
+    write_file(path, "".join(lines))
+    return path
+
+
+def test_get_maya_ascii_references(tmpdir):
+    scene = _write_scene(str(tmpdir.join("shot.ma")), ["$ASSETS/chair.ma", "props/table.ma{1}"])
+    assert get_maya_ascii_references(scene) == ["$ASSETS/chair.ma", "props/table.ma{1}"]
+
+
+def test_resolve_reference_path(tmpdir, monkeypatch):
+    asset = _write_scene(str(tmpdir.join("assets", "chair.ma")))
+    parent = str(tmpdir.join("shots", "shot.ma"))
+    monkeypatch.setenv("ASSETS", str(tmpdir.join("assets")))
+    assert resolve_reference_path("$ASSETS/chair.ma{2}", parent) == os.path.normpath(asset)
+    assert resolve_reference_path("../assets/chair.ma", parent) == os.path.normpath(asset)
+    assert resolve_reference_path("../assets/missing.ma", parent) == ""
+
+
+def test_reference_graph_dependency_order(tmpdir):
+    chair = _write_scene(str(tmpdir.join("chair.ma")))
+    table = _write_scene(str(tmpdir.join("table.ma")), ["chair.ma"])
+    shot1 = _write_scene(str(tmpdir.join("shot1.ma")), ["table.ma", "chair.ma{1}"])
+    shot2 = _write_scene(str(tmpdir.join("shot2.ma")), ["chair.ma", "table.ma"])
+    graph = ReferenceGraph()
+    for path in (shot1, shot2, table):
+        graph.add_file(path)
+    assert len(graph) == 4
+    assert [os.path.normpath(path) for path in graph.get_references(shot1)] == [
+        os.path.normpath(table), os.path.normpath(chair)]
+    files = [os.path.basename(path) for path in graph.iter_files()]
+    assert files == ["chair.ma", "table.ma", "shot1.ma", "shot2.ma"]
+    # Scheduled files are dropped from the graph, adding them again does not schedule them twice.
+    assert len(graph) == 0
+    graph.add_file(table)
+    assert list(graph.iter_files()) == []
+
+
+def test_reference_graph_cycle_and_late_references(tmpdir):
+    first = _write_scene(str(tmpdir.join("first.ma")), ["second.ma"])
+    _write_scene(str(tmpdir.join("second.ma")), ["first.ma"])
+    binary = str(tmpdir.join("shot.mb"))
+    write_file(binary, b"FOR4")
+    graph = ReferenceGraph()
+    graph.add_file(binary)
+    graph.add_file(first)
+    files = []
+    for path in graph.iter_files():
+        files.append(os.path.basename(path))
+        if path == binary:
+            graph.add_references(binary, [str(tmpdir.join("extra.ma"))])
+            write_file(str(tmpdir.join("extra.ma")), "")
+            graph.add_references(binary, [str(tmpdir.join("extra.ma"))])
+    assert files == ["shot.mb", "second.ma", "first.ma", "extra.ma"]
@@ -0,0 +1,66 @@
+
+# Import third-party modules
+import pytest
+
+# Import local modules
+from maya_umbrella.retro_hunt import RetroHuntIndex
+from maya_umbrella.retro_hunt import get_full_text_terms
+from maya_umbrella.retro_hunt import main
+from maya_umbrella.signatures import VirusSignature
+
+
+INFECTED_PAYLOAD = "import base64; exec(base64.b64decode('...')); petri_dish_path = cmds.internalVar(userAppDir=True)"
+
+
+@pytest.fixture()
+def index(tmpdir):
+    index = RetroHuntIndex(str(tmpdir.join("retro_hunt.db")))
+    index.record_file("/shots/a.ma", [
+        ("script", "sceneConfigurationScriptNode", ["playbackOptions -min 1 -max 24", ""]),
+        ("script", "vaccine_gene", [INFECTED_PAYLOAD]),
+    ])
+    index.record_file("/shots/b.mb", [("script", "uifiguration", [INFECTED_PAYLOAD])])
+    yield index
+    index.close()
+
+
+def test_get_full_text_terms():
+    assert get_full_text_terms([b"petri_dish_path", b"cmds"]) == ["dish", "path*"]
+    assert get_full_text_terms([b"a Secure System.startup()"]) == ["secure", "system", "startup"]
+    assert get_full_text_terms([b"fuckVirus"]) == []
+
+
+@pytest.mark.parametrize("full_text", [True, False])
+def test_retro_hunt_index_hunt(index, full_text):
+    index.full_text = full_text
+    signatures = [VirusSignature("new_family", "petri_dish_path.+cmds.internalVar.+"),
+                  VirusSignature("other_family", "playbackOptions")]
+    assert index.hunt(signatures) == [
+        ("/shots/a.ma", "vaccine_gene", "new_family"),
+        ("/shots/b.mb", "uifiguration", "new_family"),
+    ]
+
+
+def test_retro_hunt_index_stores_payloads_once(index):
+    assert index.connection.execute("SELECT COUNT(*) FROM payloads").fetchone() == (1,)
+    assert index.connection.execute("SELECT COUNT(*) FROM nodes").fetchone() == (3,)
+    index.record_file("/shots/b.mb", [])
+    assert [node.file for node in index.search("internalVar")] == ["/shots/a.ma"]
+
+
+def test_retro_hunt_index_stores_all_payloads(tmpdir):
+    index = RetroHuntIndex(str(tmpdir.join("retro_hunt.db")), store_all_payloads=True)
+    index.record_file("/shots/a.ma", [("script", "sceneConfigurationScriptNode", ["playbackOptions -min 1"])])
+    assert index.search("playbackOptions") == [("/shots/a.ma", "sceneConfigurationScriptNode", "script")]
+    index.close()
+
+
+def test_retro_hunt_main(index, capsys):
+    index.close()
+    assert main(["--index", index.path, "hunt", "--family", "zei_jian_kang"]) == 0
+    out, err = capsys.readouterr()
+    assert out.splitlines() == [
+        "/shots/a.ma\tvaccine_gene\tzei_jian_kang",
+        "/shots/b.mb\tuifiguration\tzei_jian_kang",
+    ]
+    assert err == "2 affected files\n"
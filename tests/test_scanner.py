@@ -1,9 +1,16 @@
 # Import built-in modules
 import glob
 import os
+import shutil
 
 # Import local modules
+from maya_umbrella import maya_funs
+from maya_umbrella.collector import MayaVirusCollector
+from maya_umbrella.defender import MayaVirusDefender
 from maya_umbrella.filesystem import write_file
+from maya_umbrella.manifest import ScanManifest
+from maya_umbrella.offline_scanner import scan_maya_file
+from maya_umbrella.retro_hunt import RetroHuntIndex
 from maya_umbrella.scanner import MayaVirusScanner
 
 
@@ -21,3 +28,172 @@ def test_scanner_from_file(this_root, tmpdir):
     text_file = str(tmpdir.join("test.txt"))
     write_file(text_file, "\n".join(glob.glob(os.path.join(root, "*.m[ab]"))))
     assert scanner.scan_files_from_file(text_file) == []
+
+
+def test_scan_files_fixes_maya_ascii_offline(get_virus_file, tmpdir, monkeypatch):
+    monkeypatch.setenv("MAYA_UMBRELLA_OFFLINE_FIX", "true")
+    maya_file = str(tmpdir.join("scenes", "uifiguration.ma"))
+    os.makedirs(os.path.dirname(maya_file))
+    shutil.copy2(get_virus_file("uifiguration.ma"), maya_file)
+    scanner = MayaVirusScanner(output_path=str(tmpdir.join("backup")))
+    assert scanner.scan_files_from_list([maya_file]) == [maya_file]
+    assert scan_maya_file(maya_file) == []
+    backup_file = os.path.join(str(tmpdir.join("backup")), os.path.dirname(maya_file).lstrip(os.sep), "uifiguration.ma")
+    assert scan_maya_file(backup_file) == ["virus20240430"]
+
+
+def test_scan_files_opens_each_reference_once(tmpdir, monkeypatch):
+    opened = []
+    monkeypatch.setattr(maya_funs, "open_maya_file", lambda path, load_references=True: opened.append(path))
+    monkeypatch.setattr(maya_funs, "get_reference_files", list)
+    write_file(str(tmpdir.join("chair.ma")), "//Maya ASCII 2018ff09 scene\n")
+    for name in ("shot1.ma", "shot2.ma"):
+        write_file(str(tmpdir.join(name)), '//Maya ASCII 2018ff09 scene\nfile -r -ns "chair" "chair.ma";\n')
+    scanner = MayaVirusScanner(output_path=str(tmpdir.join("backup")))
+    files = [str(tmpdir.join("shot1.ma")), str(tmpdir.join("shot2.ma")), "", str(tmpdir.join("shot1.ma"))]
+    scanner.scan_files_from_list(files)
+    assert [os.path.basename(path) for path in opened] == ["chair.ma", "shot1.ma", "shot2.ma"]
+
+
+def test_scan_files_defers_references(tmpdir, monkeypatch):
+    opened = []
+    monkeypatch.setattr(maya_funs, "open_maya_file", lambda path, load_references=True: opened.append(
+        (os.path.basename(path), load_references)))
+    monkeypatch.setattr(maya_funs, "get_reference_files", lambda: [str(tmpdir.join("chair.mb"))])
+    monkeypatch.setattr(MayaVirusDefender, "have_issues", property(lambda self: False))
+    for name in ("chair.mb", "shot1.mb", "shot2.mb"):
+        write_file(str(tmpdir.join(name)), b"FOR4")
+    scanner = MayaVirusScanner(output_path=str(tmpdir.join("backup")), defer_references=True)
+    scanner.scan_files_from_list([str(tmpdir.join("shot1.mb")), str(tmpdir.join("shot2.mb"))])
+    # The reference found when opening the first file is scanned before the next file, without its references.
+    assert opened == [("shot1.mb", False), ("chair.mb", False), ("shot2.mb", False)]
+
+
+def test_scan_files_reopens_infected_file_with_references(tmpdir, monkeypatch):
+    opened = []
+    monkeypatch.setattr(maya_funs, "open_maya_file", lambda path, load_references=True: opened.append(
+        load_references))
+    monkeypatch.setattr(maya_funs, "get_reference_files", list)
+    monkeypatch.setattr(MayaVirusDefender, "have_issues", property(lambda self: True))
+    maya_file = str(tmpdir.join("shot.mb"))
+    write_file(maya_file, b"FOR4")
+    scanner = MayaVirusScanner(output_path=str(tmpdir.join("backup")), defer_references=True)
+    assert scanner.scan_files_from_list([maya_file]) == [maya_file]
+    assert opened == [False, True]
+
+
+def test_scan_files_skips_files_by_header(tmpdir, monkeypatch):
+    opened = []
+    monkeypatch.setattr(maya_funs, "open_maya_file", lambda path, load_references=True: opened.append(path))
+    write_file(str(tmpdir.join("empty.ma")), "")
+    write_file(str(tmpdir.join("notes.ma")), "some notes")
+    scanner = MayaVirusScanner(output_path=str(tmpdir.join("backup")))
+    assert scanner.scan_files_from_pattern(str(tmpdir.join("*.ma"))) == []
+    assert opened == []
+    assert scanner.skipped_files == {
+        str(tmpdir.join("empty.ma")): "empty",
+        str(tmpdir.join("notes.ma")): "not_maya_scene",
+    }
+
+
+def test_iter_scan_yields_result_of_each_file(tmpdir, monkeypatch):
+    opened = []
+
+    def open_maya_file(path, load_references=True):
+        opened.append(path)
+        if "broken" in path:
+            raise RuntimeError("corrupt file")
+
+    monkeypatch.setattr(maya_funs, "open_maya_file", open_maya_file)
+    monkeypatch.setattr(maya_funs, "get_reference_files", list)
+    monkeypatch.setattr(MayaVirusDefender, "have_issues", property(lambda self: "infected" in opened[-1]))
+    monkeypatch.setattr(MayaVirusDefender, "fix", lambda self: None)
+    monkeypatch.setattr(MayaVirusCollector, "infected_families", property(lambda self: ["virus2024"]))
+    for name in ("clean.mb", "infected.mb", "broken.mb"):
+        write_file(str(tmpdir.join(name)), b"FOR4")
+    write_file(str(tmpdir.join("empty.mb")), b"")
+    streamed = []
+    scanner = MayaVirusScanner(output_path=str(tmpdir.join("backup")), on_result=streamed.append)
+    files = [str(tmpdir.join(name)) for name in ("clean.mb", "infected.mb", "broken.mb", "empty.mb")]
+    results = {os.path.basename(result.path): result for result in scanner.iter_scan(files)}
+    assert len(streamed) == 4
+    assert results["clean.mb"].verdict == "clean"
+    assert results["clean.mb"].backup_path is None
+    assert "open" in results["clean.mb"].timings
+    assert results["infected.mb"].verdict == "fixed"
+    assert results["infected.mb"].families == ["virus2024"]
+    assert os.path.isfile(results["infected.mb"].backup_path)
+    assert results["broken.mb"].verdict == "error"
+    assert results["broken.mb"].error == "corrupt file"
+    assert results["empty.mb"].verdict == "skipped"
+    assert results["empty.mb"].error == "empty"
+    assert all(result.timings["total"] >= 0 for result in results.values())
+    assert scanner.failed_files == []
+    assert scanner.scan_files_from_list(files) == [str(tmpdir.join("infected.mb"))]
+    assert scanner.failed_files == [str(tmpdir.join("broken.mb"))]
+
+
+def test_iter_scan_streams_files(tmpdir, monkeypatch):
+    monkeypatch.setattr(maya_funs, "open_maya_file", lambda path, load_references=True: None)
+    monkeypatch.setattr(maya_funs, "get_reference_files", list)
+    monkeypatch.setattr(MayaVirusDefender, "have_issues", property(lambda self: False))
+    read = []
+
+    def iter_files():
+        for name in ("shot1.mb", "shot2.mb"):
+            write_file(str(tmpdir.join(name)), b"FOR4")
+            read.append(name)
+            yield str(tmpdir.join(name))
+
+    scanner = MayaVirusScanner(output_path=str(tmpdir.join("backup")))
+    results = scanner.iter_scan(iter_files())
+    assert os.path.basename(next(results).path) == "shot1.mb"
+    assert read == ["shot1.mb"]
+    assert [os.path.basename(result.path) for result in results] == ["shot2.mb"]
+    # Nothing but the paths already scanned is kept per file.
+    assert scanner.journal.entries == {}
+
+
+def test_scan_changed_files_only_scans_changes(tmpdir, monkeypatch):
+    opened = []
+    monkeypatch.setattr(maya_funs, "open_maya_file", lambda path, load_references=True: opened.append(
+        os.path.basename(path)))
+    monkeypatch.setattr(maya_funs, "get_reference_files", list)
+    monkeypatch.setattr(MayaVirusDefender, "have_issues", property(lambda self: False))
+    root = tmpdir.join("project")
+    for name in ("a.mb", "b.mb", os.path.join("_virus", "a.mb")):
+        write_file(str(root.join(name)), b"FOR4")
+    manifest = ScanManifest(str(tmpdir.join("manifest.json")))
+    scanner = MayaVirusScanner(output_path=str(tmpdir.join("backup")))
+    assert scanner.scan_changed_files(str(root), manifest) == []
+    assert sorted(opened) == ["a.mb", "b.mb"]
+    opened[:] = []
+    write_file(str(root.join("b.mb")), b"FOR4FOR8")
+    scanner.scan_changed_files(str(root), ScanManifest(str(tmpdir.join("manifest.json"))))
+    assert opened == ["b.mb"]
+
+
+def test_scan_files_records_script_nodes(get_virus_file, tmpdir, monkeypatch):
+    monkeypatch.setenv("MAYA_UMBRELLA_OFFLINE_FIX", "true")
+    monkeypatch.setenv("MAYA_UMBRELLA_RETRO_HUNT_INDEX", "true")
+    monkeypatch.setenv("MAYA_UMBRELLA_RETRO_HUNT_INDEX_FILE", str(tmpdir.join("retro_hunt.db")))
+    maya_file = str(tmpdir.join("2024-4-30.ma"))
+    shutil.copy2(get_virus_file("2024-4-30.ma"), maya_file)
+    MayaVirusScanner(output_path=str(tmpdir.join("backup"))).scan_files_from_list([maya_file])
+    index = RetroHuntIndex()
+    nodes = index.connection.execute("SELECT file, node FROM nodes").fetchall()
+    index.close()
+    assert sorted(nodes) == [
+        (maya_file, "sceneConfigurationScriptNode"),
+        (maya_file, "uiConfigurationScriptNode"),
+    ]
+
+
+def test_scanner_journal_is_kept_in_memory_by_default(monkeypatch):
+    assert MayaVirusScanner().journal.path is None
+    monkeypatch.setenv("MAYA_UMBRELLA_SCAN_JOURNAL", "true")
+    assert MayaVirusScanner().journal.path
+
+
+def test_scanner_retro_hunt_index_is_disabled_by_default():
+    assert MayaVirusScanner().retro_hunt_index is None
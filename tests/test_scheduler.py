@@ -0,0 +1,88 @@
+# Import built-in modules
+import heapq
+import threading
+
+# Import local modules
+from maya_umbrella.filesystem import write_file
+from maya_umbrella.scheduler import ScanJournal
+from maya_umbrella.scheduler import get_file_size
+from maya_umbrella.scheduler import schedule_files
+
+
+def _write_files(tmpdir, sizes):
+    files = []
+    for index, size in enumerate(sizes):
+        files.append(str(tmpdir.join("scene{index}.mb".format(index=index))))
+        write_file(files[-1], b"x" * size)
+    return files
+
+
+def _get_wall_time(costs, workers):
+    # Each job goes to the first idle worker.
+    finish_times = [0] * workers
+    for cost in costs:
+        heapq.heappush(finish_times, heapq.heappop(finish_times) + cost)
+    return max(finish_times)
+
+
+def test_scan_journal(tmpdir):
+    journal_file = str(tmpdir.join("journal.json"))
+    files = _write_files(tmpdir, [100, 300])
+    journal = ScanJournal(journal_file)
+    assert journal.get(files[0]) is None
+    journal.record(files[0], 1.0)
+    journal.record(files[1], 3.0)
+    journal.save()
+    journal = ScanJournal(journal_file)
+    assert journal.get(files[0]) == 1.0
+    assert journal.get_seconds_per_byte() == 0.01
+    write_file(journal_file, "{")
+    assert ScanJournal(journal_file).entries == {}
+
+
+def test_scan_journal_shared_by_threads(tmpdir):
+    journal = ScanJournal(str(tmpdir.join("journal.json")))
+    errors = []
+
+    def _record(offset):
+        try:
+            for index in range(500):
+                journal.record("/show/scene{index}.mb".format(index=offset + index), 1.0, size=100)
+                journal.get_seconds_per_byte()
+            journal.save()
+        except RuntimeError as error:
+            errors.append(error)
+
+    threads = [threading.Thread(target=_record, args=(offset,)) for offset in (0, 1000, 2000)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert errors == []
+    assert len(ScanJournal(journal.path).entries) == 1500
+
+
+def test_schedule_files_by_size(tmpdir):
+    files = _write_files(tmpdir, [10, 30, 20, 30])
+    assert schedule_files(files + [str(tmpdir.join("missing.mb"))]) == [
+        files[1], files[3], files[2], files[0], str(tmpdir.join("missing.mb"))]
+    assert get_file_size(files[0] + "{1}") == 10
+
+
+def test_schedule_files_by_journal(tmpdir):
+    files = _write_files(tmpdir, [10, 1000, 100])
+    journal = ScanJournal()
+    # The small file takes the longest to open, e.g. it has many references.
+    journal.record(files[0], 50.0)
+    journal.record(files[1], 10.0)
+    # The unknown file is estimated from the average time per byte of the journal.
+    assert schedule_files(files, journal) == [files[0], files[1], files[2]]
+
+
+def test_schedule_files_balances_workers(tmpdir):
+    sizes = [1] * 12 + [10, 10]
+    files = _write_files(tmpdir, sizes)
+    ordered_sizes = [get_file_size(path) for path in schedule_files(files)]
+    assert _get_wall_time(sizes, 4) == 13
+    # The lower bound is the longest job here, the sum divided by the workers is 8.
+    assert _get_wall_time(ordered_sizes, 4) == 10
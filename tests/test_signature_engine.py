@@ -0,0 +1,90 @@
+# Import built-in modules
+import random
+import re
+import time
+
+# Import third-party modules
+import pytest
+
+# Import local modules
+from maya_umbrella.signature_engine import Signature
+from maya_umbrella.signature_engine import get_signature
+from maya_umbrella.signature_engine import search_signatures
+from maya_umbrella.signatures import FILE_VIRUS_SIGNATURES
+from maya_umbrella.signatures import JOB_SCRIPTS_VIRUS_SIGNATURES
+
+
+ALL_SIGNATURES = list(JOB_SCRIPTS_VIRUS_SIGNATURES) + list(FILE_VIRUS_SIGNATURES) + [
+    ".+abc", "a.b.+", "x.*", ".x.", "a.+", "(ab).*c",
+]
+
+
+def _random_content(generator, tokens):
+    return "".join(generator.choice(tokens) for _ in range(generator.randint(0, 12)))
+
+
+@pytest.mark.parametrize("pattern", ALL_SIGNATURES)
+def test_signature_matches_like_regex(pattern):
+    generator = random.Random(pattern)
+    tokens = re.findall(r"\w+|[^\w]", pattern.replace("\\", "")) + ["\n", " ", "x", "abc"]
+    signature = Signature(pattern)
+    for _ in range(500):
+        content = _random_content(generator, tokens)
+        assert signature.search(content) == bool(re.search(pattern, content)), content
+
+
+def test_signature_chain():
+    signature = Signature(r"python(.*);.+exec.+(pyCode).+;")
+    assert signature.chain
+    assert signature.search('python("x"); exec(pyCode) ;')
+    assert not signature.search('python("x"); exec\n(pyCode) ;')
+    assert not Signature(r"^\['.+']").chain
+
+
+def test_signature_rejects_adversarial_line_in_linear_time():
+    signature = get_signature(r"python(.*);.+exec.+(pyCode).+;")
+    content = "python(" + " exec pyCode" * 100000 + ";"
+    started = time.time()
+    assert not signature.search(content)
+    assert time.time() - started < 1
+
+
+def test_signature_deadline_flags_buffer():
+    signature = Signature(r"ab[xy].*d.*e")
+    assert signature.chain is None
+    assert signature.backtracking_prone
+    assert signature.search("abzdxe\n", deadline=time.time() - 1)
+    assert not signature.search("axxdxe", deadline=time.time() - 1)
+
+
+def test_signature_remove():
+    signature = get_signature(r"python(.*);.+exec.+(pyCode).+;")
+    content = b"keep\npython(x); exec(pyCode) ;\nkeep"
+    assert signature.remove(content) == re.sub(signature.pattern, b"", content)
+
+
+def test_search_signatures():
+    assert search_signatures("os.remove(petri_dish_path); cmds.internalVar(userAppDir=True)",
+                             JOB_SCRIPTS_VIRUS_SIGNATURES)
+    assert search_signatures("import vaccine", FILE_VIRUS_SIGNATURES)
+    assert not search_signatures("import os", FILE_VIRUS_SIGNATURES)
+
+
+@pytest.mark.parametrize(
+    "pattern, content",
+    [
+        ("a{2}b", "aab"),
+        ("a{1,3}b", "xaab"),
+        ("(?i)abc", "ABC"),
+        ("a(?=b)", "ab"),
+        ("(?!x)ab", "ab"),
+        ("(?P<n>ab)c", "abc"),
+        ("a(?#c)b", "ab"),
+        ("(?s)a.b", "a\nb"),
+        ("(?m)^b", "a\nb"),
+        (r"\x41b", "Ab"),
+    ],
+)
+def test_signature_required_literals_do_not_reject_matches(pattern, content):
+    assert re.search(pattern, content)
+    assert Signature(pattern).search(content)
@@ -0,0 +1,36 @@
+# Import built-in modules
+import json
+
+# Import local modules
+from maya_umbrella.tracing import get_trace_writer
+from maya_umbrella.tracing import trace_span
+from maya_umbrella.tracing import traced
+
+
+def test_trace_span_disabled(monkeypatch):
+    monkeypatch.delenv("MAYA_UMBRELLA_TRACE", raising=False)
+    assert get_trace_writer() is None
+    with trace_span("after_open", "callback"):
+        pass
+
+
+def test_trace_span(monkeypatch, tmpdir):
+    monkeypatch.setenv("MAYA_UMBRELLA_TRACE", "true")
+    monkeypatch.setenv("MAYA_UMBRELLA_LOG_ROOT", str(tmpdir))
+
+    @traced("fix_infected_nodes", "cleaner")
+    def fix():
+        pass
+
+    with trace_span("after_open", "callback", file="test.ma"):
+        fix()
+    writer = get_trace_writer()
+    writer.close()
+    with open(writer.path) as stream:
+        data = stream.read()
+    # The closing bracket is optional in the JSON array format.
+    events = json.loads(data.rstrip().rstrip(",") + "]")
+    assert [event["name"] for event in events] == ["fix_infected_nodes", "after_open"]
+    assert events[1]["ph"] == "X"
+    assert events[1]["args"] == {"file": "test.ma"}
+    assert events[1]["dur"] >= events[0]["dur"]
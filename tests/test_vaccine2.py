@@ -28,6 +28,10 @@ class MockTranslator:
         """Translate a key."""
         return "{key}: {kwargs}".format(key=key, kwargs=kwargs)
 
+    def lazy(self, key, **kwargs):
+        """Translate a key when rendered."""
+        return self.translate(key, **kwargs)
+
 
 class MockVaccineAPI:
     """Mock API for testing vaccine methods."""
@@ -39,6 +43,7 @@ class MockVaccineAPI:
         self.malicious_files = []
         self.infected_files = []
         self.infected_nodes = []
+        self.skipped_nodes = []
         self.translator = MockTranslator()
 
         # Create directories
@@ -61,6 +66,14 @@ class MockVaccineAPI:
         """Add infected node."""
         self.infected_nodes.append(node)
 
+    def filter_nodes_to_scan(self, nodes):
+        """Return all nodes to scan."""
+        return nodes
+
+    def skip_node(self, node):
+        """Record a node not checked."""
+        self.skipped_nodes.append(node)
+
 
 class MockLogger:
     """Mock logger for testing."""
@@ -138,6 +151,7 @@ def test_vaccine2_collect_infected_nodes_skips_reference_nodes(monkeypatch, tmpd
 
     # Verify no infected nodes were detected (reference nodes are skipped)
     assert len(api.infected_nodes) == 0
+    assert api.skipped_nodes == ["scriptNode1"]
 
 
 def test_vaccine2_collect_infected_nodes_empty_script_string(monkeypatch, tmpdir):
@@ -27,6 +27,10 @@ class MockTranslator:
         """Translate a key."""
         return "{key}: {kwargs}".format(key=key, kwargs=kwargs)
 
+    def lazy(self, key, **kwargs):
+        """Translate a key when rendered."""
+        return self.translate(key, **kwargs)
+
 
 class MockVaccineAPI:
     """Mock API for testing vaccine methods."""
@@ -41,6 +45,7 @@ class MockVaccineAPI:
         self.infected_nodes = []
         self.infected_reference_files = []
         self.infected_script_jobs = []
+        self.script_job_ids = {}
         self.translator = MockTranslator()
 
         # Create directories
@@ -64,14 +69,23 @@ class MockVaccineAPI:
         """Add infected node."""
         self.infected_nodes.append(node)
 
+    def filter_nodes_to_scan(self, nodes):
+        """Return all nodes to scan."""
+        return nodes
+
+    def defer(self, func):
+        """Run the collect function immediately."""
+        func()
+
     def add_infected_reference_file(self, file_path):
         """Add infected reference file."""
         if file_path:
             self.infected_reference_files.append(file_path)
 
-    def add_infected_script_job(self, script_job):
+    def add_infected_script_job(self, script_job, job_id=None):
         """Add infected script job."""
         self.infected_script_jobs.append(script_job)
+        self.script_job_ids[script_job] = job_id
 
 
 class MockLogger:
@@ -274,6 +288,34 @@ def test_vaccine3_collect_script_jobs(monkeypatch, tmpdir):
     assert "clean_callback" not in api.infected_script_jobs
 
 
+def test_vaccine3_collect_script_jobs_only_inspects_new_ids(monkeypatch, tmpdir):
+    """Test script jobs listed by the previous collect are not inspected again."""
+    api = MockVaccineAPI(tmpdir)
+    vaccine = Vaccine(api=api, logger=MockLogger())
+    infected_job = "12: event=['SceneSaved', 'leukocyte.antivirus()']"
+    clean_job = "13: idleEvent=updateUI"
+    mock_cmds = MockCmdsForVaccine3(script_jobs=[infected_job, clean_job])
+    monkeypatch.setattr("maya_umbrella.vaccines.vaccine3.cmds", mock_cmds)
+
+    vaccine.collect_script_jobs()
+    assert api.infected_script_jobs == [infected_job]
+    assert api.script_job_ids == {infected_job: 12}
+
+    # Known ids reuse their previous verdict, only the new job is parsed and inspected.
+    parsed = []
+    monkeypatch.setattr(
+        "maya_umbrella.vaccines.vaccine3.parse_script_job_id", lambda script_job: parsed.append(script_job) or 14)
+    monkeypatch.setattr(vaccine, "virus_gene", ())
+    new_job = "14: event=['SceneSaved', 'leukocyte.occupation()']"
+    mock_cmds._script_jobs = [infected_job, clean_job, new_job]
+    api.infected_script_jobs = []
+    vaccine.collect_script_jobs()
+    assert api.infected_script_jobs == [infected_job]
+    assert api.script_job_ids[infected_job] == 12
+    assert parsed == [new_job]
+    assert sorted(vaccine._script_jobs) == ["12", "13", "14"]
+
+
 def test_vaccine3_collect_script_jobs_not_list(monkeypatch, tmpdir):
     """Test handling when script jobs returns a non-list value."""
     api = MockVaccineAPI(tmpdir)
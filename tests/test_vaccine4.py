@@ -85,6 +85,10 @@ class MockTranslator:
         """Translate a key."""
         return f"{key}: {kwargs}"
 
+    def lazy(self, key, **kwargs):
+        """Translate a key when rendered."""
+        return self.translate(key, **kwargs)
+
 
 class MockVaccineAPI:
     """Mock API for testing vaccine methods."""
@@ -98,6 +102,7 @@ class MockVaccineAPI:
         self.malicious_files = []
         self.infected_files = []
         self.infected_nodes = []
+        self.skipped_nodes = []
         self.translator = MockTranslator()
         self._locale_script_paths = []
 
@@ -133,6 +138,18 @@ class MockVaccineAPI:
         """Add infected node."""
         self.infected_nodes.append(node)
 
+    def filter_nodes_to_scan(self, nodes):
+        """Return all nodes to scan."""
+        return nodes
+
+    def skip_node(self, node):
+        """Record a node not checked."""
+        self.skipped_nodes.append(node)
+
+    def defer(self, func):
+        """Run the collect function immediately."""
+        func()
+
 
 class MockLogger:
     """Mock logger for testing."""
@@ -454,6 +471,7 @@ def test_vaccine4_collect_infected_nodes_skips_reference_nodes(monkeypatch, tmpd
 
     # Verify no infected nodes were detected (reference nodes are skipped)
     assert len(api.infected_nodes) == 0
+    assert api.skipped_nodes == ["scriptNode1"]
 
 
 def test_vaccine4_collect_infected_nodes_empty_script_string(monkeypatch, tmpdir):
@@ -0,0 +1,105 @@
+# Import built-in modules
+import logging
+import os
+
+# Import local modules
+from maya_umbrella.collector import MayaVirusCollector
+from maya_umbrella.constants import VERDICT_CLEAN
+from maya_umbrella.constants import VERDICT_INFECTED
+from maya_umbrella.filesystem import get_verdict_cache_file
+from maya_umbrella.filesystem import write_file
+from maya_umbrella.verdict_cache import VerdictCache
+from maya_umbrella.verdict_cache import normalize_path
+
+
+def test_verdict_cache_get_set(tmpdir):
+    maya_file = str(tmpdir.join("rig.ma"))
+    write_file(maya_file, "//Maya ASCII 2018 scene")
+    cache = VerdictCache()
+    assert cache.get(maya_file) is None
+    cache.set(maya_file, VERDICT_CLEAN)
+    assert cache.get(maya_file) == VERDICT_CLEAN
+    assert cache.is_clean(maya_file + "{1}")
+
+
+def test_verdict_cache_invalidated_on_change(tmpdir):
+    maya_file = str(tmpdir.join("rig.ma"))
+    write_file(maya_file, "//Maya ASCII 2018 scene")
+    cache = VerdictCache()
+    cache.set(maya_file, VERDICT_CLEAN)
+    write_file(maya_file, '//Maya ASCII 2018 scene\ncreateNode script -n "uifiguration";')
+    assert cache.get(maya_file) is None
+
+
+def test_verdict_cache_use_hash(tmpdir):
+    maya_file = str(tmpdir.join("rig.ma"))
+    write_file(maya_file, "//Maya ASCII 2018 scene")
+    cache = VerdictCache(use_hash=True)
+    cache.set(maya_file, VERDICT_INFECTED)
+    assert len(cache.verdicts[normalize_path(maya_file)]["stat"]) == 3
+    assert cache.get(maya_file) == VERDICT_INFECTED
+
+
+def test_verdict_cache_persist(tmpdir):
+    maya_file = str(tmpdir.join("rig.ma"))
+    cache_file = str(tmpdir.join("verdicts.json"))
+    write_file(maya_file, "//Maya ASCII 2018 scene")
+    cache = VerdictCache(cache_file)
+    cache.set(maya_file, VERDICT_CLEAN)
+    cache.save()
+    assert os.path.isfile(cache_file)
+    assert VerdictCache(cache_file).is_clean(maya_file)
+
+
+def test_verdict_cache_discard_other_signatures(tmpdir):
+    cache_file = str(tmpdir.join("verdicts.json"))
+    write_file(cache_file, '{"signatures": "old", "files": {"rig.ma": {}}}')
+    assert VerdictCache(cache_file).verdicts == {}
+
+
+def test_collector_skips_verified_reference_nodes(monkeypatch, tmpdir):
+    clean_file = str(tmpdir.join("clean.ma"))
+    infected_file = str(tmpdir.join("infected.ma"))
+    for path in (clean_file, infected_file):
+        write_file(path, "//Maya ASCII 2018 scene")
+    reference_files = {"rig:script": clean_file, "prop:script": infected_file, "script": ""}
+    monkeypatch.setattr("maya_umbrella.collector.get_reference_file_by_node", reference_files.get)
+    collector = MayaVirusCollector(logging.getLogger(__name__), verdict_cache=VerdictCache())
+    nodes = list(reference_files)
+    assert collector.filter_nodes_to_scan(nodes) == nodes
+
+    collector.add_infected_node("prop:script")
+    collector.update_verdict_cache()
+    assert collector.verdict_cache.get(clean_file) == VERDICT_CLEAN
+    assert collector.verdict_cache.get(infected_file) == VERDICT_INFECTED
+
+    collector.reset()
+    assert collector.filter_nodes_to_scan(nodes) == ["prop:script", "script"]
+
+
+def test_collector_does_not_cache_skipped_references(monkeypatch, tmpdir):
+    reference_file = str(tmpdir.join("rig.ma"))
+    write_file(reference_file, "//Maya ASCII 2018 scene")
+    monkeypatch.setattr("maya_umbrella.collector.get_reference_file_by_node", {"rig:script": reference_file}.get)
+    collector = MayaVirusCollector(logging.getLogger(__name__), verdict_cache=VerdictCache())
+    assert collector.filter_nodes_to_scan(["rig:script"]) == ["rig:script"]
+    collector.skip_node("rig:script")
+    collector.update_verdict_cache()
+    assert collector.verdict_cache.get(reference_file) is None
+
+    collector.reset()
+    assert collector.filter_nodes_to_scan(["rig:script"]) == ["rig:script"]
+
+
+def test_collector_verdict_cache_is_kept_in_memory_by_default(monkeypatch, tmpdir):
+    reference_file = str(tmpdir.join("rig.ma"))
+    write_file(reference_file, "//Maya ASCII 2018 scene")
+    monkeypatch.setattr("maya_umbrella.collector.get_reference_file_by_node", {"rig:script": reference_file}.get)
+    collector = MayaVirusCollector(logging.getLogger(__name__))
+    assert collector.verdict_cache.path is None
+    collector.filter_nodes_to_scan(["rig:script"])
+    collector.update_verdict_cache()
+    assert collector.verdict_cache.get(reference_file) == VERDICT_CLEAN
+    assert not os.path.exists(get_verdict_cache_file())
+    monkeypatch.setenv("MAYA_UMBRELLA_VERDICT_CACHE", "true")
+    assert MayaVirusCollector(logging.getLogger(__name__)).verdict_cache.path == get_verdict_cache_file()